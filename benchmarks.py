@@ -0,0 +1,331 @@
+"""Benchmark suite comparing each example's `main.py` with its `refactored.py`.
+
+The refactored modules trade speed for brevity in their hot paths: river
+crossing builds an action dict and generator expressions on every call, die
+hard builds a dict of closures per `apply`, and six_swiss calls up to five
+matcher functions per `match_price`. This suite runs the same seeded workload
+through both implementations of every example and reports, per function:
+
+    - ops/sec: calls per second, best of several timed passes
+    - peak B/call: the average memory high-water mark of a single call above
+      what was allocated before it, as traced by tracemalloc (0 when a call
+      only reuses existing objects)
+    - slowdown: main's ops/sec divided by refactored's
+    - mismatches: calls whose result differs from main's on the same input
+
+A refactoring is meant to preserve behaviour, so mismatches point at a bug in
+one of the two implementations. Results can be saved as a JSON baseline and
+later runs compared against it:
+
+    python benchmarks.py [example ...] [--save FILE] [--compare FILE]
+
+With --compare, the exit status is 1 if any function got slower than the
+baseline by more than --tolerance.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass, fields, is_dataclass
+from enum import Enum
+from types import ModuleType
+
+from code_logician_examples import ROOT, discover, load
+
+IMPLEMENTATIONS = ("main", "refactored")
+
+
+@dataclass(frozen=True)
+class Workload:
+    example: str
+    function: str
+    # Builds n argument tuples from the module's own types
+    inputs: Callable[[ModuleType, random.Random, int], list[tuple]]
+
+
+@dataclass
+class Measurement:
+    example: str
+    function: str
+    implementation: str
+    ops_per_sec: float
+    peak_bytes_per_call: float
+    mismatches: int = 0  # Calls whose result differs from main's
+
+    @property
+    def key(self) -> str:
+        return f"{self.example}:{self.function}:{self.implementation}"
+
+
+# river_crossing
+
+
+def _river_crossing_many_steps(m, rng, n):
+    actions = list(m.Action)
+    return [
+        (m.init_state, rng.choices(actions, k=rng.randrange(1, 13))) for _ in range(n)
+    ]
+
+
+# six_swiss
+
+
+def _six_swiss_book_side(m, rng):
+    return [
+        m.Order(
+            order_id=rng.randrange(1000),
+            order_type=rng.choice(list(m.OrderType)),
+            order_qty=rng.randrange(1, 4),
+            order_price=float(rng.randrange(95, 106)),
+            order_time=rng.randrange(10),
+        )
+        for _ in range(rng.randrange(4))
+    ]
+
+
+def _six_swiss_match_price(m, rng, n):
+    return [
+        (
+            m.OrderBook(_six_swiss_book_side(m, rng), _six_swiss_book_side(m, rng)),
+            float(rng.randrange(95, 106)),
+        )
+        for _ in range(n)
+    ]
+
+
+# tla/bank_account
+
+
+def _bank_account_safe_transfer(m, rng, n):
+    return [
+        (
+            m.BankState(
+                alice_account=rng.randrange(0, 21),
+                bob_account=rng.randrange(0, 21),
+                money=rng.randrange(1, 16),
+            ),
+        )
+        for _ in range(n)
+    ]
+
+
+# tla/die_hard
+
+
+def _die_hard_apply(m, rng, n):
+    actions = list(m.Action)
+    return [
+        (rng.choice(actions), m.State(rng.randrange(6), rng.randrange(4)))
+        for _ in range(n)
+    ]
+
+
+def _die_hard_many_steps(m, rng, n):
+    actions = list(m.Action)
+    return [
+        (m.State.init_state(), rng.choices(actions, k=rng.randrange(1, 13)))
+        for _ in range(n)
+    ]
+
+
+# ubs_dark_pool
+
+
+def _ubs_order(m, rng):
+    qty = rng.randrange(1, 5)
+    return m.Order(
+        id=rng.randrange(1000),
+        peg=rng.choice(list(m.OrderPeg)),
+        client_id=rng.randrange(10),
+        order_type=rng.choice(list(m.OrderType)),
+        qty=qty,
+        min_qty=0,
+        leaves_qty=rng.randrange(1, qty + 1),
+        price=rng.choice((2.5, 3.0, 3.5)),
+        time=rng.randrange(10),
+    )
+
+
+def _ubs_order_higher_ranked(m, rng, n):
+    market = m.MarketData(nbb=2.0, nbo=3.0, l_up=4.0, l_down=1.0)
+    return [
+        (rng.choice(list(m.OrderSide)), _ubs_order(m, rng), _ubs_order(m, rng), market)
+        for _ in range(n)
+    ]
+
+
+WORKLOADS = [
+    Workload("river_crossing", "many_steps", _river_crossing_many_steps),
+    Workload("six_swiss", "match_price", _six_swiss_match_price),
+    Workload("tla/bank_account", "safe_transfer", _bank_account_safe_transfer),
+    Workload("tla/die_hard", "apply", _die_hard_apply),
+    Workload("tla/die_hard", "many_steps", _die_hard_many_steps),
+    Workload("ubs_dark_pool", "order_higher_ranked", _ubs_order_higher_ranked),
+]
+
+
+def _plain(value):
+    """A value with dataclasses and enums replaced by tuples and names, so the
+    results of two implementations (which have distinct types) can be compared
+    """
+    if is_dataclass(value):
+        return tuple(_plain(getattr(value, f.name)) for f in fields(value))
+    if isinstance(value, Enum):
+        return value.name
+    return value
+
+
+def implementations(example: str) -> list[str]:
+    return [
+        name for name in IMPLEMENTATIONS if (ROOT / example / f"{name}.py").exists()
+    ]
+
+
+def measure(
+    workload: Workload,
+    implementation: str,
+    n: int = 10_000,
+    repeat: int = 5,
+    seed: int = 0,
+) -> tuple[Measurement, list]:
+    """Time a workload on one implementation
+
+    Returns:
+        The measurement, and the plain results of the calls
+    """
+    module = load(workload.example, implementation)
+    function = getattr(module, workload.function)
+    inputs = workload.inputs(module, random.Random(seed), n)
+    results = [_plain(function(*args)) for args in inputs]
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for args in inputs:
+            function(*args)
+        best = min(best, time.perf_counter() - start)
+
+    peaks = 0
+    tracemalloc.start()
+    for args in inputs[:1000]:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        function(*args)
+        peaks += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+
+    measurement = Measurement(
+        workload.example,
+        workload.function,
+        implementation,
+        n / best,
+        peaks / min(n, 1000),
+    )
+    return measurement, results
+
+
+def run(examples: list[str] | None = None, n: int = 10_000) -> list[Measurement]:
+    """Measure every workload of the discovered examples on each implementation"""
+    discovered = discover()
+    selected = [
+        w
+        for w in WORKLOADS
+        if w.example in discovered and (not examples or w.example in examples)
+    ]
+    measurements = []
+    for workload in selected:
+        reference = None
+        for implementation in implementations(workload.example):
+            measurement, results = measure(workload, implementation, n)
+            if reference is None:
+                reference = results
+            else:
+                measurement.mismatches = sum(
+                    a != b for a, b in zip(results, reference, strict=True)
+                )
+            measurements.append(measurement)
+    return measurements
+
+
+def report(measurements: list[Measurement], baseline: dict | None = None) -> None:
+    ops = {m.key: m.ops_per_sec for m in measurements}
+    print(
+        f"{'example':<18} {'function':<20} {'impl':<11} {'ops/sec':>12} "
+        f"{'peak B/call':>12} {'slowdown':>9} {'mismatches':>10}"
+        + (f" {'vs baseline':>12}" if baseline else "")
+    )
+    for m in measurements:
+        main_ops = ops.get(f"{m.example}:{m.function}:main")
+        slowdown = f"{main_ops / m.ops_per_sec:.2f}x" if main_ops else "-"
+        line = (
+            f"{m.example:<18} {m.function:<20} {m.implementation:<11} "
+            f"{m.ops_per_sec:>12,.0f} {m.peak_bytes_per_call:>12.1f} {slowdown:>9} "
+            f"{m.mismatches:>10}"
+        )
+        if baseline:
+            previous = baseline.get(m.key)
+            change = (
+                f"{m.ops_per_sec / previous['ops_per_sec'] - 1:+.1%}"
+                if previous
+                else "new"
+            )
+            line += f" {change:>12}"
+        print(line)
+
+
+def regressions(
+    measurements: list[Measurement], baseline: dict, tolerance: float
+) -> list[str]:
+    """Keys of the measurements slower than the baseline beyond the tolerance"""
+    return [
+        m.key
+        for m in measurements
+        if m.key in baseline
+        and m.ops_per_sec < baseline[m.key]["ops_per_sec"] * (1 - tolerance)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("examples", nargs="*", help="Only benchmark these examples")
+    parser.add_argument("-n", type=int, default=10_000, help="Calls per pass")
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Compare with a JSON baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Slowdown against the baseline that counts as a regression",
+    )
+    args = parser.parse_args()
+
+    measurements = run(args.examples, args.n)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    report(measurements, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    m.key: {
+                        "ops_per_sec": m.ops_per_sec,
+                        "peak_bytes_per_call": m.peak_bytes_per_call,
+                        "mismatches": m.mismatches,
+                    }
+                    for m in measurements
+                },
+                f,
+                indent=2,
+            )
+    if baseline:
+        slower = regressions(measurements, baseline, args.tolerance)
+        for key in slower:
+            print(f"Regression: {key}")
+        sys.exit(1 if slower else 0)
@@ -0,0 +1,356 @@
+"""Breadth-first state-space search that checkpoints to disk and resumes.
+
+An exhaustive search of a large model, such as a generalized river crossing
+with a dozen items or many concurrent bank transfers, can run for hours. If
+it crashes or is pre-empted, the visited set and the frontier are lost and
+the search has to start over. `Search` writes them to a directory at regular
+intervals, and a new `Search` on the same directory picks up from the latest
+checkpoint.
+
+A visited state is kept as its 64-bit fingerprint, in the manner of TLC, and
+numbered in the order it was found. Three append-only arrays, indexed by that
+number, hold the fingerprint, the number of the state it was first reached
+from and the label of the transition (an `Action`, a `Move`, a process). They
+are all a trace needs: follow the parents back to an initial state and replay
+the labels. A checkpoint appends only the entries found since the previous one,
+then atomically replaces a small pickle of the frontier (the states themselves)
+and the counters, which records how many entries are valid. A crash between
+the two leaves extra entries at the end of the arrays, and resuming cuts them
+off. So checkpoints cost time in proportion to the new states and the
+frontier, not to everything visited.
+
+Fingerprints must be the same in every process. `hash` of a tuple of ints is,
+but the hash of a str or an Enum changes between runs.
+
+    python bfs.py [model] [--size N] [--checkpoint DIR] [--every SECONDS]
+"""
+
+import argparse
+import os
+import pickle
+import time
+from array import array
+from collections import deque
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from code_logician_examples import load
+
+_MASK = (1 << 64) - 1
+_ARRAYS = {"fingerprints": "Q", "parents": "q", "labels": "H"}
+CHECKPOINT = "checkpoint.pkl"
+
+
+@dataclass(frozen=True)
+class Model:
+    name: str
+    initial: Callable[[], list]
+    successors: Callable[[object], Iterable[tuple[Hashable, object]]]
+    fingerprint: Callable[[object], int]  # Stable across processes
+    goal: Callable[[object], bool] | None = None  # Stop at the first such state
+
+
+@dataclass
+class Result:
+    states: int  # Distinct states found
+    transitions: int  # Successors generated
+    depth: int  # Depth of the last state expanded
+    complete: bool  # Every reachable state has been expanded
+    found: int | None  # Number of the first goal state, the nearest one
+    elapsed: float  # Seconds, across every resumed run
+
+
+class Search:
+    def __init__(
+        self, model: Model, directory: Path | str | None = None, every: float = 60.0
+    ):
+        """
+        Args:
+            directory: Where to checkpoint, resuming from a checkpoint found
+                there; None for no checkpoints
+            every: Seconds between checkpoints
+        """
+        self.model = model
+        self.directory = None if directory is None else Path(directory)
+        self.every = every
+        self.fingerprints = array("Q")
+        self.parents = array("q")  # -1 for the initial states
+        self.labels = array("H")  # Into label_table; initial states by position
+        self.label_table: list[Hashable] = []
+        self._label_codes: dict[Hashable, int] = {}
+        self._index: dict[int, int] = {}  # Fingerprint to state number
+        self.queue: deque[tuple[object, int, int]] = deque()  # State, number, depth
+        self.transitions = 0
+        self.depth = 0
+        self.found: int | None = None
+        self.elapsed = 0.0
+        self._saved = 0  # Entries of the arrays already on disk
+        self.checkpoints = 0  # Written by this process, and the time they took
+        self.checkpoint_seconds = 0.0
+        self.resumed = self.directory is not None and self._resume()
+        if not self.resumed:
+            for position, state in enumerate(model.initial()):
+                self._add(state, -1, position, 0)
+
+    def _add(self, state, parent: int, label: int, depth: int) -> None:
+        """Number a state if it is new, and queue it for expansion"""
+        fingerprint = self.model.fingerprint(state) & _MASK
+        if fingerprint in self._index:
+            return
+        number = len(self.fingerprints)
+        self._index[fingerprint] = number
+        self.fingerprints.append(fingerprint)
+        self.parents.append(parent)
+        self.labels.append(label)
+        self.queue.append((state, number, depth))
+        goal = self.model.goal
+        if self.found is None and goal is not None and goal(state):
+            self.found = number
+
+    def _code(self, label: Hashable) -> int:
+        code = self._label_codes.get(label)
+        if code is None:
+            code = self._label_codes[label] = len(self.label_table)
+            self.label_table.append(label)
+        return code
+
+    def run(self, max_expanded: int | None = None) -> Result:
+        """Expand states until the space is exhausted or a goal state is found
+
+        Args:
+            max_expanded: Stop (resumably) after expanding this many states
+        """
+        start = time.perf_counter()
+        last_checkpoint = start
+        successors, add, code = self.model.successors, self._add, self._code
+        queue, expanded = self.queue, 0
+        try:
+            while queue and self.found is None:
+                if max_expanded is not None and expanded >= max_expanded:
+                    break
+                # Left queued until expanded, to be expanded again if
+                # interrupted halfway: its successors already found are skipped
+                state, number, depth = queue[0]
+                self.depth = depth
+                for label, next_state in successors(state):
+                    self.transitions += 1
+                    add(next_state, number, code(label), depth + 1)
+                queue.popleft()
+                expanded += 1
+                if expanded & 1023 == 0 and self.directory is not None:
+                    now = time.perf_counter()
+                    if now - last_checkpoint >= self.every:
+                        self.elapsed += now - start
+                        start = last_checkpoint = now
+                        self.checkpoint()
+        except KeyboardInterrupt:
+            if self.directory is not None:
+                self.checkpoint()
+            raise
+        finally:
+            self.elapsed += time.perf_counter() - start
+        if self.directory is not None:
+            self.checkpoint()
+        return Result(
+            len(self.fingerprints),
+            self.transitions,
+            self.depth,
+            not queue,
+            self.found,
+            self.elapsed,
+        )
+
+    # Checkpoints
+
+    def checkpoint(self) -> None:
+        """Save the search to its directory"""
+        start = time.perf_counter()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        count = len(self.fingerprints)
+        # The first checkpoint replaces the arrays of a search that crashed
+        # before checkpointing
+        mode = "ab" if self._saved else "wb"
+        for name in _ARRAYS:
+            with open(self.directory / f"{name}.bin", mode) as file:
+                file.write(getattr(self, name)[self._saved : count].tobytes())
+                file.flush()
+                os.fsync(file.fileno())
+        self._saved = count
+        state = {
+            "model": self.model.name,
+            "count": count,
+            "label_table": self.label_table,
+            "queue": list(self.queue),
+            "transitions": self.transitions,
+            "depth": self.depth,
+            "found": self.found,
+            "elapsed": self.elapsed,
+        }
+        path = self.directory / CHECKPOINT
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp, path)
+        self.checkpoints += 1
+        self.checkpoint_seconds += time.perf_counter() - start
+
+    def _resume(self) -> bool:
+        try:
+            with open(self.directory / CHECKPOINT, "rb") as file:
+                state = pickle.load(file)
+        except FileNotFoundError:
+            return False
+        if state["model"] != self.model.name:
+            raise ValueError(
+                f"{self.directory} holds a search of {state['model']!r}, "
+                f"not {self.model.name!r}"
+            )
+        count = state["count"]
+        for name, typecode in _ARRAYS.items():
+            values = array(typecode)
+            path = self.directory / f"{name}.bin"
+            with open(path, "r+b") as file:
+                file.truncate(count * values.itemsize)  # Drop a partial append
+                values.fromfile(file, count)
+            setattr(self, name, values)
+        self._index = dict(zip(self.fingerprints, range(count)))
+        self.label_table = state["label_table"]
+        self._label_codes = {label: i for i, label in enumerate(self.label_table)}
+        self.queue = deque(state["queue"])
+        self.transitions = state["transitions"]
+        self.depth = state["depth"]
+        self.found = state["found"]
+        self.elapsed = state["elapsed"]
+        self._saved = count
+        return True
+
+    # Traces
+
+    def trace(self, number: int) -> list[tuple[Hashable, object]]:
+        """The transitions from an initial state to a state, as (label, state)
+
+        Replays the recorded labels with the model, so only the parent pointers
+        need to be kept.
+        """
+        chain = []
+        while self.parents[number] >= 0:
+            chain.append(number)
+            number = self.parents[number]
+        state = self.model.initial()[self.labels[number]]
+        steps = []
+        for number in reversed(chain):
+            label = self.label_table[self.labels[number]]
+            state = next(s for t, s in self.model.successors(state) if t == label)
+            steps.append((label, state))
+        return steps
+
+
+# Models
+
+
+def die_hard() -> Model:
+    """The jugs of tla/die_hard, to 4 gallons in the big one"""
+    m = load("tla/die_hard")
+    actions = list(m.Action)
+    return Model(
+        "die_hard",
+        lambda: [m.State.init_state()],
+        lambda s: ((a, m.apply(a, s)) for a in actions),
+        lambda s: hash((s.big, s.small)),
+        m.State.solved,
+    )
+
+
+def river_crossing(n_items: int = 6) -> Model:
+    """A paired river crossing, with a boat for half the items, explored whole"""
+    general = load("river_crossing", "general")
+    puzzle = general.paired_puzzle(n_items, boat_capacity=max(1, n_items // 2))
+    return Model(
+        f"river_crossing({n_items})",
+        lambda: [puzzle.initial_state()],
+        puzzle.successors,
+        lambda s: s if s <= _MASK else hash(s),  # Bitsets of up to 64 bits are exact
+    )
+
+
+def bank_account(k: int = 3, safe: bool = False) -> Model:
+    """K concurrent transfers from Alice to Bob, to the first negative balance"""
+    interleavings = load("tla/bank_account", "interleavings")
+    explorer = interleavings.alice_to_bob(k, safe)
+    return Model(
+        f"bank_account({k}, safe={safe})",
+        lambda: [explorer.initial],
+        lambda s: ((p, explorer.step(s, p)) for p in explorer.enabled(s)),
+        lambda s: hash((s.balances, s.pcs)),
+        lambda s: min(s.balances) < 0,
+    )
+
+
+MODELS = {
+    "die_hard": die_hard,
+    "river_crossing": river_crossing,
+    "bank_account": bank_account,
+}
+
+
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("model", nargs="?", choices=list(MODELS))
+    parser.add_argument("--size", type=int, help="Items or transfers (default 6 or 3)")
+    parser.add_argument("--checkpoint", type=Path, help="Directory, resumed from")
+    parser.add_argument("--every", type=float, default=60.0, help="Seconds")
+    args = parser.parse_args()
+
+    def report(name: str, search: Search, result: Result) -> None:
+        resumed = " (resumed)" if search.resumed else ""
+        found = ""
+        if result.found is not None:
+            labels = [label for label, _ in search.trace(result.found)]
+            found = f", goal after {len(labels)} steps: {labels}"
+        print(
+            f"{name}{resumed}: {result.states:,} states, "
+            f"{result.transitions:,} transitions, depth {result.depth}, "
+            f"{'complete' if result.complete else 'incomplete'} in "
+            f"{result.elapsed:.2f}s{found}"
+        )
+
+    if args.model:
+        make = MODELS[args.model]
+        if args.size is None:
+            model = make()
+        elif make is die_hard:
+            parser.error("die_hard has a fixed size")
+        else:
+            model = make(args.size)
+        search = Search(model, args.checkpoint, args.every)
+        report(model.name, search, search.run())
+    else:
+        # Time spent checkpointing every second, and resuming halfway
+        model = river_crossing(11)
+        directory = Path(tempfile.mkdtemp())
+        try:
+            search = Search(model, directory, every=1.0)
+            result = search.run()
+            report(f"{model.name}, every 1s", search, result)
+            size = sum(f.stat().st_size for f in directory.iterdir())
+            print(
+                f"  {search.checkpoints} checkpoints took "
+                f"{search.checkpoint_seconds / result.elapsed:.2%} of the time, "
+                f"{size / 1e6:.1f}MB on disk"
+            )
+
+            shutil.rmtree(directory)
+            Search(model, directory).run(max_expanded=result.states // 2)
+            start = time.perf_counter()
+            resumed = Search(model, directory)
+            loaded = time.perf_counter() - start
+            report(model.name, resumed, resumed.run())
+            print(f"  checkpoint loaded in {loaded:.2f}s")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
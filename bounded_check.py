@@ -0,0 +1,354 @@
+"""Bounded checking of the `verify` and `instance` goals in gen_w_query.iml.
+
+Sending a goal to the reasoner is slow, and as the river_crossing README notes
+it can time out. This module evaluates the same goals natively, against each
+example's `main.py`, over bounded input domains. A `verify` goal is refuted by
+a counterexample and an `instance` goal is answered by a witness; finding
+neither only means the goal holds (or has no witness) within the bounds, so
+it is a fast pre-filter rather than a proof. An exception raised by the Python
+code is reported as well, since the formal model cannot raise.
+
+The inputs of a goal are the cartesian product of one finite domain per
+argument. The product is enumerated by index, cut into ranges and fanned out
+across a process pool; each worker builds its own inputs from the index range,
+so only indices and findings cross process boundaries.
+
+    python bounded_check.py [example ...] [--workers N]
+"""
+
+import argparse
+import os
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from enum import Enum, auto
+from functools import cache
+from itertools import product
+from math import prod
+
+from code_logician_examples import load
+
+
+class GoalKind(Enum):
+    VERIFY = auto()  # Look for an input where the property is false
+    INSTANCE = auto()  # Look for an input where the property is true
+
+
+class Status(Enum):
+    COUNTEREXAMPLE = auto()
+    WITNESS = auto()
+    ERROR = auto()  # The Python code raised on some input
+    HOLDS_WITHIN_BOUNDS = auto()
+    NO_WITNESS_WITHIN_BOUNDS = auto()
+
+
+@dataclass(frozen=True)
+class Goal:
+    example: str
+    kind: GoalKind
+    iml: str  # The goal as written in gen_w_query.iml
+    domains: Callable[[], list[Sequence]]  # One finite domain per argument
+    prop: Callable[..., bool]
+    # Search for a witness beyond the bounds, e.g. a solver specific to the goal
+    fallback: Callable[[], tuple | None] | None = None
+
+
+@dataclass
+class CheckResult:
+    goal: Goal
+    status: Status
+    checked: int  # Inputs evaluated, at least up to the finding
+    inputs: tuple | None = None
+    error: str | None = None
+    elapsed: float = 0.0
+
+
+def action_sequences(actions: Sequence, max_length: int) -> list[tuple]:
+    """All action sequences of length 0 to max_length, shortest first"""
+    return [
+        sequence
+        for length in range(max_length + 1)
+        for sequence in product(actions, repeat=length)
+    ]
+
+
+# tla/die_hard
+
+
+def _die_hard_sequences(max_length: int) -> Callable[[], list[Sequence]]:
+    return lambda: [action_sequences(list(load("tla/die_hard").Action), max_length)]
+
+
+def _die_hard_big_is_4(actions: tuple) -> bool:
+    m = load("tla/die_hard")
+    return m.many_steps(m.State.init_state(), list(actions)).big == 4
+
+
+def _die_hard_no_short_solution(actions: tuple) -> bool:
+    return not (len(actions) < 3) or not _die_hard_big_is_4(actions)
+
+
+# river_crossing
+
+
+def _river_crossing_solved(actions: tuple) -> bool:
+    m = load("river_crossing")
+    return m.many_steps(m.init_state, list(actions)).solved()
+
+
+def _river_crossing_plan() -> tuple | None:
+    plan = load("river_crossing", "witness").find_plan()
+    return None if plan is None else (tuple(plan),)
+
+
+# tla/bank_account
+
+
+def _bank_states() -> list[Sequence]:
+    m = load("tla/bank_account")
+    return [
+        [
+            m.BankState(alice_account=alice, bob_account=bob, money=money)
+            for alice in range(0, 21)
+            for bob in (0, 10)
+            for money in range(-5, 26)
+        ]
+    ]
+
+
+def _bank_transfer_non_negative(state) -> bool:
+    m = load("tla/bank_account")
+    premise = state.money > 0 and state.alice_account == 10 and state.bob_account == 10
+    return not premise or m.transfer(state).alice_account >= 0
+
+
+def _bank_safe_transfer_non_negative(state) -> bool:
+    m = load("tla/bank_account")
+    premise = state.money > 0 and state.alice_account == 10 and state.bob_account == 10
+    return not premise or m.safe_transfer(state).alice_account >= 0
+
+
+# ubs_dark_pool
+
+
+def _ubs_orders(m) -> list:
+    """Small valid orders covering every peg and type, two prices and times"""
+    return [
+        m.Order(
+            id=0,
+            peg=peg,
+            client_id=0,
+            order_type=order_type,
+            qty=2,
+            min_qty=0,
+            leaves_qty=leaves_qty,
+            price=price,
+            time=order_time,
+        )
+        for order_type in m.OrderType
+        for peg in m.OrderPeg
+        for price in (2.5, 3.5)
+        for order_time in (0, 1)
+        for leaves_qty in (1, 2)
+    ]
+
+
+def _ubs_domains() -> list[Sequence]:
+    m = load("ubs_dark_pool")
+    orders = _ubs_orders(m)
+    markets = [m.MarketData(nbb=2.0, nbo=3.0, l_up=4.0, l_down=1.0)]
+    return [list(m.OrderSide), orders, orders, orders, markets]
+
+
+def _ubs_rank_transitive(side, o1, o2, o3, market) -> bool:
+    m = load("ubs_dark_pool")
+    if m.order_higher_ranked(side, o1, o2, market) and m.order_higher_ranked(
+        side, o2, o3, market
+    ):
+        return m.order_higher_ranked(side, o1, o3, market)
+    return True
+
+
+def _ubs_valid_rank_transitive(side, o1, o2, o3, market) -> bool:
+    m = load("ubs_dark_pool")
+    valid = (
+        o1.valid_order()
+        and o2.valid_order()
+        and o3.valid_order()
+        and market.valid_market_data()
+    )
+    return not valid or m.rank_transitivity(side, o1, o2, o3, market)
+
+
+GOALS: list[Goal] = [
+    Goal(
+        "river_crossing",
+        GoalKind.INSTANCE,
+        "instance (fun actions -> solved @@ many_steps init_state actions)",
+        lambda: [action_sequences(list(load("river_crossing").Action), 6)],
+        _river_crossing_solved,
+        # The shortest plan has 17 actions, far beyond what enumeration reaches
+        fallback=_river_crossing_plan,
+    ),
+    Goal(
+        "tla/bank_account",
+        GoalKind.VERIFY,
+        "verify (fun state -> state.money > 0 && state.alice_account = 10 && "
+        "state.bob_account = 10 ==> (transfer state).alice_account >= 0)",
+        _bank_states,
+        _bank_transfer_non_negative,
+    ),
+    Goal(
+        "tla/bank_account",
+        GoalKind.VERIFY,
+        "verify (fun state -> state.money > 0 && state.alice_account = 10 && "
+        "state.bob_account = 10 ==> (safe_transfer state).alice_account >= 0)",
+        _bank_states,
+        _bank_safe_transfer_non_negative,
+    ),
+    Goal(
+        "tla/die_hard",
+        GoalKind.INSTANCE,
+        "instance (fun actions -> (many_steps (init_state ()) actions).big = 4)",
+        _die_hard_sequences(6),
+        _die_hard_big_is_4,
+    ),
+    Goal(
+        "tla/die_hard",
+        GoalKind.VERIFY,
+        "verify (fun actions -> List.length actions < 3 ==> "
+        "(many_steps (init_state ()) actions).big <> 4)",
+        # The premise bounds the length, so this domain is exhaustive
+        _die_hard_sequences(2),
+        _die_hard_no_short_solution,
+    ),
+    Goal(
+        "ubs_dark_pool",
+        GoalKind.VERIFY,
+        "verify (fun side o1 o2 o3 market -> if order_higher_ranked side o1 o2 "
+        "market && order_higher_ranked side o2 o3 market then order_higher_ranked "
+        "side o1 o3 market else true)",
+        _ubs_domains,
+        _ubs_rank_transitive,
+    ),
+    Goal(
+        "ubs_dark_pool",
+        GoalKind.VERIFY,
+        "verify (fun side o1 o2 o3 market -> (valid_order o1 && valid_order o2 && "
+        "valid_order o3 && valid_market_data market) ==> rank_transitivity side o1 "
+        "o2 o3 market)",
+        _ubs_domains,
+        _ubs_valid_rank_transitive,
+    ),
+]
+
+
+@cache
+def _domains(goal_index: int) -> list[Sequence]:
+    return GOALS[goal_index].domains()
+
+
+def _decode(domains: list[Sequence], index: int) -> tuple:
+    """The input at a position of the cartesian product, last argument fastest"""
+    values = []
+    for domain in reversed(domains):
+        index, i = divmod(index, len(domain))
+        values.append(domain[i])
+    return tuple(reversed(values))
+
+
+def check_range(
+    goal_index: int, start: int, stop: int
+) -> tuple[int, tuple | None, str | None]:
+    """Evaluate a goal on the inputs with indices in [start, stop)
+
+    Returns:
+        The number of inputs evaluated, and the first finding (inputs and error
+        message, if the code raised) or None
+    """
+    goal = GOALS[goal_index]
+    domains = _domains(goal_index)
+    wanted = goal.kind == GoalKind.INSTANCE
+    for index in range(start, stop):
+        inputs = _decode(domains, index)
+        try:
+            if goal.prop(*inputs) == wanted:
+                return index - start + 1, inputs, None
+        except Exception as e:
+            return index - start + 1, inputs, f"{type(e).__name__}: {e}"
+    return stop - start, None, None
+
+
+def check(
+    goal: Goal, max_workers: int | None = None, chunk_size: int = 20_000
+) -> CheckResult:
+    """Search a goal's bounded domain for a counterexample or witness
+
+    Ranges are evaluated in index order and the search stops at the first range
+    with a finding, so the finding is the same whatever the number of workers.
+    """
+    start_time = time.perf_counter()
+    goal_index = GOALS.index(goal)
+    size = prod(len(domain) for domain in _domains(goal_index))
+    starts = range(0, size, chunk_size)
+    stops = [min(start + chunk_size, size) for start in starts]
+    workers = max_workers or os.cpu_count() or 1
+
+    checked, finding = 0, None
+    if workers == 1 or len(starts) == 1:
+        for start, stop in zip(starts, stops):
+            count, *finding = check_range(goal_index, start, stop)
+            checked += count
+            if finding[0] is not None:
+                break
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(check_range, [goal_index] * len(starts), starts, stops)
+            for count, *finding in results:
+                checked += count
+                if finding[0] is not None:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    break
+
+    inputs, error = finding if finding else (None, None)
+    if inputs is None and goal.kind == GoalKind.INSTANCE and goal.fallback:
+        candidate = goal.fallback()
+        if candidate is not None and goal.prop(*candidate):
+            inputs = candidate
+    if error is not None:
+        status = Status.ERROR
+    elif inputs is not None:
+        status = (
+            Status.WITNESS if goal.kind == GoalKind.INSTANCE else Status.COUNTEREXAMPLE
+        )
+    else:
+        status = (
+            Status.NO_WITNESS_WITHIN_BOUNDS
+            if goal.kind == GoalKind.INSTANCE
+            else Status.HOLDS_WITHIN_BOUNDS
+        )
+    elapsed = time.perf_counter() - start_time
+    return CheckResult(goal, status, checked, inputs, error, elapsed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("examples", nargs="*", help="Only check these examples")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    for goal in GOALS:
+        if args.examples and goal.example not in args.examples:
+            continue
+        result = check(goal, max_workers=args.workers)
+        print(f"{goal.example}: {goal.iml}")
+        print(
+            f"  {result.status.name} after {result.checked:,} inputs "
+            f"in {result.elapsed:.2f}s"
+        )
+        if result.inputs is not None:
+            for value in result.inputs:
+                print(f"    {value}")
+        if result.error is not None:
+            print(f"    raised {result.error}")
@@ -0,0 +1,119 @@
+"""Registry of the examples, each loading its modules on first access.
+
+    import code_logician_examples as cle
+
+    cle.six_swiss.main.match_price(...)
+    cle.tla.die_hard.refactored.apply(...)
+    for name, example in cle.EXAMPLES.items():
+        modules = example.implementations()  # main and, if any, refactored
+
+Importing the package only builds the registry: one small `Example` object per
+example, without reading any file. Tools that only need one module of one
+example no longer pay for the others. An example's module is loaded the first
+time it is read as an attribute (`example.main`, `example.refactored` or any
+other module of the directory such as `example.regions`), through the
+package's `load`. It is loaded under a unique name, so the modules of every
+example can live side by side in one process.
+
+The examples are the repository's own directories, next to this package, so
+install it in development mode (`pip install -e .`); anywhere else, reading a
+module raises ModuleNotFoundError. The only import here is `os`, which the
+interpreter has already loaded, so that importing the package stays cheap;
+`python -m code_logician_examples` measures it.
+"""
+
+import os
+
+__all__ = ["EXAMPLES", "NAMES", "Example", "get"]
+
+# Dotted names, the dots standing for subdirectories
+NAMES = (
+    "six_swiss",
+    "ubs_dark_pool",
+    "river_crossing",
+    "tla.die_hard",
+    "tla.bank_account",
+)
+IMPLEMENTATIONS = ("main", "refactored")
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Example:
+    """An example, its modules loaded on first attribute access"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.directory = name.replace(".", "/")  # Relative to the repository
+
+    def __repr__(self) -> str:
+        return f"Example({self.name!r})"
+
+    def __getattr__(self, module: str):
+        # Only called for attributes not found yet, so once per module
+        path = os.path.join(_ROOT, self.directory, f"{module}.py")
+        if module.startswith("_"):
+            raise AttributeError(f"Example {self.name!r} has no module {module!r}")
+        if not os.path.isdir(os.path.join(_ROOT, self.directory)):
+            # Not beside the repository's examples: a regular install
+            raise ModuleNotFoundError(
+                f"No example directory {self.directory!r} in {_ROOT}: install "
+                "code_logician_examples in development mode, pip install -e ."
+            )
+        if not os.path.exists(path):
+            raise AttributeError(f"Example {self.name!r} has no module {module!r}")
+        from code_logician_examples._loader import load
+
+        loaded = load(self.directory, module)
+        setattr(self, module, loaded)
+        return loaded
+
+    def has(self, module: str) -> bool:
+        """Whether the example has a module, without loading it"""
+        return os.path.exists(os.path.join(_ROOT, self.directory, f"{module}.py"))
+
+    def implementations(self) -> dict:
+        """The main and refactored modules that the example has, loading them"""
+        return {m: getattr(self, m) for m in IMPLEMENTATIONS if self.has(m)}
+
+
+class _Group:
+    """Examples sharing a directory, such as `tla`"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"<examples {self.name}.*>"
+
+
+EXAMPLES = {name: Example(name) for name in NAMES}
+
+
+def _register() -> None:
+    namespace = globals()
+    for name, example in EXAMPLES.items():
+        *groups, last = name.split(".")
+        parent = namespace
+        for group in groups:
+            parent = parent.setdefault(group, _Group(group)).__dict__
+        parent[last] = example
+
+
+_register()
+
+
+def get(name: str) -> Example:
+    """An example by name, dotted ("tla.die_hard") or as a path ("tla/die_hard")"""
+    try:
+        return EXAMPLES[name.replace("/", ".")]
+    except KeyError:
+        raise KeyError(f"Unknown example {name!r}, expected one of {NAMES}") from None
+
+
+def __getattr__(name: str):
+    # The loader's other names, imported only when asked for
+    if name in ("ROOT", "discover", "load", "module_name"):
+        from code_logician_examples import _loader
+
+        return getattr(_loader, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
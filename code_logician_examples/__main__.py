@@ -0,0 +1,64 @@
+"""Startup benchmark: cold import of the registry, then each example's modules.
+
+Every cold import runs in a fresh interpreter under `-X importtime`, which
+reports the time spent importing the package and whatever it imports. The
+package is byte-compiled first, as an installed package would be, so the
+numbers do not include compiling it. Exits with an error if the median cold
+import exceeds the budget.
+
+    python -m code_logician_examples [--runs N] [--budget MS]
+"""
+
+import argparse
+import compileall
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import code_logician_examples
+from code_logician_examples import EXAMPLES
+
+
+def cold_import_ms(module: str) -> float:
+    """Time a fresh interpreter spends importing a module, in milliseconds"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    for line in completed.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        _, cumulative, name = line.split("|")
+        if name.strip() == module:
+            return int(cumulative) / 1000
+    raise RuntimeError(f"{module} not in the import times")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--budget", type=float, default=3.0, help="Milliseconds")
+    args = parser.parse_args()
+
+    compileall.compile_dir(os.path.dirname(code_logician_examples.__file__), quiet=1)
+    times = [cold_import_ms("code_logician_examples") for _ in range(args.runs)]
+    median = statistics.median(times)
+    print(
+        f"import code_logician_examples: median {median:.2f}ms, "
+        f"max {max(times):.2f}ms over {args.runs} runs (budget {args.budget}ms)"
+    )
+
+    for name, example in EXAMPLES.items():
+        loads = []
+        for module in ("main", "refactored"):
+            if example.has(module):
+                start = time.perf_counter()
+                getattr(example, module)
+                loads.append(f"{module} {(time.perf_counter() - start) * 1e3:.1f}ms")
+        print(f"  first access {name:<18} {', '.join(loads)}")
+
+    if median > args.budget:
+        sys.exit(f"Cold import over budget: {median:.2f}ms > {args.budget}ms")
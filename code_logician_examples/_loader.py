@@ -0,0 +1,93 @@
+"""Discover the examples and load their modules side by side.
+
+Every example is a directory with a `main.py`, and its other modules import
+their siblings by bare name (`from main import ...`). Importing two examples
+that way in one process would let the first `main` shadow the second, so tools
+that work across examples load modules from their files instead, each under a
+unique name such as `tla_die_hard_main`. While a module executes, the bare
+names of the siblings it imports point at that example's own modules.
+
+Setting PROFILE_EXAMPLES instruments the loaded modules (see `instrument`).
+
+The examples are the repository's directories next to the package, so the
+package only finds them when installed in development mode (`pip install -e
+.`). Anywhere else ROOT holds no example, and loading one says so.
+"""
+
+import ast
+import importlib.util
+import os
+import sys
+from pathlib import Path
+from types import ModuleType
+
+ROOT = Path(__file__).parent.parent.resolve()
+
+
+def _require_examples() -> None:
+    if not any(ROOT.glob("*/main.py")) and not any(ROOT.glob("*/*/main.py")):
+        raise ModuleNotFoundError(
+            f"No examples in {ROOT}: install code_logician_examples in "
+            "development mode from the repository, pip install -e ."
+        )
+
+
+def discover() -> list[str]:
+    """Example directories relative to the repository root, e.g. "tla/die_hard" """
+    _require_examples()
+    return sorted(
+        path.parent.relative_to(ROOT).as_posix() for path in ROOT.glob("**/main.py")
+    )
+
+
+def module_name(example: str, module: str = "main") -> str:
+    return f"{example.replace('/', '_')}_{module}"
+
+
+def _sibling_imports(path: Path) -> list[str]:
+    """Modules of the same example that the file at path imports"""
+    names = set()
+    for node in ast.walk(ast.parse(path.read_text())):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.add(node.module.split(".")[0])
+    return sorted(
+        name
+        for name in names
+        if name != path.stem and (path.parent / f"{name}.py").exists()
+    )
+
+
+def load(example: str, module: str = "main") -> ModuleType:
+    """Load (once) a module of an example"""
+    name = module_name(example, module)
+    if name in sys.modules:
+        return sys.modules[name]
+    path = ROOT / example / f"{module}.py"
+    if not path.exists():
+        _require_examples()
+        raise ModuleNotFoundError(f"No module {module!r} in example {example!r}")
+    siblings = {sibling: load(example, sibling) for sibling in _sibling_imports(path)}
+
+    spec = importlib.util.spec_from_file_location(name, path)
+    loaded = importlib.util.module_from_spec(spec)
+    sys.modules[name] = loaded
+    shadowed = {sibling: sys.modules.get(sibling) for sibling in siblings}
+    sys.modules.update(siblings)
+    try:
+        spec.loader.exec_module(loaded)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    finally:
+        for sibling, previous in shadowed.items():
+            if previous is None:
+                del sys.modules[sibling]
+            else:
+                sys.modules[sibling] = previous
+    if os.environ.get("PROFILE_EXAMPLES"):
+        from code_logician_examples.instrument import instrument_from_env
+
+        instrument_from_env(example, module, loaded)
+    return loaded
@@ -0,0 +1,200 @@
+"""Opt-in call profiling for the hot paths of the examples.
+
+Instrumentation works by replacing functions (or methods, as "Class.method")
+in a loaded module with timing wrappers, and putting the originals back
+afterwards. Nothing is wrapped unless it is asked for, so code that is not
+being profiled runs exactly as written. Calls made through a module global,
+such as `many_steps` calling `one_step`, go through the wrapper.
+
+For each instrumented function a `Profiler` records the number of calls, the
+cumulative time (including callees, counted once for recursive calls), the
+self time (excluding instrumented callees) and the net number of memory blocks
+still allocated when the call returns, from `sys.getallocatedblocks`. Results
+export as a JSON summary and as collapsed stacks ("a;b;c <microseconds>" per
+line), the input format of flamegraph.pl, inferno and speedscope.
+
+Either use the context manager:
+
+    with profile(main, "one_step", "State.process_eating") as profiler:
+        main.many_steps(main.init_state, actions)
+    print(profiler.collapsed())
+
+or set PROFILE_EXAMPLES before running a tool built on
+`code_logician_examples.load`, which instruments the modules as they are loaded
+and writes PROFILE_OUTPUT.json and PROFILE_OUTPUT.collapsed when the process
+exits:
+
+    PROFILE_EXAMPLES=all python benchmarks.py
+    PROFILE_EXAMPLES="six_swiss:match_price;tla/die_hard:apply" python ...
+"""
+
+import atexit
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from functools import wraps
+from types import ModuleType
+
+# The functions instrumented by PROFILE_EXAMPLES=all, per example module
+DEFAULT_TARGETS: dict[tuple[str, str], list[str]] = {
+    ("river_crossing", "main"): ["many_steps", "one_step", "apply_action"],
+    ("river_crossing", "refactored"): ["many_steps", "one_step", "apply_action"],
+    ("six_swiss", "main"): ["match_price"],
+    ("six_swiss", "refactored"): ["match_price"],
+    ("tla/die_hard", "main"): ["many_steps", "apply"],
+    ("tla/die_hard", "refactored"): ["many_steps", "apply"],
+    ("ubs_dark_pool", "main"): ["order_higher_ranked", "priority_price"],
+}
+
+
+@dataclass
+class FunctionStats:
+    calls: int = 0
+    cumulative_ns: int = 0
+    self_ns: int = 0
+    allocated_blocks: int = 0  # Net blocks still allocated after the calls
+
+
+class Profiler:
+    def __init__(self):
+        self.stats: dict[str, FunctionStats] = defaultdict(FunctionStats)
+        # Self time per stack of instrumented functions, outermost first
+        self.stacks: dict[tuple[str, ...], int] = defaultdict(int)
+        self._stack: list[str] = []
+        self._child_ns: list[int] = []
+
+    def wrap(self, name: str, function: Callable) -> Callable:
+        """A wrapper recording the calls to function under name"""
+        stats = self.stats[name]
+        stack = self._stack
+        child_ns = self._child_ns
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            recursive = name in stack
+            stack.append(name)
+            child_ns.append(0)
+            blocks = sys.getallocatedblocks()
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter_ns() - start
+                stats.allocated_blocks += sys.getallocatedblocks() - blocks
+                self_ns = elapsed - child_ns.pop()
+                self.stacks[tuple(stack)] += self_ns
+                stack.pop()
+                if child_ns:
+                    child_ns[-1] += elapsed
+                stats.calls += 1
+                stats.self_ns += self_ns
+                if not recursive:
+                    stats.cumulative_ns += elapsed
+
+        return wrapper
+
+    def summary(self) -> dict[str, dict[str, int]]:
+        return {name: asdict(stats) for name, stats in self.stats.items()}
+
+    def collapsed(self) -> str:
+        """The stacks in collapsed format, weighted by self time in microseconds"""
+        return "".join(
+            f"{';'.join(stack)} {ns // 1000}\n"
+            for stack, ns in sorted(self.stacks.items())
+        )
+
+    def write(self, prefix: str) -> None:
+        """Write prefix.json and prefix.collapsed"""
+        with open(f"{prefix}.json", "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        with open(f"{prefix}.collapsed", "w") as f:
+            f.write(self.collapsed())
+
+
+def _resolve(module: ModuleType, target: str) -> tuple[object, str]:
+    """The object holding the attribute named by "function" or "Class.method" """
+    *path, attribute = target.split(".")
+    owner = module
+    for part in path:
+        owner = getattr(owner, part)
+    return owner, attribute
+
+
+def instrument(
+    profiler: Profiler, module: ModuleType, *targets: str, label: str | None = None
+) -> Callable[[], None]:
+    """Wrap functions of a module in place
+
+    Args:
+        label: Prefix of the recorded names, the module name by default
+
+    Returns:
+        A function undoing the instrumentation
+    """
+    label = module.__name__ if label is None else label
+    originals = []
+    for target in targets:
+        owner, attribute = _resolve(module, target)
+        original = owner.__dict__[attribute]
+        originals.append((owner, attribute, original))
+        function = original.__func__ if isinstance(original, staticmethod) else original
+        wrapper = profiler.wrap(f"{label}.{target}", function)
+        if isinstance(original, staticmethod):
+            wrapper = staticmethod(wrapper)
+        setattr(owner, attribute, wrapper)
+
+    def restore() -> None:
+        for owner, attribute, original in reversed(originals):
+            setattr(owner, attribute, original)
+
+    return restore
+
+
+@contextmanager
+def profile(
+    module: ModuleType, *targets: str, profiler: Profiler | None = None
+) -> Iterator[Profiler]:
+    """Instrument functions of a module for the duration of the block"""
+    profiler = Profiler() if profiler is None else profiler
+    restore = instrument(profiler, module, *targets)
+    try:
+        yield profiler
+    finally:
+        restore()
+
+
+def targets_from_env(example: str, module: str) -> list[str]:
+    """The functions PROFILE_EXAMPLES asks to instrument in a module
+
+    The variable holds "all", or ";"-separated "example[/module]:f,g" entries.
+    """
+    spec = os.environ.get("PROFILE_EXAMPLES", "")
+    if spec == "all":
+        return DEFAULT_TARGETS.get((example, module), [])
+    targets = []
+    for entry in filter(None, spec.split(";")):
+        where, _, names = entry.partition(":")
+        if where == f"{example}/{module}" or (where == example and module == "main"):
+            targets.extend(filter(None, names.split(",")))
+    return targets
+
+
+_env_profiler: Profiler | None = None
+
+
+def instrument_from_env(example: str, name: str, module: ModuleType) -> None:
+    """Instrument a freshly loaded example module as PROFILE_EXAMPLES asks"""
+    global _env_profiler
+    targets = targets_from_env(example, name)
+    if not targets:
+        return
+    if _env_profiler is None:
+        _env_profiler = Profiler()
+        prefix = os.environ.get("PROFILE_OUTPUT", "profile")
+        atexit.register(_env_profiler.write, prefix)
+    instrument(_env_profiler, module, *targets, label=f"{example}/{name}")
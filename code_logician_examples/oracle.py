@@ -0,0 +1,124 @@
+"""Distance-to-goal tables for the examples with a small, finite state space.
+
+A planner that repeatedly asks for the best next action should not search
+again from every state. When every state of a model can be numbered, one
+reverse breadth-first search from the solved states over its transitions gives,
+for every state, its distance to the goal and an action starting a shortest
+plan. Both are stored in byte arrays indexed by state number: a lookup is O(1)
+and a whole optimal plan is a walk through the table.
+
+An example describes its model with a `StateSpace` and gets an `Oracle` from
+`load_oracle`, which saves the table under the example's `__pycache__`. The
+file is keyed by a hash of the example's `main.py`, of the module numbering its
+states, of this module and of FORMAT_VERSION, so it is rebuilt when the model,
+the numbering, the search or the file layout changes.
+"""
+
+import hashlib
+import inspect
+import os
+from array import array
+from collections import deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+__all__ = ["NO_ACTION", "UNREACHABLE", "Oracle", "StateSpace", "load_oracle"]
+
+FORMAT_VERSION = 1  # Bump when the layout of the saved table changes
+UNREACHABLE = 255  # Distance of the states from which the goal cannot be reached
+NO_ACTION = 0  # Next action of the solved states and of unreachable ones
+
+
+@dataclass(frozen=True)
+class StateSpace:
+    """The states and transitions of an example's model"""
+
+    main: ModuleType  # The example's model, whose source keys the saved table
+    states: Callable[[], list]  # Every state, in index order
+    index: Callable[[Any], int]  # The number of a state, from 0
+    actions: Sequence
+    step: Callable[[Any, Any], Any]  # (state, action) -> next state
+    solved: Callable[[Any], bool]
+
+
+class Oracle:
+    def __init__(self, space: StateSpace, distances: array, actions: array):
+        self.space = space
+        self.distances = distances  # Actions to the goal, or UNREACHABLE
+        self.actions = actions  # 1 + position in space.actions, or NO_ACTION
+
+    @staticmethod
+    def build(space: StateSpace) -> "Oracle":
+        states = space.states()
+        predecessors: list[list[tuple[int, int]]] = [[] for _ in states]
+        for i, state in enumerate(states):
+            for a, action in enumerate(space.actions):
+                j = space.index(space.step(state, action))
+                if j != i:
+                    predecessors[j].append((i, a))
+
+        distances = array("B", [UNREACHABLE]) * len(states)
+        actions = array("B", [NO_ACTION]) * len(states)
+        queue = deque(i for i, state in enumerate(states) if space.solved(state))
+        for i in queue:
+            distances[i] = 0
+        while queue:
+            j = queue.popleft()
+            for i, a in predecessors[j]:
+                if distances[i] == UNREACHABLE:
+                    distances[i] = distances[j] + 1
+                    actions[i] = a + 1
+                    queue.append(i)
+        return Oracle(space, distances, actions)
+
+    def distance(self, state) -> int | None:
+        """Length of the shortest plan from state, None if there is none"""
+        distance = self.distances[self.space.index(state)]
+        return None if distance == UNREACHABLE else distance
+
+    def best_action(self, state):
+        """First action of a shortest plan, None if solved or unsolvable"""
+        action = self.actions[self.space.index(state)]
+        return None if action == NO_ACTION else self.space.actions[action - 1]
+
+    def plan(self, state) -> list | None:
+        """A shortest plan from state, None if there is none"""
+        if self.distance(state) is None:
+            return None
+        plan = []
+        while (action := self.best_action(state)) is not None:
+            plan.append(action)
+            state = self.space.step(state, action)
+        return plan
+
+
+def load_oracle(space: StateSpace, cache_dir: Path | None) -> Oracle:
+    """Build the oracle, or reload the table saved for the current model"""
+    if cache_dir is None:
+        return Oracle.build(space)
+    files = dict.fromkeys([space.main.__file__, inspect.getfile(space.index), __file__])
+    digest = hashlib.sha256(f"{FORMAT_VERSION}".encode())
+    for file in files:
+        digest.update(Path(file).read_bytes())
+    path = cache_dir / f"oracle.{digest.hexdigest()[:16]}.bin"
+    n_states = len(space.states())
+    try:
+        with open(path, "rb") as f:
+            distances, actions = array("B"), array("B")
+            distances.fromfile(f, n_states)
+            actions.fromfile(f, n_states)
+            return Oracle(space, distances, actions)
+    except (OSError, EOFError):
+        pass
+
+    oracle = Oracle.build(space)
+    cache_dir.mkdir(exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        oracle.distances.tofile(f)
+        oracle.actions.tofile(f)
+    os.replace(tmp, path)
+    return oracle
@@ -0,0 +1,51 @@
+"""Keep each example's bare ``from main import ...`` pointing at its own directory.
+
+Every example is a loose set of scripts that import their siblings by bare name
+(``main``, ``refactored``, ...). When one pytest session collects tests from
+several example directories, the first ``main`` imported would otherwise shadow
+all the others. Before a test module is imported, and again before each of its
+tests runs, the sibling modules of every other example are swapped out of
+``sys.modules`` and those of the test's own example are swapped back in.
+"""
+
+import sys
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+
+ROOT = Path(__file__).parent.resolve()
+
+_stashed: dict[Path, dict[str, ModuleType]] = {}
+
+
+def _example_dir(module: ModuleType) -> Path | None:
+    """Directory of a bare-named example module, None for anything else"""
+    spec = getattr(module, "__spec__", None)
+    file = getattr(module, "__file__", None)
+    if spec is None or spec.parent or file is None:
+        return None
+    path = Path(file).resolve()
+    module_dir = path.parent
+    if module.__name__ != path.stem:
+        return None  # Loaded under a unique name by code_logician_examples.load
+    if module_dir == ROOT or ROOT not in module_dir.parents:
+        return None
+    return module_dir
+
+
+def _activate(example_dir: Path) -> None:
+    for name, module in list(sys.modules.items()):
+        module_dir = _example_dir(module)
+        if module_dir is not None and module_dir != example_dir:
+            _stashed.setdefault(module_dir, {})[name] = sys.modules.pop(name)
+    sys.modules.update(_stashed.pop(example_dir, {}))
+
+
+def pytest_collectstart(collector: pytest.Collector) -> None:
+    if isinstance(collector, pytest.Module):
+        _activate(collector.path.parent.resolve())
+
+
+def pytest_runtest_setup(item: pytest.Item) -> None:
+    _activate(item.path.parent.resolve())
@@ -0,0 +1,312 @@
+"""A compact, columnar event-log format for replaying order flow.
+
+A JSONL log of orders spends most of its bytes repeating field names and
+writing numbers as text, and reading it back means parsing every record in
+Python. Here a log stores a `Batch` (see generators.py) of orders in time
+order, as chunks of columns. Each column of a chunk is a plain little-endian
+array of the narrowest integer type that fits it:
+
+    - integer columns are stored as differences from the previous value
+      (delta), or as offsets from the chunk's smallest value (frame of
+      reference), whichever fits a narrower type. Ids and times in arrival
+      order become deltas of a byte or two;
+    - float columns that are whole multiples of a tick, such as prices, are
+      stored as integer ticks, then as integers; any other float column is
+      stored as it is;
+    - enum columns (`OrderType`, `OrderPeg`) are stored as member indices,
+      with the member names in the footer. Reading maps them back by name,
+      so reordering an enum does not corrupt old logs.
+
+Decoding a chunk is a few NumPy operations per column (`frombuffer`, `cumsum`
+or an add, a multiply), with no Python loop over records. The footer records
+each chunk's first and last time, so reading a time range skips the other
+chunks without decoding them.
+
+    file   := MAGIC chunk* footer length MAGIC
+    footer := JSON: the example and type of the records, the columns and
+              their encodings, and for each chunk its rows, time range and
+              the offset, dtype and parameter of each of its columns
+    length := footer size, 8 bytes little-endian
+
+    python eventlog.py [n]
+"""
+
+import json
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+
+from code_logician_examples import load
+from generators import TICK, Batch
+
+MAGIC = b"CLEVLOG1"
+CHUNK_ROWS = 1 << 16
+_SIGNED = [np.dtype(t) for t in ("<i1", "<i2", "<i4", "<i8")]
+_UNSIGNED = [np.dtype(t) for t in ("<u1", "<u2", "<u4", "<u8")]
+
+
+def _narrowest(low: int, high: int, dtypes: list[np.dtype]) -> np.dtype:
+    for dtype in dtypes:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return dtypes[-1]
+
+
+def _encode_integers(values: np.ndarray) -> tuple[str, np.ndarray, int]:
+    """Encoding, stored array and parameter (first value or base) of a column"""
+    base = int(values.min())
+    offsets = _narrowest(0, int(values.max()) - base, _UNSIGNED)
+    deltas = np.diff(values, prepend=values[:1])
+    delta = _narrowest(int(deltas.min()), int(deltas.max()), _SIGNED)
+    if delta.itemsize < offsets.itemsize:
+        return "delta", deltas.astype(delta), int(values[0])
+    return "offset", (values - base).astype(offsets), base
+
+
+def _decode_integers(encoding: str, stored: np.ndarray, parameter: int) -> np.ndarray:
+    if encoding == "delta":
+        values = np.cumsum(stored, dtype=np.int64)
+    else:
+        values = stored.astype(np.int64)
+    values += parameter
+    return values
+
+
+def write(
+    path: Path | str,
+    batch: Batch,
+    example: str,
+    time: str,
+    chunk_rows: int = CHUNK_ROWS,
+    tick: float = TICK,
+) -> None:
+    """Write a batch in time order as an event log
+
+    Args:
+        example: The example of the batch's type, such as "ubs_dark_pool"
+        time: The time column, which must be non-decreasing
+    """
+    columns = batch.columns
+    times = columns[time]
+    if len(times) and (np.diff(times) < 0).any():
+        raise ValueError(f"Column {time!r} is not in time order")
+    kinds = {}
+    for name, column in columns.items():
+        if name in batch.enums:
+            kinds[name] = {
+                "kind": "enum",
+                "members": [m.name for m in batch.enums[name]],
+            }
+        elif column.dtype.kind == "f":
+            on_tick = np.array_equal(np.rint(column / tick) * tick, column)
+            kinds[name] = (
+                {"kind": "ticks", "tick": tick} if on_tick else {"kind": "raw"}
+            )
+        else:
+            kinds[name] = {"kind": "integers"}
+
+    chunks = []
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        for start in range(0, len(batch), chunk_rows):
+            stop = min(start + chunk_rows, len(batch))
+            chunk = {
+                "rows": stop - start,
+                "first_time": int(times[start]),
+                "last_time": int(times[stop - 1]),
+                "columns": {},
+            }
+            for name, column in columns.items():
+                values = column[start:stop]
+                kind = kinds[name]["kind"]
+                if kind == "enum":
+                    encoding, stored, parameter = "codes", values.astype("<u1"), 0
+                elif kind == "raw":
+                    encoding, stored, parameter = "raw", values.astype("<f8"), 0
+                else:
+                    if kind == "ticks":
+                        values = np.rint(values / tick).astype(np.int64)
+                    encoding, stored, parameter = _encode_integers(values)
+                chunk["columns"][name] = [
+                    file.tell(),
+                    stored.dtype.str,
+                    encoding,
+                    parameter,
+                ]
+                file.write(stored.tobytes())
+            chunks.append(chunk)
+        footer = json.dumps(
+            {
+                "example": example,
+                "type": batch.factory.__name__,
+                "time": time,
+                "columns": kinds,
+                "enums": {n: e.__name__ for n, e in batch.enums.items()},
+                "chunks": chunks,
+            }
+        ).encode()
+        file.write(footer)
+        file.write(len(footer).to_bytes(8, "little"))
+        file.write(MAGIC)
+
+
+class EventLog:
+    """An event log opened for reading, chunk by chunk"""
+
+    def __init__(self, path: Path | str, module=None):
+        """
+        Args:
+            module: The example's module defining the types of the records,
+                loaded from the example named in the log by default
+        """
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not an event log")
+            file.seek(-8 - len(MAGIC), 2)
+            length = int.from_bytes(file.read(8), "little")
+            if file.read() != MAGIC:
+                raise ValueError(f"{self.path} is truncated")
+            file.seek(-8 - len(MAGIC) - length, 2)
+            self.footer = json.loads(file.read(length))
+        m = module or load(self.footer["example"])
+        self.factory = getattr(m, self.footer["type"])
+        self.enums = {n: getattr(m, e) for n, e in self.footer["enums"].items()}
+        self.time = self.footer["time"]
+        self._chunks = self.footer["chunks"]
+        # Maps the stored member indices of each enum column to the current ones
+        self._codes = {}
+        for name, column in self.footer["columns"].items():
+            if column["kind"] == "enum":
+                members = list(self.enums[name])
+                indices = [
+                    members.index(self.enums[name][m]) for m in column["members"]
+                ]
+                self._codes[name] = np.array(indices, dtype=np.int8)
+
+    def __len__(self) -> int:
+        return sum(chunk["rows"] for chunk in self._chunks)
+
+    def _decode(self, file, chunk: dict) -> dict[str, np.ndarray]:
+        columns = {}
+        for name, (offset, dtype, encoding, parameter) in chunk["columns"].items():
+            dtype = np.dtype(dtype)
+            file.seek(offset)
+            stored = np.frombuffer(file.read(chunk["rows"] * dtype.itemsize), dtype)
+            kind = self.footer["columns"][name]
+            if encoding == "codes":
+                columns[name] = self._codes[name][stored]
+            elif encoding == "raw":
+                columns[name] = stored.astype(np.float64)
+            else:
+                values = _decode_integers(encoding, stored, parameter)
+                if kind["kind"] == "ticks":
+                    values = values * kind["tick"]
+                columns[name] = values
+        return columns
+
+    def chunks(
+        self, start: int | None = None, stop: int | None = None
+    ) -> Iterator[Batch]:
+        """The records with start <= time < stop, a batch per chunk read
+
+        Chunks entirely outside the range are skipped without being read.
+        """
+        with open(self.path, "rb") as file:
+            for chunk in self._chunks:
+                if start is not None and chunk["last_time"] < start:
+                    continue
+                if stop is not None and chunk["first_time"] >= stop:
+                    break
+                columns = self._decode(file, chunk)
+                times = columns[self.time]
+                low = 0 if start is None else np.searchsorted(times, start, "left")
+                high = (
+                    len(times) if stop is None else np.searchsorted(times, stop, "left")
+                )
+                if low > 0 or high < len(times):
+                    columns = {n: c[low:high] for n, c in columns.items()}
+                if high > low:
+                    yield Batch(self.factory, columns, self.enums)
+
+    def read(self, start: int | None = None, stop: int | None = None) -> Batch:
+        """The records with start <= time < stop, as one batch"""
+        batches = list(self.chunks(start, stop))
+        names = list(self.footer["columns"])
+        if not batches:
+            columns = {name: np.zeros(0, dtype=np.int64) for name in names}
+        else:
+            columns = {
+                name: np.concatenate([b.columns[name] for b in batches])
+                for name in names
+            }
+        return Batch(self.factory, columns, self.enums)
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    import time
+
+    from generators import six_swiss_orders, ubs_orders
+
+    def jsonl_write(path: Path, batch: Batch) -> None:
+        names = list(batch.columns)
+        columns = [
+            [v.name for v in batch.values(n)] if n in batch.enums else batch.values(n)
+            for n in names
+        ]
+        with open(path, "w") as file:
+            file.writelines(
+                json.dumps(dict(zip(names, row))) + "\n" for row in zip(*columns)
+            )
+
+    def jsonl_read(path: Path) -> dict[str, list]:
+        with open(path) as file:
+            records = [json.loads(line) for line in file]
+        return {name: [r[name] for r in records] for name in records[0]}
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    six_swiss = six_swiss_orders(n)
+    by_time = np.argsort(six_swiss.columns["order_time"], kind="stable")
+    six_swiss = Batch(
+        six_swiss.factory,
+        {name: c[by_time] for name, c in six_swiss.columns.items()},
+        six_swiss.enums,
+    )
+    logs = [
+        ("ubs_dark_pool", ubs_orders(n), "time"),
+        ("six_swiss", six_swiss, "order_time"),
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        for example, batch, time_column in logs:
+            log_path = Path(directory) / f"{example}.log"
+            jsonl_path = Path(directory) / f"{example}.jsonl"
+            write(log_path, batch, example, time_column)
+            jsonl_write(jsonl_path, batch)
+            log = EventLog(log_path)
+
+            start = time.perf_counter()
+            rows = sum(len(b) for b in log.chunks())
+            decoded = time.perf_counter() - start
+            start = time.perf_counter()
+            jsonl_read(jsonl_path)
+            parsed = time.perf_counter() - start
+            # A window of 1% of the time range, near the end
+            times = batch.columns[time_column]
+            low = int(times[int(n * 0.9)])
+            high = low + max(1, int((times[-1] - times[0]) // 100))
+            start = time.perf_counter()
+            window = log.read(low, high)
+            sought = time.perf_counter() - start
+
+            log_size, jsonl_size = log_path.stat().st_size, jsonl_path.stat().st_size
+            print(
+                f"{example:<14} {n:,} orders: {log_size / 1e6:.1f}MB "
+                f"({log_size / n:.1f} bytes/order) against {jsonl_size / 1e6:.1f}MB "
+                f"of JSONL; decoded {rows / decoded / 1e6:.1f}M orders/sec against "
+                f"{n / parsed / 1e6:.2f}M/sec; {len(window):,} orders in a time "
+                f"window in {sought * 1e3:.1f}ms"
+            )
@@ -0,0 +1,362 @@
+"""Seeded, columnar input generators for the examples' types.
+
+Fuzzers, benchmarks and differential tests need many `Order`s, `MarketData`s,
+`OrderBook`s and puzzle `State`s. Building them one object at a time with
+`random` is slow, so here every field is drawn for the whole batch at once as
+a NumPy column. Enum fields are columns of member indices. A `Batch` keeps the
+columns and only builds objects of the example's own classes when asked, one
+at a time or all at once. Code that can work on the columns directly never
+pays for the objects.
+
+Every generator takes the number of inputs, a seed (or a NumPy `Generator`)
+and `edge`, the probability with which each input is pushed onto a boundary
+of its validity constraints. Examples are an order whose leaves_qty is 0 or
+its whole qty, an order arriving at the same time as the previous one, or a
+market whose quotes are a single tick apart. The generated inputs always
+satisfy the constraints:
+
+    - ubs_dark_pool orders pass `valid_order`, with ids and times in arrival
+      order, and market data passes `valid_market_data`;
+    - six_swiss books are sorted in priority order: market orders first, then
+      by price (highest buy, lowest sell), then oldest first;
+    - river_crossing states have at most one good in the boat and never an
+      eaten wolf, and die_hard states fit in the jugs.
+
+    python generators.py [n]
+"""
+
+from collections.abc import Callable, Iterator
+from enum import Enum
+from types import ModuleType
+
+import numpy as np
+
+from code_logician_examples import load
+
+TICK = 0.5  # Prices are multiples of TICK, so equal prices compare equal
+Seed = int | np.random.Generator
+
+
+class Batch:
+    """A batch of objects stored as columns, built into objects on demand"""
+
+    def __init__(
+        self,
+        factory: Callable,
+        columns: dict[str, np.ndarray],
+        enums: dict[str, type[Enum]] | None = None,
+    ):
+        self.factory = factory
+        # In the order of the factory's positional parameters
+        self.columns = columns
+        self.enums = enums or {}  # Enum of the columns of member indices
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values())))
+
+    def __getitem__(self, index):
+        """The object at an index, or a batch sharing the columns for a slice"""
+        if isinstance(index, slice):
+            columns = {name: c[index] for name, c in self.columns.items()}
+            return Batch(self.factory, columns, self.enums)
+        return self.factory(
+            *(self._value(name, c[index]) for name, c in self.columns.items())
+        )
+
+    def _value(self, name: str, value):
+        if name in self.enums:
+            return list(self.enums[name])[value]
+        return value.item()
+
+    def values(self, name: str) -> list:
+        """A column as Python values, with enum members in enum columns"""
+        column = self.columns[name]
+        if name in self.enums:
+            return np.array(list(self.enums[name]), dtype=object)[column].tolist()
+        return column.tolist()
+
+    def objects(self) -> list:
+        columns = [self.values(name) for name in self.columns]
+        return [self.factory(*row) for row in zip(*columns)]
+
+    def __iter__(self) -> Iterator:
+        return iter(self.objects())
+
+
+class Books:
+    """A batch of order books, whose orders are stored side by side
+
+    The buys of book k are `buys[buy_offsets[k]:buy_offsets[k + 1]]`, and the
+    same goes for the sells.
+    """
+
+    def __init__(
+        self,
+        factory: Callable,
+        buys: Batch,
+        sells: Batch,
+        buy_offsets: np.ndarray,
+        sell_offsets: np.ndarray,
+    ):
+        self.factory = factory
+        self.buys = buys
+        self.sells = sells
+        self.buy_offsets = buy_offsets
+        self.sell_offsets = sell_offsets
+
+    def __len__(self) -> int:
+        return len(self.buy_offsets) - 1
+
+    def __getitem__(self, k: int):
+        buys = self.buys[self.buy_offsets[k] : self.buy_offsets[k + 1]]
+        sells = self.sells[self.sell_offsets[k] : self.sell_offsets[k + 1]]
+        return self.factory(buys.objects(), sells.objects())
+
+    def objects(self) -> list:
+        buys, sells = self.buys.objects(), self.sells.objects()
+        bo, so = self.buy_offsets.tolist(), self.sell_offsets.tolist()
+        return [
+            self.factory(buys[bo[k] : bo[k + 1]], sells[so[k] : so[k + 1]])
+            for k in range(len(self))
+        ]
+
+    def __iter__(self) -> Iterator:
+        return iter(self.objects())
+
+
+def _edge_mask(rng: np.random.Generator, n: int, edge: float) -> np.ndarray:
+    if not edge:
+        return np.zeros(n, dtype=bool)
+    return rng.random(n, dtype=np.float32) < edge
+
+
+def _below(rng: np.random.Generator, high: np.ndarray) -> np.ndarray:
+    """Integers in [0, high) for an array of bounds
+
+    Scaling uniform floats is several times faster than `integers` with an
+    array of bounds, at the cost of a bias far below anything a test can see.
+    """
+    return (rng.random(len(high)) * high).astype(high.dtype)
+
+
+def _codes(rng: np.random.Generator, enum: type[Enum], n: int) -> np.ndarray:
+    return rng.integers(0, len(enum), n, dtype=np.int8)
+
+
+# ubs_dark_pool
+
+
+def ubs_orders(
+    n: int, seed: Seed = 0, edge: float = 0.05, module: ModuleType | None = None
+) -> Batch:
+    """Valid orders in arrival order: ids 0 to n - 1 and non-decreasing times
+
+    Boundaries: qty of 1, leaves_qty of 0 or qty, min_qty of qty, the lowest
+    price, and the same time as the previous order.
+    """
+    m = module or load("ubs_dark_pool")
+    rng = np.random.default_rng(seed)
+    qty = rng.integers(1, 101, n)
+    qty[_edge_mask(rng, n, edge)] = 1
+    leaves_qty = _below(rng, qty + 1)
+    to_zero, to_qty = _edge_mask(rng, n, edge), _edge_mask(rng, n, edge)
+    leaves_qty[to_zero] = 0
+    leaves_qty[to_qty] = qty[to_qty]
+    min_qty = _below(rng, qty + 1)
+    to_qty = _edge_mask(rng, n, edge)
+    min_qty[to_qty] = qty[to_qty]
+    price = rng.integers(1, 11, n) * TICK
+    price[_edge_mask(rng, n, edge)] = TICK
+    gaps = rng.integers(1, 4, n)
+    gaps[_edge_mask(rng, n, edge)] = 0
+    return Batch(
+        m.Order,
+        {
+            "id": np.arange(n),
+            "peg": _codes(rng, m.OrderPeg, n),
+            "client_id": rng.integers(0, 10, n),
+            "order_type": _codes(rng, m.OrderType, n),
+            "qty": qty,
+            "min_qty": min_qty,
+            "leaves_qty": leaves_qty,
+            "price": price,
+            "time": np.cumsum(gaps),
+        },
+        {"peg": m.OrderPeg, "order_type": m.OrderType},
+    )
+
+
+def ubs_market_data(
+    n: int, seed: Seed = 0, edge: float = 0.05, module: ModuleType | None = None
+) -> Batch:
+    """Valid market data, 0 < l_down < nbb < nbo < l_up, overlapping the order
+    prices of `ubs_orders`
+
+    Boundary: consecutive levels a single tick apart.
+    """
+    m = module or load("ubs_dark_pool")
+    rng = np.random.default_rng(seed)
+    l_down = rng.integers(1, 4, n) * TICK
+    gaps = rng.integers(1, 4, (3, n)) * TICK
+    gaps[:, _edge_mask(rng, n, edge)] = TICK
+    nbb = l_down + gaps[0]
+    nbo = nbb + gaps[1]
+    return Batch(
+        m.MarketData,
+        {"nbb": nbb, "nbo": nbo, "l_up": nbo + gaps[2], "l_down": l_down},
+    )
+
+
+# six_swiss
+
+
+def six_swiss_orders(
+    n: int, seed: Seed = 0, edge: float = 0.05, module: ModuleType | None = None
+) -> Batch:
+    """Orders priced around 100, with ids 0 to n - 1 and random times
+
+    Boundaries: qty of 1 and a price of exactly 100.
+    """
+    m = module or load("six_swiss")
+    rng = np.random.default_rng(seed)
+    qty = rng.integers(1, 101, n)
+    qty[_edge_mask(rng, n, edge)] = 1
+    price = rng.integers(190, 211, n) * TICK
+    price[_edge_mask(rng, n, edge)] = 100.0
+    return Batch(
+        m.Order,
+        {
+            "order_id": np.arange(n),
+            "order_type": _codes(rng, m.OrderType, n),
+            "order_qty": qty,
+            "order_price": price,
+            "order_time": rng.integers(0, 1000, n),
+        },
+        {"order_type": m.OrderType},
+    )
+
+
+def _sort_side(
+    orders: Batch, book: np.ndarray, market_code: int, descending: bool
+) -> Batch:
+    """Orders grouped by book, each book's side in priority order
+
+    The four sort keys are packed into one integer, since prices are whole
+    ticks and times are small: a single argsort is much faster than lexsort.
+    """
+    c = orders.columns
+    if not len(book):
+        return orders
+    ticks = np.rint(c["order_price"] / TICK).astype(np.int64)
+    if descending:
+        ticks = -ticks
+    ticks -= ticks.min()
+    time = c["order_time"]
+    not_market = c["order_type"] != market_code
+    key = book * 2 + not_market
+    key = key * (int(ticks.max()) + 1) + ticks
+    key = key * (int(time.max()) + 1) + time
+    order = np.argsort(key, kind="stable")
+    return Batch(
+        orders.factory, {name: v[order] for name, v in c.items()}, orders.enums
+    )
+
+
+def six_swiss_books(
+    n: int,
+    seed: Seed = 0,
+    edge: float = 0.05,
+    max_depth: int = 4,
+    module: ModuleType | None = None,
+) -> Books:
+    """Order books with up to max_depth orders per side, sorted by priority
+
+    Boundaries: sides with no order or a single one, and the boundaries of
+    `six_swiss_orders`.
+    """
+    m = module or load("six_swiss")
+    rng = np.random.default_rng(seed)
+    depths = rng.integers(0, max_depth + 1, (2, n))
+    edges = _edge_mask(rng, n, edge)
+    depths[:, edges] = rng.integers(0, 2, (2, int(edges.sum())))
+    market = list(m.OrderType).index(m.OrderType.MARKET)
+    sides = []
+    for side, depth in enumerate(depths):
+        orders = six_swiss_orders(int(depth.sum()), rng, edge, m)
+        book = np.repeat(np.arange(n), depth)
+        sides.append(_sort_side(orders, book, market, descending=side == 0))
+    offsets = np.zeros((2, n + 1), dtype=np.int64)
+    np.cumsum(depths, axis=1, out=offsets[:, 1:])
+    return Books(m.OrderBook, sides[0], sides[1], offsets[0], offsets[1])
+
+
+# Puzzles
+
+
+def river_crossing_states(
+    n: int, seed: Seed = 0, module: ModuleType | None = None
+) -> Batch:
+    """States with at most one good in the boat, and the wolf never eaten"""
+    m = module or load("river_crossing")
+    rng = np.random.default_rng(seed)
+    locations = list(m.Location)
+    on_land = np.array(
+        [
+            locations.index(loc)
+            for loc in (m.Location.LEFT_COAST, m.Location.RIGHT_COAST)
+        ]
+    )
+    eaten, boat = locations.index(m.Location.EATEN), locations.index(m.Location.BOAT)
+    goods = on_land[rng.integers(0, 2, (3, n))].astype(np.int8)
+    # Cabbage and goat can be eaten, the wolf cannot
+    goods[:2][rng.random((2, n)) < 0.25] = eaten
+    in_boat = rng.integers(0, 4, n)  # Good in the boat, 3 for none
+    carried = in_boat < 3
+    goods[in_boat[carried], np.flatnonzero(carried)] = boat
+    return Batch(
+        m.State,
+        {
+            "cabbage": goods[0],
+            "goat": goods[1],
+            "wolf": goods[2],
+            "boat": _codes(rng, m.Boat, n),
+        },
+        {"cabbage": m.Location, "goat": m.Location, "wolf": m.Location, "boat": m.Boat},
+    )
+
+
+def die_hard_states(n: int, seed: Seed = 0, module: ModuleType | None = None) -> Batch:
+    """States with 0 to 5 gallons in the big jug and 0 to 3 in the small one"""
+    m = module or load("tla/die_hard")
+    rng = np.random.default_rng(seed)
+    return Batch(
+        m.State, {"big": rng.integers(0, 6, n), "small": rng.integers(0, 4, n)}
+    )
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    generators = [
+        ("ubs_orders", ubs_orders),
+        ("ubs_market_data", ubs_market_data),
+        ("six_swiss_orders", six_swiss_orders),
+        ("six_swiss_books", six_swiss_books),
+        ("river_crossing_states", river_crossing_states),
+        ("die_hard_states", die_hard_states),
+    ]
+    for name, generate in generators:
+        generate(1000)  # Load the example outside the timing
+        start = time.perf_counter()
+        generate(n)
+        generated = time.perf_counter() - start
+        batch = generate(100_000)
+        start = time.perf_counter()
+        batch.objects()
+        built = time.perf_counter() - start
+        print(
+            f"{name:<22} {n / generated / 1e6:>6.1f}M inputs/sec generated, "
+            f"{len(batch) / built / 1e6:.2f}M objects/sec built"
+        )
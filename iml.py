@@ -0,0 +1,1504 @@
+"""Translate the examples' IML models into NumPy batch kernels, and check
+main.py against them.
+
+Each example's `gen.iml` is the formal model CodeLogician produced from its
+`main.py`. Reasoning about the model says nothing about the Python unless the
+two agree, and checking that they agree means running both on many inputs.
+This translates the IML subset the models use into Python functions over NumPy
+columns, one row per input: variant and record types; `match` with tuple, or-
+and guarded patterns, options and list patterns; `if` and `let`;
+`List.head_opt`, and `List.for_all`, `exists` and `find` over list literals;
+`Option.map` and `Option.or_`; int and real arithmetic. `conform` then runs a
+kernel and main.py's function on the same generated inputs and reports the
+rows on which they disagree.
+
+A kernel evaluates like SIMD code. Every branch of an `if` or a `match` is
+computed for every row, and `np.where` picks each row's result. IML functions
+are pure and total, so computing a branch that a row does not take is
+harmless, but not free: main.py only runs the branch a row takes. A kernel is
+therefore not always faster than main.py. six_swiss's match_price nests matches
+on the best orders and on the ones after them, and selects every field of
+every record it returns row by row, so its kernel is slower than main.py's own
+loop. Its worth is the check, not the speed. Values are represented as:
+
+    int, real, bool  int64, float64 and bool arrays, or scalars that broadcast
+    variant          the position of the constructor in its type declaration
+    record           a dict of field name to value
+    tuple            a tuple of values
+    option           (present, value), the value arbitrary where not present
+    list             (length, (first, second, ...)), with as many leading
+                     elements as the model's list patterns reach
+
+Literal lists are unrolled at translation time instead. Recursive functions,
+such as many_steps, are not translated: they are listed in the kernels'
+SKIPPED with the reason, as is any function using an unsupported construct.
+Reals are exact rationals in IML but float64 here. The generated prices are
+multiples of a tick, so their sums and midpoints are exact.
+
+The generated source is cached under `__pycache__`, keyed by a hash of the
+model and of this file.
+
+    python iml.py [example] [-n N] [--source]
+"""
+
+import argparse
+import hashlib
+import keyword
+import os
+import pprint
+import re
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import Enum
+from functools import reduce
+from pathlib import Path
+from types import ModuleType
+
+import numpy as np
+
+from code_logician_examples import ROOT, load
+from generators import (
+    TICK,
+    Batch,
+    Books,
+    Seed,
+    die_hard_states,
+    river_crossing_states,
+    six_swiss_books,
+    ubs_market_data,
+    ubs_orders,
+)
+
+CACHE_DIR = ROOT / "__pycache__" / "iml"
+EXAMPLES = [
+    "six_swiss",
+    "ubs_dark_pool",
+    "river_crossing",
+    "tla/die_hard",
+    "tla/bank_account",
+]
+
+# Syntax
+
+
+@dataclass(frozen=True)
+class Token:
+    kind: str  # "int", "real", "name", "op" or "eof"
+    text: str
+    position: int
+
+
+_TOKEN = re.compile(
+    r"(?P<space>\s+)|(?P<comment>\(\*)|(?P<attribute>\[@@)"
+    r"|(?P<real>\d+\.\d*)|(?P<int>\d+)"
+    r"|(?P<name>(?:[A-Z]\w*\.)*[A-Za-z_]\w*'*)"
+    r"|(?P<op>->|::|\|>|\|\||&&|<>|[<>]=?\.|[<>]=|[-+*/]\.|[-+*/=<>|;,:(){}\[\].])"
+)
+_KEYWORDS = {
+    "let", "rec", "in", "if", "then", "else", "match", "with", "when", "fun",
+    "type", "of", "module", "struct", "end", "true", "false",
+}  # fmt: skip
+_COMPARISONS = {
+    "=": "==", "<>": "!=", "<": "<", ">": ">", "<=": "<=", ">=": ">=",
+    "<.": "<", ">.": ">", "<=.": "<=", ">=.": ">=",
+}  # fmt: skip
+_ARITHMETIC = {"+": "int", "-": "int", "*": "int"} | {
+    op: "real" for op in ("+.", "-.", "*.", "/.")
+}
+
+
+def _location(source: str, position: int) -> str:
+    line = source.count("\n", 0, position) + 1
+    return f"{line}:{position - source.rfind(chr(10), 0, position)}"
+
+
+def _skip(source: str, start: int, opening: str, closing: str) -> int:
+    """The position after a possibly nested comment or attribute"""
+    depth, i = 0, start
+    while i < len(source):
+        if source.startswith(opening, i):
+            depth, i = depth + 1, i + len(opening)
+        elif source.startswith(closing, i):
+            depth, i = depth - 1, i + len(closing)
+            if not depth:
+                return i
+        else:
+            i += 1
+    raise ValueError(f"{_location(source, start)}: unterminated {opening}")
+
+
+def tokenize(source: str) -> list[Token]:
+    tokens, i = [], 0
+    while i < len(source):
+        m = _TOKEN.match(source, i)
+        if m is None:
+            raise ValueError(f"{_location(source, i)}: unexpected {source[i]!r}")
+        if m.lastgroup == "comment":
+            i = _skip(source, i, "(*", "*)")
+            continue
+        if m.lastgroup == "attribute":  # [@@measure ...], for the prover only
+            i = _skip(source, i, "[", "]")
+            continue
+        if m.lastgroup != "space":
+            tokens.append(Token(m.lastgroup, m.group(), i))
+        i = m.end()
+    tokens.append(Token("eof", "end of input", i))
+    return tokens
+
+
+# A type is the name of a base, variant or record type, or a tuple
+# ("option", t), ("list", t) or ("tuple", t1, t2, ...)
+Type = str | tuple
+
+
+@dataclass(frozen=True)
+class TypeDecl:
+    name: str
+    constructors: tuple[str, ...] = ()  # Of a variant
+    fields: tuple[tuple[str, Type], ...] = ()  # Of a record
+
+
+@dataclass(frozen=True)
+class FunctionDecl:
+    name: str  # Qualified by its modules, as in Actions.deposit_to_bob
+    params: tuple[tuple[str, Type | None], ...]  # Without () parameters
+    result: Type | None  # None if not annotated
+    body: "Expr"
+    recursive: bool
+
+
+@dataclass(frozen=True)
+class Var:
+    name: str
+
+
+@dataclass(frozen=True)
+class Lit:
+    value: int | float | bool | None  # None for ()
+
+
+@dataclass(frozen=True)
+class Ctor:
+    name: str
+    arg: "Expr | None" = None
+
+
+@dataclass(frozen=True)
+class Field:
+    record: "Expr"
+    name: str
+
+
+@dataclass(frozen=True)
+class Record:
+    fields: tuple[tuple[str, "Expr"], ...]
+    base: "Expr | None" = None  # { base with ... }
+
+
+@dataclass(frozen=True)
+class Tup:
+    items: tuple["Expr", ...]
+
+
+@dataclass(frozen=True)
+class ListLit:
+    items: tuple["Expr", ...]
+
+
+@dataclass(frozen=True)
+class Apply:
+    function: "Expr"
+    args: tuple["Expr", ...]
+
+
+@dataclass(frozen=True)
+class BinOp:
+    op: str
+    left: "Expr"
+    right: "Expr"
+
+
+@dataclass(frozen=True)
+class If:
+    condition: "Expr"
+    then: "Expr"
+    else_: "Expr"
+
+
+@dataclass(frozen=True)
+class Arm:
+    pattern: "Pattern"
+    guard: "Expr | None"
+    body: "Expr"
+
+
+@dataclass(frozen=True)
+class Match:
+    subject: "Expr"
+    arms: tuple[Arm, ...]
+
+
+@dataclass(frozen=True)
+class Let:
+    pattern: "Pattern"
+    value: "Expr"
+    body: "Expr"
+
+
+@dataclass(frozen=True)
+class Fun:
+    params: tuple["Pattern", ...]
+    body: "Expr"
+
+
+Expr = Var | Lit | Ctor | Field | Record | Tup | ListLit | Apply | BinOp | If
+Expr |= Match | Let | Fun
+
+
+@dataclass(frozen=True)
+class PWild:
+    pass
+
+
+@dataclass(frozen=True)
+class PVar:
+    name: str
+
+
+@dataclass(frozen=True)
+class PLit:
+    value: int | bool
+
+
+@dataclass(frozen=True)
+class PCtor:
+    name: str
+    arg: "Pattern | None" = None
+
+
+@dataclass(frozen=True)
+class PTup:
+    items: tuple["Pattern", ...]
+
+
+@dataclass(frozen=True)
+class POr:
+    alternatives: tuple["Pattern", ...]
+
+
+@dataclass(frozen=True)
+class PCons:
+    head: "Pattern"
+    tail: "Pattern"
+
+
+@dataclass(frozen=True)
+class PNil:
+    pass
+
+
+Pattern = PWild | PVar | PLit | PCtor | PTup | POr | PCons | PNil
+
+
+def _is_constructor(name: str) -> bool:
+    return name.rpartition(".")[2][:1].isupper()
+
+
+class _Parser:
+    def __init__(self, source: str, origin: str):
+        self.source = source
+        self.origin = origin
+        self.tokens = tokenize(source)
+        self.i = 0
+
+    def peek(self, offset: int = 0) -> Token:
+        return self.tokens[min(self.i + offset, len(self.tokens) - 1)]
+
+    def error(self, expected: str) -> ValueError:
+        token = self.peek()
+        where = _location(self.source, token.position)
+        return ValueError(
+            f"{self.origin}:{where}: expected {expected}, not {token.text}"
+        )
+
+    def accept(self, text: str) -> bool:
+        if self.peek().text == text and self.peek().kind in ("name", "op"):
+            self.i += 1
+            return True
+        return False
+
+    def expect(self, text: str) -> None:
+        if not self.accept(text):
+            raise self.error(repr(text))
+
+    def name(self) -> str:
+        token = self.peek()
+        if token.kind != "name" or token.text in _KEYWORDS:
+            raise self.error("a name")
+        self.i += 1
+        return token.text
+
+    # Declarations
+
+    def program(self) -> list[TypeDecl | FunctionDecl]:
+        declarations = self.declarations("")
+        if self.peek().kind != "eof":
+            raise self.error("a declaration")
+        return declarations
+
+    def declarations(self, prefix: str) -> list[TypeDecl | FunctionDecl]:
+        declarations = []
+        while True:
+            if self.accept("type"):
+                declarations.append(self.type_declaration())
+            elif self.peek().text == "let":
+                declarations.append(self.function(prefix))
+            elif self.accept("module"):
+                name = self.name()
+                self.expect("=")
+                self.expect("struct")
+                declarations += self.declarations(f"{prefix}{name}.")
+                self.expect("end")
+            else:
+                return declarations
+
+    def type_declaration(self) -> TypeDecl:
+        name = self.name()
+        self.expect("=")
+        if self.accept("{"):
+            fields = []
+            while not self.accept("}"):
+                field = self.name()
+                self.expect(":")
+                fields.append((field, self.type_()))
+                if not self.accept(";"):
+                    self.expect("}")
+                    break
+            return TypeDecl(name, fields=tuple(fields))
+        self.accept("|")
+        constructors = [self.name()]
+        while self.accept("|"):
+            constructors.append(self.name())
+        if self.peek().text == "of":
+            raise self.error("a constant constructor")
+        return TypeDecl(name, constructors=tuple(constructors))
+
+    def type_(self) -> Type:
+        items = [self.type_postfix()]
+        while self.accept("*"):
+            items.append(self.type_postfix())
+        return items[0] if len(items) == 1 else ("tuple", *items)
+
+    def type_postfix(self) -> Type:
+        if self.accept("("):
+            t = self.type_()
+            self.expect(")")
+        else:
+            t = self.name()
+        while self.peek().text in ("list", "option"):
+            t = (self.name(), t)
+        return t
+
+    def function(self, prefix: str) -> FunctionDecl:
+        self.expect("let")
+        recursive = self.accept("rec")
+        name = prefix + self.name()
+        params = []
+        while self.peek().text != "=" and self.peek().text != ":":
+            if not self.accept("("):
+                params.append((self.name(), None))
+            elif not self.accept(")"):  # () parameters are dropped
+                param = self.name()
+                self.expect(":")
+                params.append((param, self.type_()))
+                self.expect(")")
+        result = self.type_() if self.accept(":") else None
+        self.expect("=")
+        return FunctionDecl(name, tuple(params), result, self.expr(), recursive)
+
+    # Expressions, from the loosest binding
+
+    def expr(self) -> Expr:
+        if self.accept("let"):
+            pattern = self.pattern()
+            self.expect("=")
+            value = self.expr()
+            self.expect("in")
+            return Let(pattern, value, self.expr())
+        if self.accept("if"):
+            condition = self.expr()
+            self.expect("then")
+            then = self.expr()
+            self.expect("else")
+            return If(condition, then, self.expr())
+        if self.accept("match"):
+            subject = self.expr()
+            self.expect("with")
+            self.accept("|")
+            arms = []
+            while True:
+                pattern = self.pattern()
+                guard = self.expr() if self.accept("when") else None
+                self.expect("->")
+                arms.append(Arm(pattern, guard, self.expr()))
+                if not self.accept("|"):
+                    return Match(subject, tuple(arms))
+        if self.accept("fun"):
+            params = [self.simple_pattern()]
+            while not self.accept("->"):
+                params.append(self.simple_pattern())
+            return Fun(tuple(params), self.expr())
+        items = [self.pipe()]
+        while self.accept(","):
+            items.append(self.pipe())
+        return items[0] if len(items) == 1 else Tup(tuple(items))
+
+    def pipe(self) -> Expr:
+        left = self.disjunction()
+        while self.accept("|>"):
+            right = self.disjunction()
+            if isinstance(right, Apply):
+                left = Apply(right.function, (*right.args, left))
+            else:
+                left = Apply(right, (left,))
+        return left
+
+    def disjunction(self) -> Expr:
+        left = self.conjunction()
+        if self.accept("||"):
+            return BinOp("||", left, self.disjunction())
+        return left
+
+    def conjunction(self) -> Expr:
+        left = self.comparison()
+        if self.accept("&&"):
+            return BinOp("&&", left, self.conjunction())
+        return left
+
+    def comparison(self) -> Expr:
+        left = self.cons()
+        while self.peek().kind == "op" and self.peek().text in _COMPARISONS:
+            op = self.tokens[self.i].text
+            self.i += 1
+            left = BinOp(op, left, self.cons())
+        return left
+
+    def cons(self) -> Expr:
+        left = self.binary(("+", "-", "+.", "-."), self.product)
+        if self.accept("::"):
+            return BinOp("::", left, self.cons())
+        return left
+
+    def product(self) -> Expr:
+        return self.binary(("*", "/", "*.", "/."), self.application)
+
+    def binary(self, ops: tuple[str, ...], operand: Callable[[], Expr]) -> Expr:
+        left = operand()
+        while self.peek().kind == "op" and self.peek().text in ops:
+            op = self.tokens[self.i].text
+            self.i += 1
+            left = BinOp(op, left, operand())
+        return left
+
+    def starts_atom(self) -> bool:
+        token = self.peek()
+        if token.kind == "name":
+            return token.text not in _KEYWORDS or token.text in ("true", "false")
+        return token.kind in ("int", "real") or token.text in ("(", "{", "[")
+
+    def application(self) -> Expr:
+        token = self.peek()
+        if token.kind == "name" and _is_constructor(token.text):
+            self.i += 1
+            return Ctor(token.text, self.atom() if self.starts_atom() else None)
+        function = self.atom()
+        args = []
+        while self.starts_atom():
+            args.append(self.atom())
+        return Apply(function, tuple(args)) if args else function
+
+    def atom(self) -> Expr:
+        expr = self.primary()
+        while self.accept("."):
+            expr = Field(expr, self.name())
+        return expr
+
+    def primary(self) -> Expr:
+        token = self.peek()
+        if token.kind == "int":
+            self.i += 1
+            return Lit(int(token.text))
+        if token.kind == "real":
+            self.i += 1
+            return Lit(float(token.text))
+        if self.accept("true") or self.accept("false"):
+            return Lit(token.text == "true")
+        if self.accept("("):
+            if self.accept(")"):
+                return Lit(None)
+            expr = self.expr()
+            self.expect(")")
+            return expr
+        if self.accept("{"):
+            return self.record()
+        if self.accept("["):
+            items = []
+            while not self.accept("]"):
+                items.append(self.expr())
+                if not self.accept(";"):
+                    self.expect("]")
+                    break
+            return ListLit(tuple(items))
+        name = self.name()
+        return Ctor(name) if _is_constructor(name) else Var(name)
+
+    def record(self) -> Record:
+        base = None
+        if self.peek(1).text != "=":
+            base = self.atom()
+            self.expect("with")
+        fields = []
+        while True:
+            name = self.name()
+            self.expect("=")
+            fields.append((name, self.expr()))
+            if not self.accept(";") or self.peek().text == "}":
+                break
+        self.expect("}")
+        return Record(tuple(fields), base)
+
+    # Patterns
+
+    def pattern(self) -> Pattern:
+        alternatives = [self.tuple_pattern()]
+        while self.accept("|"):
+            alternatives.append(self.tuple_pattern())
+        return alternatives[0] if len(alternatives) == 1 else POr(tuple(alternatives))
+
+    def tuple_pattern(self) -> Pattern:
+        items = [self.cons_pattern()]
+        while self.accept(","):
+            items.append(self.cons_pattern())
+        return items[0] if len(items) == 1 else PTup(tuple(items))
+
+    def cons_pattern(self) -> Pattern:
+        token = self.peek()
+        if token.kind == "name" and _is_constructor(token.text):
+            self.i += 1
+            starts = self.peek().kind in ("name", "int") or self.peek().text in "(["
+            head = PCtor(token.text, self.simple_pattern() if starts else None)
+        else:
+            head = self.simple_pattern()
+        if self.accept("::"):
+            return PCons(head, self.cons_pattern())
+        return head
+
+    def simple_pattern(self) -> Pattern:
+        token = self.peek()
+        if token.kind == "int":
+            self.i += 1
+            return PLit(int(token.text))
+        if self.accept("true") or self.accept("false"):
+            return PLit(token.text == "true")
+        if self.accept("("):
+            pattern = self.pattern()
+            self.expect(")")
+            return pattern
+        if self.accept("["):
+            self.expect("]")
+            return PNil()
+        name = self.name()
+        if name == "_":
+            return PWild()
+        return PCtor(name) if _is_constructor(name) else PVar(name)
+
+
+def parse(source: str, origin: str = "<iml>") -> list[TypeDecl | FunctionDecl]:
+    return _Parser(source, origin).program()
+
+
+# Translation
+
+
+class _Unsupported(Exception):
+    """A construct the kernels cannot express: its function is skipped"""
+
+
+class _Untyped(_Unsupported):
+    """A value, such as None, whose type has to come from its context"""
+
+
+@dataclass(frozen=True)
+class _Value:
+    code: str  # A Python expression
+    type: Type
+
+
+@dataclass(frozen=True)
+class _Static:
+    items: tuple[_Value, ...]  # A list literal, unrolled where it is used
+
+
+_BASE = {"int": "0", "real": "0.0", "bool": "False", "unit": "None"}
+_SCALARS = {"int", "real", "bool"}
+_EXTREMA = {
+    "min": ("np.minimum", "int"),
+    "max": ("np.maximum", "int"),
+    "min_r": ("np.minimum", "real"),
+    "max_r": ("np.maximum", "real"),
+}
+_BUILTINS = {"not", "List.head_opt", "List.length", "List.for_all", "List.exists"}
+_BUILTINS |= {"List.find", "Option.map", "Option.or_", *_EXTREMA}
+_SIMPLE = re.compile(r"[\w.]+(\[[^\[\]]*\])*")  # Cheap enough to repeat
+
+_PRELUDE = '''
+def _where(condition, a, b):
+    """a where condition holds and b elsewhere, through records and tuples"""
+    if isinstance(condition, (bool, np.bool_)):
+        return a if condition else b
+    if isinstance(a, dict):
+        return {name: _where(condition, a[name], b[name]) for name in a}
+    if isinstance(a, tuple):
+        return tuple(_where(condition, x, y) for x, y in zip(a, b))
+    return np.where(condition, a, b)
+'''
+
+
+def _show(t: Type) -> str:
+    """A type as IML writes it"""
+    if isinstance(t, str):
+        return t
+    if t[0] == "tuple":
+        return " * ".join(_show(item) for item in t[1:])
+    inner = _show(t[1])
+    return f"({inner}) {t[0]}" if " * " in inner else f"{inner} {t[0]}"
+
+
+def _python_name(name: str) -> str:
+    name = name.replace(".", "_")
+    return f"{name}_" if keyword.iskeyword(name) or name == "np" else name
+
+
+def _all(conditions: list[str | None]) -> str | None:
+    """The conjunction of pattern conditions, None standing for always"""
+    conditions = [c for c in conditions if c is not None]
+    if len(conditions) < 2:
+        return conditions[0] if conditions else None
+    return f"({' & '.join(conditions)})"
+
+
+class _Translator:
+    def __init__(self, declarations: list[TypeDecl | FunctionDecl]):
+        self.variants: dict[str, tuple[str, ...]] = {}
+        self.constructors: dict[str, str] = {}  # To the variant type
+        self.records: dict[str, dict[str, Type]] = {}
+        self.signatures: dict[str, tuple[tuple[Type, ...], Type]] = {}
+        self.skipped: dict[str, str] = {}  # Function to the reason
+        self.prefix = 0  # Leading list elements the patterns reach
+        self.definitions: list[str] = []
+        names = {d.name for d in declarations if isinstance(d, FunctionDecl)}
+        self.globals = {_python_name(name) for name in names} | {"np", "_where"}
+        for declaration in declarations:
+            if isinstance(declaration, FunctionDecl):
+                try:
+                    self.function(declaration)
+                except _Unsupported as e:
+                    self.skipped[declaration.name] = str(e)
+            elif declaration.constructors:
+                self.variants[declaration.name] = declaration.constructors
+                for constructor in declaration.constructors:
+                    self.constructors[constructor] = declaration.name
+            else:
+                self.records[declaration.name] = dict(declaration.fields)
+
+    def known(self, t: Type) -> None:
+        if isinstance(t, str):
+            if t not in _BASE and t not in self.variants and t not in self.records:
+                raise _Unsupported(f"uses type {t}")
+        elif t[0] in ("option", "list", "tuple"):
+            for item in t[1:]:
+                self.known(item)
+        else:
+            raise _Unsupported(f"uses type {_show(t)}")
+
+    def zero(self, t: Type) -> str:
+        """Code for a placeholder value of a type, where no value is present"""
+        if t in _BASE:
+            return _BASE[t]
+        if t in self.variants:
+            return "0"
+        if t in self.records:
+            items = (f"{f!r}: {self.zero(ft)}" for f, ft in self.records[t].items())
+            return f"{{{', '.join(items)}}}"
+        if t[0] == "option":
+            return f"(False, {self.zero(t[1])})"
+        if t[0] == "list":
+            return f"(0, ({self.zero(t[1])},) * PREFIX)"
+        return f"({', '.join(self.zero(item) for item in t[1:])})"
+
+    def function(self, declaration: FunctionDecl) -> None:
+        if declaration.recursive:
+            raise _Unsupported("recursive")
+        params = {}
+        for name, t in declaration.params:
+            if t is None:
+                raise _Unsupported(f"parameter {name} has no type annotation")
+            self.known(t)
+            params[name] = _Value(_python_name(name), t)
+        if declaration.result is not None:
+            self.known(declaration.result)
+        body = _Body(self, self.globals | {v.code for v in params.values()})
+        value = body.expr(declaration.body, params, declaration.result)
+        body.same(value, declaration.result, "the result")
+        name = _python_name(declaration.name)
+        lines = [f"def {name}({', '.join(v.code for v in params.values())}):"]
+        lines += [f"    {line}" for line in body.lines]
+        lines.append(f"    return {value.code}")
+        self.definitions.append("\n".join(lines))
+        types = tuple(v.type for v in params.values())
+        self.signatures[declaration.name] = (types, value.type)
+
+    def module(self, origin: str) -> str:
+        functions = ", ".join(f"{n!r}: {_python_name(n)}" for n in self.signatures)
+        return "\n".join(
+            [
+                f'"""Kernels translated by iml.py from {origin}; do not edit"""',
+                "",
+                "import numpy as np",
+                "",
+                f"PREFIX = {self.prefix}  # Leading elements kept of every list",
+                f"VARIANTS = {pprint.pformat(self.variants, sort_dicts=False)}",
+                f"RECORDS = {pprint.pformat(self.records, sort_dicts=False)}",
+                f"SKIPPED = {pprint.pformat(self.skipped, sort_dicts=False)}",
+                "",
+                _PRELUDE,
+                *(f"\n{definition}\n" for definition in self.definitions),
+                "",
+                f"FUNCTIONS = {{{functions}}}",
+                f"SIGNATURES = {pprint.pformat(self.signatures, sort_dicts=False)}",
+                "",
+            ]
+        )
+
+
+class _Body:
+    """The statements of one function being translated"""
+
+    def __init__(self, translator: _Translator, used: set[str]):
+        self.t = translator
+        self.lines: list[str] = []
+        self.used = set(used)
+
+    def fresh(self, base: str) -> str:
+        n = 1
+        while f"{base}_{n}" in self.used:
+            n += 1
+        self.used.add(f"{base}_{n}")
+        return f"{base}_{n}"
+
+    def bind(self, code: str, base: str = "t") -> str:
+        """Code to refer to a value more than once without computing it again"""
+        if _SIMPLE.fullmatch(code):
+            return code
+        name = self.fresh(_python_name(base))
+        self.lines.append(f"{name} = {code}")
+        return name
+
+    def same(self, value: _Value, t: Type | None, what: str) -> None:
+        if t is not None and value.type != t:
+            raise _Unsupported(f"{what} is {_show(value.type)}, not {_show(t)}")
+
+    def branches(
+        self, compilers: list[Callable[[Type | None], _Value]], expected: Type | None
+    ) -> list[_Value]:
+        """Values of the same type, typing a None by the other branches"""
+        values: list[_Value | None] = []
+        for compile_ in compilers:
+            mark = len(self.lines)
+            try:
+                values.append(compile_(expected))
+            except _Untyped:
+                if expected is not None:
+                    raise
+                del self.lines[mark:]
+                values.append(None)
+        known = [v for v in values if v is not None]
+        if not known:
+            raise _Untyped("no branch has a known type")
+        expected = known[0].type
+        values = [
+            compilers[i](expected) if v is None else v for i, v in enumerate(values)
+        ]
+        for value in values:
+            self.same(value, expected, "a branch")
+        return values
+
+    def expr(self, e: Expr, env: dict, expected: Type | None = None) -> _Value:
+        match e:
+            case Lit(None):
+                return _Value("None", "unit")
+            case Lit(bool()):
+                return _Value(repr(e.value), "bool")
+            case Lit(int()):
+                return _Value(repr(e.value), "int")
+            case Lit(float()):
+                return _Value(repr(e.value), "real")
+            case Var(name) if name in env:
+                if isinstance(env[name], _Static):
+                    raise _Unsupported(f"list literal {name} used as a value")
+                return env[name]
+            case Var(name):
+                return self.call(name, (), env)
+            case Ctor("None", None):
+                if not isinstance(expected, tuple) or expected[0] != "option":
+                    raise _Untyped("None")
+                return _Value(f"(False, {self.t.zero(expected[1])})", expected)
+            case Ctor("Some", arg) if arg is not None:
+                inner = expected[1] if isinstance(expected, tuple) else None
+                value = self.expr(arg, env, inner)
+                return _Value(f"(True, {value.code})", ("option", value.type))
+            case Ctor(name, None) if name in self.t.constructors:
+                t = self.t.constructors[name]
+                return _Value(str(self.t.variants[t].index(name)), t)
+            case Ctor(name, _):
+                raise _Unsupported(f"constructor {name}")
+            case Field(record, name):
+                value = self.expr(record, env)
+                fields = self.t.records.get(value.type, {})
+                if name not in fields:
+                    raise _Unsupported(f"{_show(value.type)} has no field {name}")
+                return _Value(f"{value.code}[{name!r}]", fields[name])
+            case Record(fields, base):
+                return self.record(fields, base, env, expected)
+            case Tup(items):
+                types = expected[1:] if isinstance(expected, tuple) else ()
+                if len(types) != len(items):
+                    types = (None,) * len(items)
+                values = [self.expr(i, env, t) for i, t in zip(items, types)]
+                code = f"({', '.join(v.code for v in values)})"
+                return _Value(code, ("tuple", *(v.type for v in values)))
+            case ListLit():
+                raise _Unsupported("list literal outside List.for_all, exists or find")
+            case Apply(Var(name), args) if name in _BUILTINS and name not in env:
+                return self.builtin(name, args, env, expected)
+            case Apply(Var(name), args) if name not in env:
+                return self.call(name, args, env)
+            case Apply():
+                raise _Unsupported("application of a function value")
+            case BinOp(op, left, right):
+                return self.binary(op, left, right, env)
+            case If(condition, then, else_):
+                c = self.expr(condition, env, "bool")
+                self.same(c, "bool", "a condition")
+                t, f = self.branches(
+                    [
+                        lambda x: self.expr(then, env, x),
+                        lambda x: self.expr(else_, env, x),
+                    ],
+                    expected,
+                )
+                return _Value(f"_where({c.code}, {t.code}, {f.code})", t.type)
+            case Match(subject, arms):
+                return self.match(subject, arms, env, expected)
+            case Let(PVar(name), ListLit(items), body):
+                values = tuple(self.item(item, env) for item in items)
+                return self.expr(body, {**env, name: _Static(values)}, expected)
+            case Let(pattern, value, body):
+                v = self.expr(value, env)
+                base = pattern.name if isinstance(pattern, PVar) else "t"
+                scope = dict(env)
+                if self.pattern(pattern, self.bind(v.code, base), v.type, scope):
+                    raise _Unsupported("refutable let pattern")
+                return self.expr(body, scope, expected)
+            case Fun():
+                raise _Unsupported("function value")
+        raise _Unsupported(f"expression {e}")
+
+    def item(self, e: Expr, env: dict) -> _Value:
+        value = self.expr(e, env)
+        return _Value(self.bind(value.code, "item"), value.type)
+
+    def call(self, name: str, args: tuple[Expr, ...], env: dict) -> _Value:
+        args = tuple(a for a in args if a != Lit(None))
+        if name not in self.t.signatures:
+            if name in self.t.skipped:
+                raise _Unsupported(f"calls {name}, which is not translated")
+            raise _Unsupported(f"calls unknown {name}")
+        params, result = self.t.signatures[name]
+        if len(args) != len(params):
+            raise _Unsupported(f"applies {name} to {len(args)} arguments")
+        codes = []
+        for arg, t in zip(args, params):
+            value = self.expr(arg, env, t)
+            self.same(value, t, f"an argument of {name}")
+            codes.append(value.code)
+        return _Value(f"{_python_name(name)}({', '.join(codes)})", result)
+
+    def record(self, fields, base, env: dict, expected: Type | None) -> _Value:
+        if base is not None:
+            b = self.expr(base, env, expected)
+            t = b.type
+        else:
+            names = {name for name, _ in fields}
+            candidates = [r for r, f in self.t.records.items() if set(f) == names]
+            if expected not in candidates and len(candidates) != 1:
+                raise _Unsupported(f"record of unknown type with fields {names}")
+            t = expected if expected in candidates else candidates[0]
+        declared = self.t.records.get(t, {})
+        values = {}
+        for name, value in fields:
+            if name not in declared:
+                raise _Unsupported(f"{_show(t)} has no field {name}")
+            values[name] = self.expr(value, env, declared[name])
+            self.same(values[name], declared[name], f"field {name}")
+        if base is not None:
+            items = ", ".join(f"{n!r}: {v.code}" for n, v in values.items())
+            return _Value(f"{{**{b.code}, {items}}}", t)
+        items = ", ".join(f"{n!r}: {values[n].code}" for n in declared)
+        return _Value(f"{{{items}}}", t)
+
+    def binary(self, op: str, left: Expr, right: Expr, env: dict) -> _Value:
+        if op in ("&&", "||"):
+            a, b = self.expr(left, env, "bool"), self.expr(right, env, "bool")
+            self.same(a, "bool", f"an operand of {op}")
+            self.same(b, "bool", f"an operand of {op}")
+            return _Value(f"({a.code} {'&' if op == '&&' else '|'} {b.code})", "bool")
+        if op in _ARITHMETIC:
+            t = _ARITHMETIC[op]
+            a, b = self.expr(left, env, t), self.expr(right, env, t)
+            self.same(a, t, f"an operand of {op}")
+            self.same(b, t, f"an operand of {op}")
+            return _Value(f"({a.code} {op[0]} {b.code})", t)
+        if op in _COMPARISONS:
+            a = self.expr(left, env)
+            b = self.expr(right, env, a.type)
+            self.same(b, a.type, f"an operand of {op}")
+            if op[-1] == ".":
+                self.same(a, "real", f"an operand of {op}")
+            elif op not in ("=", "<>"):
+                self.same(a, "int", f"an operand of {op}")
+            elif a.type not in _SCALARS and a.type not in self.t.variants:
+                raise _Unsupported(f"compares values of type {_show(a.type)}")
+            return _Value(f"({a.code} {_COMPARISONS[op]} {b.code})", "bool")
+        raise _Unsupported(f"operator {op}")
+
+    def match(self, subject: Expr, arms, env: dict, expected: Type | None) -> _Value:
+        s = self.expr(subject, env)
+        code = self.bind(s.code, "m")
+        conditions, compilers = [], []
+        for arm in arms:
+            scope = dict(env)
+            condition = self.pattern(arm.pattern, code, s.type, scope)
+            if arm.guard is not None:
+                guard = self.expr(arm.guard, scope, "bool")
+                self.same(guard, "bool", "a guard")
+                condition = _all([condition, guard.code])
+            conditions.append(condition)
+            compilers.append(
+                lambda x, arm=arm, scope=scope: self.expr(arm.body, scope, x)
+            )
+        values = self.branches(compilers, expected)
+        # IML matches are exhaustive: rows no earlier arm takes take the last
+        result = values[-1].code
+        for condition, value in zip(conditions[-2::-1], values[-2::-1]):
+            if condition is None:
+                result = value.code
+            else:
+                result = f"_where({condition}, {value.code}, {result})"
+        return _Value(result, values[-1].type)
+
+    def pattern(self, p: Pattern, code: str, t: Type, scope: dict) -> str | None:
+        """The condition under which a value matches, binding its variables
+        in scope; None if it always matches"""
+        kind = t[0] if isinstance(t, tuple) else t
+        match p:
+            case PWild():
+                return None
+            case PVar(name):
+                scope[name] = _Value(code, t)
+                return None
+            case PLit(value) if t == ("bool" if isinstance(value, bool) else "int"):
+                return f"({code} == {value!r})"
+            case PCtor("Some", arg) if kind == "option" and arg is not None:
+                return _all(
+                    [f"{code}[0]", self.pattern(arg, f"{code}[1]", t[1], scope)]
+                )
+            case PCtor("None", None) if kind == "option":
+                return f"np.logical_not({code}[0])"
+            case PCtor(name, None) if self.t.constructors.get(name) == t:
+                return f"({code} == {self.t.variants[t].index(name)})"
+            case PTup(items) if kind == "tuple" and len(items) == len(t) - 1:
+                return _all(
+                    [
+                        self.pattern(item, f"{code}[{i}]", t[i + 1], scope)
+                        for i, item in enumerate(items)
+                    ]
+                )
+            case POr(alternatives):
+                conditions = []
+                for alternative in alternatives:
+                    inner = dict(scope)
+                    condition = self.pattern(alternative, code, t, inner)
+                    if inner != scope:
+                        raise _Unsupported("or-pattern binding variables")
+                    if condition is None:
+                        return None
+                    conditions.append(condition)
+                return f"({' | '.join(conditions)})"
+            case PCons() | PNil() if kind == "list":
+                heads = []
+                while isinstance(p, PCons):
+                    heads.append(p.head)
+                    p = p.tail
+                if not isinstance(p, PNil | PWild):
+                    raise _Unsupported("pattern binding the tail of a list")
+                self.t.prefix = max(self.t.prefix, len(heads))
+                comparison = "==" if isinstance(p, PNil) else ">="
+                conditions = [f"({code}[0] {comparison} {len(heads)})"]
+                for i, head in enumerate(heads):
+                    conditions.append(
+                        self.pattern(head, f"{code}[1][{i}]", t[1], scope)
+                    )
+                return _all(conditions)
+        raise _Unsupported(f"pattern {p} against {_show(t)}")
+
+    def static(self, e: Expr, env: dict) -> tuple[_Value, ...]:
+        if isinstance(e, ListLit):
+            return tuple(self.item(item, env) for item in e.items)
+        if isinstance(e, Var) and isinstance(env.get(e.name), _Static):
+            return env[e.name].items
+        raise _Unsupported("list function over a list that is not a literal")
+
+    def lambda_(self, e: Expr, value: _Value, env: dict) -> dict:
+        """The scope of the body of a one-parameter fun applied to a value"""
+        if not isinstance(e, Fun) or len(e.params) != 1:
+            raise _Unsupported("list or option function without a one-parameter fun")
+        scope = dict(env)
+        if self.pattern(e.params[0], value.code, value.type, scope) is not None:
+            raise _Unsupported("refutable fun parameter")
+        return scope
+
+    def builtin(self, name: str, args: tuple[Expr, ...], env: dict, expected) -> _Value:
+        arity = 1 if name in ("not", "List.head_opt", "List.length") else 2
+        if len(args) != arity:
+            raise _Unsupported(f"applies {name} to {len(args)} arguments")
+        match name:
+            case "not":
+                value = self.expr(args[0], env, "bool")
+                self.same(value, "bool", "the argument of not")
+                return _Value(f"np.logical_not({value.code})", "bool")
+            case "min" | "max" | "min_r" | "max_r":
+                function, t = _EXTREMA[name]
+                a, b = self.expr(args[0], env, t), self.expr(args[1], env, t)
+                self.same(a, t, f"an argument of {name}")
+                self.same(b, t, f"an argument of {name}")
+                return _Value(f"{function}({a.code}, {b.code})", t)
+            case "List.length" if isinstance(args[0], ListLit):
+                return _Value(str(len(args[0].items)), "int")
+            case "List.head_opt" | "List.length":
+                value = self.expr(args[0], env)
+                if not isinstance(value.type, tuple) or value.type[0] != "list":
+                    raise _Unsupported(f"{name} of {_show(value.type)}")
+                code = self.bind(value.code, "l")
+                if name == "List.length":
+                    return _Value(f"{code}[0]", "int")
+                self.t.prefix = max(self.t.prefix, 1)
+                return _Value(
+                    f"(({code}[0] > 0), {code}[1][0])", ("option", value.type[1])
+                )
+            case "List.for_all" | "List.exists":
+                conditions = []
+                for item in self.static(args[1], env):
+                    scope = self.lambda_(args[0], item, env)
+                    condition = self.expr(args[0].body, scope, "bool")
+                    self.same(condition, "bool", f"the predicate of {name}")
+                    conditions.append(condition.code)
+                if not conditions:
+                    return _Value(repr(name == "List.for_all"), "bool")
+                joined = (" & " if name == "List.for_all" else " | ").join(conditions)
+                return _Value(f"({joined})", "bool")
+            case "List.find":
+                items = self.static(args[1], env)
+                if not items:
+                    raise _Unsupported("List.find over an empty list")
+                element = items[0].type
+                result = f"(False, {self.t.zero(element)})"
+                for item in reversed(items):
+                    self.same(item, element, "a list element")
+                    scope = self.lambda_(args[0], item, env)
+                    condition = self.expr(args[0].body, scope, "bool")
+                    self.same(condition, "bool", "the predicate of List.find")
+                    found = f"_where({condition.code}, (True, {item.code}), {result})"
+                    result = self.bind(found, "found")
+                return _Value(result, ("option", element))
+            case "Option.map":
+                option = self.expr(args[1], env)
+                if not isinstance(option.type, tuple) or option.type[0] != "option":
+                    raise _Unsupported(f"Option.map over {_show(option.type)}")
+                code = self.bind(option.code, "o")
+                inner = _Value(f"{code}[1]", option.type[1])
+                value = self.expr(args[0].body, self.lambda_(args[0], inner, env))
+                return _Value(f"({code}[0], {value.code})", ("option", value.type))
+            case "Option.or_":
+                a, b = self.branches(
+                    [
+                        lambda x: self.expr(args[0], env, x),
+                        lambda x: self.expr(args[1], env, x),
+                    ],
+                    expected,
+                )
+                if not isinstance(a.type, tuple) or a.type[0] != "option":
+                    raise _Unsupported(f"Option.or_ of {_show(a.type)}")
+                a_code, b_code = self.bind(a.code, "a"), self.bind(b.code, "b")
+                present = f"({a_code}[0] | {b_code}[0])"
+                value = f"_where({a_code}[0], {a_code}[1], {b_code}[1])"
+                return _Value(f"({present}, {value})", a.type)
+        raise _Unsupported(f"{name}")
+
+
+def translate(source: str, origin: str = "<iml>") -> str:
+    """The source of a module of kernels for the functions of an IML model
+
+    The module has a function per translated IML function (with the dots of
+    module paths replaced by underscores), and:
+
+        FUNCTIONS   IML name to kernel
+        SIGNATURES  IML name to (parameter types, result type)
+        SKIPPED     IML name to the reason it was not translated
+        VARIANTS    type to constructors, whose positions are their codes
+        RECORDS     type to field name to field type
+        PREFIX      leading elements of list values the kernels look at
+    """
+    return _Translator(parse(source, origin)).module(origin)
+
+
+def _module(code: str, filename: str) -> ModuleType:
+    module = ModuleType(f"iml:{filename}")
+    module.__file__ = filename
+    # The code is the translator's own output
+    exec(compile(code, filename, "exec"), module.__dict__)  # noqa: S102
+    return module
+
+
+def compile_kernels(source: str, origin: str = "<iml>") -> ModuleType:
+    """The module `translate` makes of an IML model, without caching it"""
+    return _module(translate(source, origin), origin)
+
+
+def load_kernels(example: str, cache_dir: Path | None = CACHE_DIR) -> ModuleType:
+    """The kernels of an example's gen.iml, translated or reloaded from the
+    cache"""
+    origin = f"{example}/gen.iml"
+    source = (ROOT / origin).read_text()
+    if cache_dir is None:
+        return compile_kernels(source, origin)
+    digest = hashlib.sha256(source.encode() + Path(__file__).read_bytes())
+    path = cache_dir / f"{example.replace('/', '.')}.{digest.hexdigest()[:16]}.py"
+    try:
+        code = path.read_text()
+    except OSError:
+        code = translate(source, origin)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(code)
+        os.replace(tmp, path)
+    return _module(code, str(path))
+
+
+# Conformance
+
+
+def _normalize(name: str) -> str:
+    """PeggedCI and PEGGED_CI alike, to pair constructors with enum members"""
+    return name.replace("_", "").lower()
+
+
+def _codes(enum: type[Enum], constructors: tuple[str, ...]) -> np.ndarray:
+    """The constructor code of each member of an enum, in member order"""
+    index = {_normalize(c): i for i, c in enumerate(constructors)}
+    codes = []
+    for member in enum:
+        if _normalize(member.name) not in index:
+            raise ValueError(f"{member} has no constructor among {constructors}")
+        codes.append(index[_normalize(member.name)])
+    return np.array(codes, dtype=np.int8)
+
+
+def encode(values: list, t: Type, kernels: ModuleType):
+    """The kernel representation of Python values of a type, such as the
+    results of main.py; None stands for a missing value at any depth"""
+    if t in _SCALARS:
+        dtype = {"int": np.int64, "real": np.float64, "bool": bool}[t]
+        return np.array([0 if v is None else v for v in values], dtype=dtype)
+    if t in kernels.VARIANTS:
+        codes = {None: 0}
+        for member in set(values) - {None}:
+            codes[member] = _codes(type(member), kernels.VARIANTS[t])[
+                list(type(member)).index(member)
+            ]
+        return np.array([codes[v] for v in values], dtype=np.int8)
+    if t in kernels.RECORDS:
+        return {
+            name: encode(
+                [None if v is None else getattr(v, name) for v in values], ft, kernels
+            )
+            for name, ft in kernels.RECORDS[t].items()
+        }
+    if t[0] == "option":
+        return np.array([v is not None for v in values]), encode(values, t[1], kernels)
+    if t[0] == "tuple":
+        return tuple(
+            encode([None if v is None else v[i] for v in values], item, kernels)
+            for i, item in enumerate(t[1:])
+        )
+    lengths = np.array([0 if v is None else len(v) for v in values])
+    items = tuple(
+        encode(
+            [v[i] if v is not None and len(v) > i else None for v in values],
+            t[1],
+            kernels,
+        )
+        for i in range(kernels.PREFIX)
+    )
+    return lengths, items
+
+
+def _take(value, rows: np.ndarray):
+    if isinstance(value, dict):
+        return {name: _take(v, rows) for name, v in value.items()}
+    if isinstance(value, tuple):
+        return tuple(_take(v, rows) for v in value)
+    return value[rows]
+
+
+def _prefix(batch: Batch, offsets: np.ndarray, t: Type, kernels: ModuleType):
+    """The leading elements of lists stored side by side, as in `Books`"""
+    if not len(batch):
+        return encode([[]] * (len(offsets) - 1), ("list", t), kernels)
+    elements = columns(batch, t, kernels)
+    items = []
+    for i in range(kernels.PREFIX):
+        # Past the end of a list any row will do: its length masks it
+        items.append(_take(elements, np.minimum(offsets[:-1] + i, len(batch) - 1)))
+    return np.diff(offsets), tuple(items)
+
+
+def columns(value: Batch | Books | np.ndarray, t: Type, kernels: ModuleType):
+    """The kernel representation of generated inputs of a type, taken from
+    their columns without building objects"""
+    if isinstance(value, Books):
+        fields = kernels.RECORDS[t]
+        sides = {
+            "buys": (value.buys, value.buy_offsets),
+            "sells": (value.sells, value.sell_offsets),
+        }
+        return {
+            name: _prefix(*sides[name], fields[name][1], kernels) for name in fields
+        }
+    if not isinstance(value, Batch):
+        return np.asarray(value)
+    if t in kernels.VARIANTS:
+        ((name, column),) = value.columns.items()
+        return _codes(value.enums[name], kernels.VARIANTS[t])[column]
+    result = {}
+    for name, ft in kernels.RECORDS[t].items():
+        column = value.columns[name]
+        if ft in kernels.VARIANTS:
+            column = _codes(value.enums[name], kernels.VARIANTS[ft])[column]
+        result[name] = column
+    return result
+
+
+def differences(a, b, t: Type, kernels: ModuleType) -> np.ndarray:
+    """Where two kernel values of a type differ, ignoring absent values"""
+    if t in kernels.RECORDS:
+        fields = kernels.RECORDS[t].items()
+        return reduce(
+            np.logical_or, (differences(a[f], b[f], ft, kernels) for f, ft in fields)
+        )
+    if isinstance(t, str):
+        return np.not_equal(a, b)
+    if t[0] == "option":
+        present = a[0] & b[0]
+        return (a[0] != b[0]) | present & differences(a[1], b[1], t[1], kernels)
+    if t[0] == "tuple":
+        items = (differences(x, y, item, kernels) for x, y, item in zip(a, b, t[1:]))
+        return reduce(np.logical_or, items)
+    result = a[0] != b[0]
+    for i, (x, y) in enumerate(zip(a[1], b[1])):
+        result = result | (a[0] > i) & differences(x, y, t[1], kernels)
+    return result
+
+
+@dataclass(frozen=True)
+class Check:
+    """A function of both gen.iml and main.py, and inputs to compare them on"""
+
+    example: str
+    function: str  # Named alike in both
+    # One Batch, Books or array per parameter, from main.py, n and a generator
+    inputs: Callable[[ModuleType, int, np.random.Generator], list]
+
+
+def _members(enum: type[Enum], n: int, rng: np.random.Generator) -> Batch:
+    """A batch of random members of an enum"""
+    codes = rng.integers(0, len(enum), n, dtype=np.int8)
+    return Batch(lambda member: member, {"member": codes}, {"member": enum})
+
+
+def _bank_states(m: ModuleType, n: int, rng: np.random.Generator) -> Batch:
+    """Balances around the amount transferred, overdrawn ones included"""
+    return Batch(
+        m.BankState,
+        {
+            "alice_account": rng.integers(-5, 20, n),
+            "bob_account": rng.integers(-5, 20, n),
+            "money": rng.integers(0, 10, n),
+        },
+    )
+
+
+CHECKS = [
+    Check(
+        "six_swiss",
+        "match_price",
+        lambda m, n, rng: [
+            six_swiss_books(n, rng, module=m),
+            rng.integers(190, 211, n) * TICK,
+        ],
+    ),
+    Check(
+        "ubs_dark_pool",
+        "priority_price",
+        lambda m, n, rng: [
+            _members(m.OrderSide, n, rng),
+            ubs_orders(n, rng, module=m),
+            ubs_market_data(n, rng, module=m),
+        ],
+    ),
+    Check(
+        "ubs_dark_pool",
+        "order_higher_ranked",
+        lambda m, n, rng: [
+            _members(m.OrderSide, n, rng),
+            ubs_orders(n, rng, module=m),
+            ubs_orders(n, rng, module=m),
+            ubs_market_data(n, rng, module=m),
+        ],
+    ),
+    Check(
+        "river_crossing",
+        "one_step",
+        lambda m, n, rng: [
+            river_crossing_states(n, rng, m),
+            _members(m.Action, n, rng),
+        ],
+    ),
+    Check(
+        "tla/die_hard",
+        "apply",
+        lambda m, n, rng: [_members(m.Action, n, rng), die_hard_states(n, rng, m)],
+    ),
+    Check(
+        "tla/bank_account", "safe_transfer", lambda m, n, rng: [_bank_states(m, n, rng)]
+    ),
+]
+
+
+@dataclass
+class Conformance:
+    check: Check
+    inputs: int
+    mismatches: np.ndarray  # Input rows on which the model and main.py disagree
+    kernel_seconds: float  # Taking the columns and running the kernel
+    python_seconds: float  # Running main.py on objects already built
+    seconds: float  # The whole check, generating inputs and objects included
+
+    @property
+    def per_minute(self) -> float:
+        return self.inputs * 60 / self.seconds
+
+
+def conform(
+    check: Check, n: int, seed: Seed = 0, cache_dir: Path | None = CACHE_DIR
+) -> Conformance:
+    """Run a model function and main.py's on the same n generated inputs"""
+    start = time.perf_counter()
+    kernels = load_kernels(check.example, cache_dir)
+    main = load(check.example)
+    params, result = kernels.SIGNATURES[check.function]
+    arguments = check.inputs(main, n, np.random.default_rng(seed))
+
+    kernel_start = time.perf_counter()
+    values = [columns(a, t, kernels) for a, t in zip(arguments, params)]
+    got = kernels.FUNCTIONS[check.function](*values)
+    kernel_seconds = time.perf_counter() - kernel_start
+
+    objects = [
+        a.tolist() if isinstance(a, np.ndarray) else a.objects() for a in arguments
+    ]
+    function = getattr(main, check.function)
+    python_start = time.perf_counter()
+    expected = [function(*row) for row in zip(*objects)]
+    python_seconds = time.perf_counter() - python_start
+
+    differ = differences(got, encode(expected, result, kernels), result, kernels)
+    mismatches = np.flatnonzero(np.broadcast_to(differ, (n,)))
+    return Conformance(
+        check,
+        n,
+        mismatches,
+        kernel_seconds,
+        python_seconds,
+        time.perf_counter() - start,
+    )
+
+
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("example", nargs="?", choices=EXAMPLES)
+    parser.add_argument("-n", type=int, default=1_000_000, help="Inputs per check")
+    parser.add_argument("--source", action="store_true", help="Print the kernels")
+    args = parser.parse_args()
+    examples = [args.example] if args.example else EXAMPLES
+
+    if args.source:
+        for example in examples:
+            origin = f"{example}/gen.iml"
+            print(translate((ROOT / origin).read_text(), origin))
+        raise SystemExit
+
+    directory = Path(tempfile.mkdtemp())
+    try:
+        for example in examples:
+            start = time.perf_counter()
+            kernels = load_kernels(example, directory)
+            translated = time.perf_counter() - start
+            start = time.perf_counter()
+            load_kernels(example, directory)
+            cached = time.perf_counter() - start
+            skipped = ", ".join(f"{n} ({r})" for n, r in kernels.SKIPPED.items())
+            print(
+                f"{example}: {len(kernels.FUNCTIONS)} functions translated in "
+                f"{translated * 1e3:.1f}ms, reloaded in {cached * 1e3:.1f}ms"
+                + (f"; skipped {skipped}" if skipped else "")
+            )
+    finally:
+        shutil.rmtree(directory)
+
+    for check in CHECKS:
+        if check.example not in examples:
+            continue
+        conform(check, 1000)  # Translate and load outside the timing
+        c = conform(check, args.n)
+        print(
+            f"{check.example} {check.function}: {c.inputs:,} inputs, "
+            f"{len(c.mismatches)} mismatches; kernel "
+            f"{c.inputs / c.kernel_seconds / 1e6:.1f}M/sec, main.py "
+            f"{c.inputs / c.python_seconds / 1e6:.2f}M/sec, checked at "
+            f"{c.per_minute / 1e6:.1f}M/min"
+        )
@@ -0,0 +1,379 @@
+"""Generalized river-crossing engine.
+
+`main.State` hardcodes three goods, the two eating rules in `process_eating`
+and a one-item boat. Here items, predator/prey rules and the boat capacity are
+configurable, and a state is a single int bitset:
+
+    bit 0                boat side (1 = right)
+    bits 1 .. n          items on the right bank
+    bits n+1 .. 2n       items in the boat
+    bits 2n+1 .. 3n      eaten items
+
+Items on the left bank are the ones in none of the three masks. The rules of
+`main` carry over unchanged: a pick only succeeds from the bank the boat is at
+and while the boat has room, a drop puts an item on the bank the boat is at,
+and after every action the first predation rule (in order) whose predator and
+prey are both on the unattended bank eats the prey, which ends the game.
+"""
+
+import heapq
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from enum import Enum, auto
+from itertools import count
+
+import main
+
+
+class MoveKind(Enum):
+    CROSS_RIVER = auto()
+    PICK = auto()
+    DROP = auto()
+
+
+@dataclass(frozen=True)
+class Move:
+    kind: MoveKind
+    item: int = -1  # Index into Puzzle.items, unused for CROSS_RIVER
+
+
+CROSS_RIVER = Move(MoveKind.CROSS_RIVER)
+
+
+@dataclass
+class Puzzle:
+    items: tuple[str, ...]
+    # (predator, prey) rules, in the order they are checked after each action
+    predation: tuple[tuple[str, str], ...]
+    boat_capacity: int = 1
+
+    n: int = field(init=False)
+    all_items: int = field(init=False)
+    moves: list[Move] = field(init=False)
+    # Precomputed unsafe-bank masks: a bank is unsafe for a rule when it holds
+    # every item of the rule's mask
+    rule_masks: list[tuple[int, int]] = field(init=False)
+
+    def __post_init__(self):
+        if self.boat_capacity < 1:
+            raise ValueError(f"Invalid boat capacity: {self.boat_capacity}")
+        index = {item: i for i, item in enumerate(self.items)}
+        self.n = len(self.items)
+        self.all_items = (1 << self.n) - 1
+        self.moves = [CROSS_RIVER]
+        self.moves += [Move(MoveKind.PICK, i) for i in range(self.n)]
+        self.moves += [Move(MoveKind.DROP, i) for i in range(self.n)]
+        self.rule_masks = [
+            ((1 << index[predator]) | (1 << index[prey]), 1 << index[prey])
+            for predator, prey in self.predation
+        ]
+
+    # Encoding
+
+    def pack(self, right: int, boat: int, eaten: int, boat_right: bool) -> int:
+        n = self.n
+        return int(boat_right) | right << 1 | boat << (n + 1) | eaten << (2 * n + 1)
+
+    def unpack(self, state: int) -> tuple[int, int, int, bool]:
+        """Split a state into its (right, boat, eaten, boat_right) components"""
+        n, mask = self.n, self.all_items
+        return (
+            (state >> 1) & mask,
+            (state >> (n + 1)) & mask,
+            (state >> (2 * n + 1)) & mask,
+            bool(state & 1),
+        )
+
+    def initial_state(self) -> int:
+        """Everything on the left bank, boat included"""
+        return 0
+
+    def goal_state(self) -> int:
+        """Everything on the right bank, boat included"""
+        return self.pack(self.all_items, 0, 0, True)
+
+    # Predicates
+
+    def solved(self, state: int) -> bool:
+        return (state >> 1) & self.all_items == self.all_items
+
+    def anything_eaten(self, state: int) -> bool:
+        return state >> (2 * self.n + 1) != 0
+
+    def unattended_bank(self, state: int) -> int:
+        """Items on the bank the boat is not at"""
+        right, boat, eaten, boat_right = self.unpack(state)
+        if boat_right:
+            return self.all_items & ~(right | boat | eaten)
+        return right
+
+    def is_safe(self, state: int) -> bool:
+        bank = self.unattended_bank(state)
+        return all(bank & mask != mask for mask, _ in self.rule_masks)
+
+    # Transitions
+
+    def apply_move(self, state: int, move: Move) -> int:
+        """Apply a move to a state; moves that are not possible leave it unchanged"""
+        right, boat, eaten, boat_right = self.unpack(state)
+        if move.kind == MoveKind.CROSS_RIVER:
+            return state ^ 1
+        bit = 1 << move.item
+        if move.kind == MoveKind.PICK:
+            on_bank = (right & bit) if boat_right else (~(right | boat | eaten) & bit)
+            if not on_bank or boat.bit_count() >= self.boat_capacity:
+                return state
+            return self.pack(right & ~bit, boat | bit, eaten, boat_right)
+        if move.kind == MoveKind.DROP:
+            if not boat & bit:
+                return state
+            right = right | bit if boat_right else right
+            return self.pack(right, boat & ~bit, eaten, boat_right)
+        raise ValueError(f"Invalid move: {move}")
+
+    def process_eating(self, state: int) -> int:
+        """Let the first applicable predation rule eat on the unattended bank"""
+        bank = self.unattended_bank(state)
+        for mask, prey in self.rule_masks:
+            if bank & mask == mask:
+                right, boat, eaten, boat_right = self.unpack(state)
+                return self.pack(right & ~prey, boat, eaten | prey, boat_right)
+        return state
+
+    def one_step(self, state: int, move: Move) -> int:
+        if self.anything_eaten(state):
+            return state
+        return self.process_eating(self.apply_move(state, move))
+
+    def many_steps(self, state: int, moves: Sequence[Move]) -> int:
+        for move in moves:
+            state = self.one_step(state, move)
+            if self.anything_eaten(state):
+                return state
+        return state
+
+    def successors(self, state: int) -> Iterator[tuple[Move, int]]:
+        """Moves that change the state without anything getting eaten"""
+        for move in self.moves:
+            next_state = self.apply_move(state, move)
+            if next_state != state and self.is_safe(next_state):
+                yield move, next_state
+
+    def heuristic(self, state: int) -> int:
+        """Admissible lower bound on the number of moves left to solve the puzzle
+
+        Every item on the left bank needs a pick and a drop, every item in the
+        boat a drop, and the boat has to reach the right bank at least once more
+        if anything is still on the left or on a boat moored on the left.
+        """
+        right, boat, eaten, boat_right = self.unpack(state)
+        left = self.all_items & ~(right | boat | eaten)
+        crossing = 1 if left or (boat and not boat_right) else 0
+        return 2 * left.bit_count() + boat.bit_count() + crossing
+
+    def describe(self, move: Move) -> str:
+        if move.kind == MoveKind.CROSS_RIVER:
+            return "CROSS_RIVER"
+        return f"{move.kind.name}_{self.items[move.item].upper()}"
+
+
+def inverse(move: Move) -> Move:
+    """The move that undoes a successful move
+
+    Picks and drops happen on the bank the boat is at, so a pick is undone by a
+    drop of the same item and vice versa.
+    """
+    if move.kind == MoveKind.PICK:
+        return Move(MoveKind.DROP, move.item)
+    if move.kind == MoveKind.DROP:
+        return Move(MoveKind.PICK, move.item)
+    return move
+
+
+@dataclass
+class SearchResult:
+    moves: list[Move] | None  # None when the puzzle has no solution
+    expanded: int  # Number of states whose successors were generated
+
+
+def solve_astar(puzzle: Puzzle, start: int | None = None) -> SearchResult:
+    """Find a shortest plan with A* over the safe states"""
+    start = puzzle.initial_state() if start is None else start
+    tie = count()
+    best = {start: 0}
+    parents: dict[int, tuple[int, Move]] = {}
+    queue = [(puzzle.heuristic(start), 0, next(tie), start)]
+    expanded = 0
+    while queue:
+        _, cost, _, state = heapq.heappop(queue)
+        if cost > best[state]:
+            continue
+        if puzzle.solved(state):
+            return SearchResult(_trace(parents, start, state), expanded)
+        expanded += 1
+        for move, next_state in puzzle.successors(state):
+            if cost + 1 < best.get(next_state, cost + 2):
+                best[next_state] = cost + 1
+                parents[next_state] = (state, move)
+                f = cost + 1 + puzzle.heuristic(next_state)
+                heapq.heappush(queue, (f, cost + 1, next(tie), next_state))
+    return SearchResult(None, expanded)
+
+
+def solve_bidirectional(puzzle: Puzzle, start: int | None = None) -> SearchResult:
+    """Find a shortest plan with a bidirectional breadth-first search
+
+    The safe-state graph is symmetric (see `inverse`), so the backward search
+    reuses `Puzzle.successors` starting from the safe goal state.
+    """
+    start = puzzle.initial_state() if start is None else start
+    goal = puzzle.goal_state()
+    if not puzzle.is_safe(goal):
+        return SearchResult(None, 0)
+    forward: dict[int, tuple[int, Move] | None] = {start: None}
+    backward: dict[int, tuple[int, Move] | None] = {goal: None}
+    forward_layer, backward_layer = [start], [goal]
+    expanded = 0
+    if start == goal:
+        return SearchResult([], expanded)
+    while forward_layer and backward_layer:
+        grow_forward = len(forward_layer) <= len(backward_layer)
+        layer = forward_layer if grow_forward else backward_layer
+        seen, other = (forward, backward) if grow_forward else (backward, forward)
+        next_layer, meeting = [], []
+        for state in layer:
+            expanded += 1
+            for move, next_state in puzzle.successors(state):
+                if next_state in seen:
+                    continue
+                seen[next_state] = (state, move)
+                next_layer.append(next_state)
+                if next_state in other:
+                    meeting.append(next_state)
+        if meeting:
+            plans = [
+                _trace(forward, start, state) + _trace_back(backward, state)
+                for state in meeting
+            ]
+            return SearchResult(min(plans, key=len), expanded)
+        if grow_forward:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+    return SearchResult(None, expanded)
+
+
+def _trace(parents, start: int, state: int) -> list[Move]:
+    moves = []
+    while state != start:
+        state, move = parents[state]
+        moves.append(move)
+    moves.reverse()
+    return moves
+
+
+def _trace_back(parents, state: int) -> list[Move]:
+    """Moves from state to the root of a backward search tree"""
+    moves = []
+    while parents[state] is not None:
+        state, move = parents[state]
+        moves.append(inverse(move))
+    return moves
+
+
+# The three-good puzzle of `main`
+
+
+def wolf_goat_cabbage() -> Puzzle:
+    """The puzzle modelled by `main`, with its goods in `main.Good` order"""
+    return Puzzle(
+        items=("cabbage", "goat", "wolf"),
+        predation=(("goat", "cabbage"), ("wolf", "goat")),
+        boat_capacity=1,
+    )
+
+
+_GOODS = list(main.Good)
+
+_ACTION_TO_MOVE = {
+    main.Action.CROSS_RIVER: CROSS_RIVER,
+    main.Action.PICK_CABBAGE: Move(MoveKind.PICK, 0),
+    main.Action.PICK_GOAT: Move(MoveKind.PICK, 1),
+    main.Action.PICK_WOLF: Move(MoveKind.PICK, 2),
+    main.Action.DROP_CABBAGE: Move(MoveKind.DROP, 0),
+    main.Action.DROP_GOAT: Move(MoveKind.DROP, 1),
+    main.Action.DROP_WOLF: Move(MoveKind.DROP, 2),
+}
+_MOVE_TO_ACTION = {move: action for action, move in _ACTION_TO_MOVE.items()}
+
+
+def from_main_action(action: main.Action) -> Move:
+    return _ACTION_TO_MOVE[action]
+
+
+def to_main_action(move: Move) -> main.Action:
+    return _MOVE_TO_ACTION[move]
+
+
+def from_main_state(puzzle: Puzzle, state: main.State) -> int:
+    masks = {
+        main.Location.RIGHT_COAST: 0,
+        main.Location.BOAT: 0,
+        main.Location.EATEN: 0,
+        main.Location.LEFT_COAST: 0,
+    }
+    for i, good in enumerate(_GOODS):
+        masks[state.get_location(good)] |= 1 << i
+    return puzzle.pack(
+        masks[main.Location.RIGHT_COAST],
+        masks[main.Location.BOAT],
+        masks[main.Location.EATEN],
+        state.boat == main.Boat.RIGHT,
+    )
+
+
+def to_main_state(puzzle: Puzzle, state: int) -> main.State:
+    right, boat, eaten, boat_right = puzzle.unpack(state)
+    result = main.State(boat=main.Boat.RIGHT if boat_right else main.Boat.LEFT)
+    for i, good in enumerate(_GOODS):
+        bit = 1 << i
+        if right & bit:
+            result.set_location(good, main.Location.RIGHT_COAST)
+        elif boat & bit:
+            result.set_location(good, main.Location.BOAT)
+        elif eaten & bit:
+            result.set_location(good, main.Location.EATEN)
+    return result
+
+
+def paired_puzzle(n_items: int, boat_capacity: int) -> Puzzle:
+    """A scalable puzzle: items come in predator/prey pairs (1 eats 0, 3 eats 2, ...)"""
+    items = tuple(f"item{i}" for i in range(n_items))
+    predation = tuple((items[i + 1], items[i]) for i in range(0, n_items - 1, 2))
+    return Puzzle(items=items, predation=predation, boat_capacity=boat_capacity)
+
+
+if __name__ == "__main__":
+    import time
+
+    puzzle = wolf_goat_cabbage()
+    plan = solve_astar(puzzle).moves
+    print("wolf/goat/cabbage:", [puzzle.describe(move) for move in plan])
+
+    print(
+        f"{'items':>5} {'cap':>3} {'solver':>13} {'moves':>5} {'expanded':>9} {'time':>8}"
+    )
+    for n_items in (3, 4, 6, 8, 10):
+        puzzle = paired_puzzle(n_items, boat_capacity=max(1, n_items // 2))
+        for name, solver in (
+            ("astar", solve_astar),
+            ("bidirectional", solve_bidirectional),
+        ):
+            start = time.perf_counter()
+            result = solver(puzzle)
+            elapsed = time.perf_counter() - start
+            length = "-" if result.moves is None else len(result.moves)
+            print(
+                f"{n_items:>5} {puzzle.boat_capacity:>3} {name:>13} {length:>5} "
+                f"{result.expanded:>9} {elapsed:>7.3f}s"
+            )
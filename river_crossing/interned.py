@@ -0,0 +1,168 @@
+"""Hash-consed, interned states for the refactored river-crossing model.
+
+`refactored.State` is frozen, yet every `set_location`, `pick` and `drop` call
+allocates a new instance and every `get_location` builds a dict. With three
+goods in four locations and a boat on one of two sides there are only 128
+distinct states, so here each of them is a singleton flyweight. Its flags and
+all of its transitions are computed once, with the functions of `refactored`,
+when this module is imported. Afterwards a transition is a table lookup that
+returns an existing instance and allocates nothing.
+"""
+
+from collections.abc import Sequence
+from itertools import product
+
+import refactored
+from refactored import Action, Boat, Good, Location
+
+
+class InternedState:
+    """The unique instance standing for one `refactored.State` value"""
+
+    __slots__ = (
+        "state",
+        "index",
+        "solved",
+        "anything_eaten",
+        "boat_empty",
+        "_locations",
+        "_set_location",
+        "_pick",
+        "_drop",
+        "_apply_action",
+        "_one_step",
+    )
+
+    def __init__(self, state: refactored.State, index: int):
+        self.state = state
+        self.index = index
+        self.solved = state.solved()
+        self.anything_eaten = state.anything_eaten()
+        self.boat_empty = state.boat_empty()
+        self._locations = {good: state.get_location(good) for good in Good}
+
+    def _link(self) -> None:
+        """Fill in the transition tables once every state has been interned"""
+        state = self.state
+        self._set_location = {
+            (good, location): intern(state.set_location(good, location))
+            for good in Good
+            for location in Location
+        }
+        self._pick = {good: intern(state.pick(good)) for good in Good}
+        self._drop = {good: intern(state.drop(good)) for good in Good}
+        self._apply_action = {
+            action: intern(refactored.apply_action(state, action)) for action in Action
+        }
+        self._one_step = {
+            action: intern(refactored.one_step(state, action)) for action in Action
+        }
+
+    @property
+    def boat(self) -> Boat:
+        return self.state.boat
+
+    def get_location(self, good: Good) -> Location:
+        return self._locations[good]
+
+    def set_location(self, good: Good, location: Location) -> "InternedState":
+        return self._set_location[good, location]
+
+    def pick(self, good: Good) -> "InternedState":
+        return self._pick[good]
+
+    def drop(self, good: Good) -> "InternedState":
+        return self._drop[good]
+
+    def apply_action(self, action: Action) -> "InternedState":
+        return self._apply_action[action]
+
+    def one_step(self, action: Action) -> "InternedState":
+        return self._one_step[action]
+
+    def __repr__(self) -> str:
+        return repr(self.state)
+
+
+_table: dict[refactored.State, InternedState] = {}
+
+
+def intern(state: refactored.State) -> InternedState:
+    """Return the interned instance for a state value"""
+    return _table[state]
+
+
+def _build() -> None:
+    for index, (cabbage, goat, wolf, boat) in enumerate(
+        product(Location, Location, Location, Boat)
+    ):
+        state = refactored.State(cabbage=cabbage, goat=goat, wolf=wolf, boat=boat)
+        _table[state] = InternedState(state, index)
+    for interned in _table.values():
+        interned._link()
+
+
+_build()
+
+all_states: tuple[InternedState, ...] = tuple(_table.values())
+
+init_state = intern(refactored.init_state)
+
+
+def one_step(state: InternedState, action: Action) -> InternedState:
+    """Process one step of the game given a state and an action"""
+    return state._one_step[action]
+
+
+def many_steps(state: InternedState, actions: Sequence[Action]) -> InternedState:
+    """Process multiple steps of the game"""
+    for action in actions:
+        state = state._one_step[action]
+        if state.anything_eaten:
+            return state
+    return state
+
+
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+    import tracemalloc
+
+    rng = random.Random(0)
+    actions = rng.choices(list(Action), k=200_000)
+
+    def walk(step, eaten, init):
+        """Take every action, restarting after something is eaten, and keep the trace"""
+        trace = [None] * len(actions)
+        state = init
+        for i, action in enumerate(actions):
+            state = step(state, action)
+            if eaten(state):
+                state = init
+            trace[i] = state
+        return trace
+
+    for name, step, eaten, init in (
+        (
+            "refactored",
+            refactored.one_step,
+            refactored.State.anything_eaten,
+            refactored.init_state,
+        ),
+        ("interned", one_step, lambda s: s.anything_eaten, init_state),
+    ):
+        start = time.perf_counter()
+        walk(step, eaten, init)
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        trace = walk(step, eaten, init)
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        # The trace list itself is the only allocation the interned walk makes
+        retained -= sys.getsizeof(trace)
+        print(
+            f"{name:>10}: {len(actions) / elapsed:>12,.0f} steps/s, "
+            f"{retained:>12,} bytes retained by states"
+        )
@@ -0,0 +1,91 @@
+"""Precomputed distance-to-goal table for the river-crossing model.
+
+The table is that of `code_logician_examples.oracle`; this module numbers the
+states. With three goods in four locations and the boat on one of two sides
+there are 128 of them: `index` reads the locations of the cabbage, the goat and
+the wolf as base-4 digits, followed by the side of the boat.
+"""
+
+import sys
+from itertools import product
+from pathlib import Path
+
+import main
+from main import Action, Boat, Location, State, one_step
+
+try:
+    import code_logician_examples.oracle
+except ModuleNotFoundError:
+    # Run from this directory without `pip install -e .`: the package is at
+    # the root of the repository
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+    import code_logician_examples.oracle
+from code_logician_examples.oracle import UNREACHABLE, Oracle, StateSpace
+
+CACHE_DIR = Path(__file__).parent / "__pycache__"
+
+LOCATIONS = list(Location)
+BOATS = list(Boat)
+ACTIONS = list(Action)
+N_STATES = len(LOCATIONS) ** 3 * len(BOATS)
+_LOCATION_INDEX = {location: i for i, location in enumerate(LOCATIONS)}
+_BOAT_INDEX = {boat: i for i, boat in enumerate(BOATS)}
+
+
+def index(state: State) -> int:
+    """The number of a state, from 0 to N_STATES - 1"""
+    i = _LOCATION_INDEX[state.cabbage]
+    i = i * len(LOCATIONS) + _LOCATION_INDEX[state.goat]
+    i = i * len(LOCATIONS) + _LOCATION_INDEX[state.wolf]
+    return i * len(BOATS) + _BOAT_INDEX[state.boat]
+
+
+def all_states() -> list[State]:
+    """Every state, in index order"""
+    return [
+        State(cabbage, goat, wolf, boat)
+        for cabbage, goat, wolf, boat in product(LOCATIONS, LOCATIONS, LOCATIONS, BOATS)
+    ]
+
+
+SPACE = StateSpace(main, all_states, index, ACTIONS, one_step, State.solved)
+
+
+def load_oracle(cache_dir: Path | None = CACHE_DIR) -> Oracle:
+    """Build the oracle, or reload the table saved for the current model"""
+    return code_logician_examples.oracle.load_oracle(SPACE, cache_dir)
+
+
+if __name__ == "__main__":
+    import time
+
+    import witness
+    from main import init_state
+
+    start = time.perf_counter()
+    oracle = Oracle.build(SPACE)
+    print(f"Built the table in {(time.perf_counter() - start) * 1000:.2f}ms")
+    load_oracle()
+    start = time.perf_counter()
+    oracle = load_oracle()
+    print(f"Reloaded it in {(time.perf_counter() - start) * 1000:.3f}ms")
+
+    reachable = sum(d != UNREACHABLE for d in oracle.distances)
+    print(f"{reachable} of {N_STATES} states can still reach the goal")
+    print(f"Distance from the initial state: {oracle.distance(init_state)}")
+
+    states = [s for s in all_states() if oracle.distance(s) is not None]
+    n = 1_000_000
+    start = time.perf_counter()
+    for i in range(n):
+        oracle.best_action(states[i % len(states)])
+    elapsed = time.perf_counter() - start
+    print(f"best_action: {elapsed / n * 1e9:.0f}ns per lookup")
+
+    start = time.perf_counter()
+    for state in states:
+        witness._plans.clear()
+        witness._dead.clear()
+        witness.find_plan(state)
+    elapsed = time.perf_counter() - start
+    print(f"Searching instead: {elapsed / len(states) * 1e6:.0f}us per state")
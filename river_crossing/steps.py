@@ -0,0 +1,61 @@
+"""Lazy step-by-step traces of `many_steps`.
+
+`many_steps` only returns the final state, so seeing the states along the way
+used to mean re-running every prefix of the plan. `iter_steps` instead yields
+each action with the state it leads to, as it goes. The actions may be any
+iterable, including a generator, and nothing is kept once it has been yielded,
+so arbitrarily long traces run in constant memory.
+"""
+
+from collections.abc import Callable, Iterable, Iterator
+
+from main import Action, State, one_step
+
+
+def iter_steps(
+    state: State,
+    actions: Iterable[Action],
+    stop: Callable[[State], bool] | None = None,
+) -> Iterator[tuple[Action, State]]:
+    """Yield (action, state after the action) for each action in turn
+
+    Like `many_steps`, the trace ends with the first state where something has
+    been eaten. It also ends with the first state satisfying stop, for example
+    `State.solved`.
+
+    Args:
+        state: The initial game state
+        actions: The actions to apply in sequence
+        stop: A predicate on states ending the trace early
+    """
+    for action in actions:
+        state = one_step(state, action)
+        yield action, state
+        if state.anything_eaten() or (stop is not None and stop(state)):
+            return
+
+
+if __name__ == "__main__":
+    import itertools
+    import time
+    import tracemalloc
+
+    from main import init_state
+    from witness import find_plan
+
+    for action, state in iter_steps(init_state, find_plan()):
+        print(f"{action.name:<13} {state}")
+
+    # Shuttling the goat back and forth never gets anything eaten
+    shuttle = [Action.PICK_GOAT, Action.CROSS_RIVER, Action.DROP_GOAT]
+    n = 1_000_000
+    actions = itertools.islice(itertools.cycle(shuttle), n)
+    start = time.perf_counter()
+    steps = sum(1 for _ in iter_steps(init_state, actions))
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    for _ in iter_steps(init_state, itertools.islice(itertools.cycle(shuttle), n)):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{steps:,} steps streamed in {elapsed:.2f}s, peak {peak:,} bytes traced")
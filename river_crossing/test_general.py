@@ -0,0 +1,70 @@
+import random
+
+from general import (
+    Puzzle,
+    from_main_action,
+    from_main_state,
+    paired_puzzle,
+    solve_astar,
+    solve_bidirectional,
+    to_main_action,
+    to_main_state,
+    wolf_goat_cabbage,
+)
+from main import Action, init_state, many_steps
+
+
+class TestGeneral:
+    def setUp(self):
+        self.puzzle = wolf_goat_cabbage()
+
+    def test_preset_matches_many_steps(self):
+        self.setUp()
+        rng = random.Random(7)
+        actions = list(Action)
+        start = from_main_state(self.puzzle, init_state)
+        for _ in range(2000):
+            plan = rng.choices(actions, k=rng.randrange(20))
+            expected = many_steps(init_state, plan)
+            state = self.puzzle.many_steps(start, [from_main_action(a) for a in plan])
+            assert to_main_state(self.puzzle, state) == expected
+            assert self.puzzle.solved(state) == expected.solved()
+            assert self.puzzle.anything_eaten(state) == expected.anything_eaten()
+
+    def test_solvers_find_a_shortest_plan(self):
+        self.setUp()
+        for solver in (solve_astar, solve_bidirectional):
+            moves = solver(self.puzzle).moves
+            assert len(moves) == 17
+            assert many_steps(init_state, [to_main_action(m) for m in moves]).solved()
+
+    def test_solvers_agree_on_larger_puzzles(self):
+        self.setUp()
+        for n_items in (4, 6, 8):
+            puzzle = paired_puzzle(n_items, boat_capacity=n_items // 2)
+            astar = solve_astar(puzzle).moves
+            bidirectional = solve_bidirectional(puzzle).moves
+            assert len(astar) == len(bidirectional)
+            assert puzzle.solved(puzzle.many_steps(puzzle.initial_state(), astar))
+            assert puzzle.solved(
+                puzzle.many_steps(puzzle.initial_state(), bidirectional)
+            )
+
+    def test_unsolvable_puzzle(self):
+        self.setUp()
+        # Two predators on the same prey and a one-item boat
+        puzzle = Puzzle(
+            items=("a", "b", "c", "d"),
+            predation=(("b", "a"), ("c", "a"), ("d", "b"), ("d", "c")),
+        )
+        assert solve_astar(puzzle).moves is None
+        assert solve_bidirectional(puzzle).moves is None
+
+
+if __name__ == "__main__":
+    test = TestGeneral()
+    test.test_preset_matches_many_steps()
+    test.test_solvers_find_a_shortest_plan()
+    test.test_solvers_agree_on_larger_puzzles()
+    test.test_unsolvable_puzzle()
+    print("All tests passed!")
@@ -0,0 +1,61 @@
+import random
+import tracemalloc
+
+import refactored
+from interned import all_states, init_state, intern, many_steps, one_step
+from refactored import Action, Good, Location
+
+
+class TestInterned:
+    def test_every_state_is_a_singleton(self):
+        assert len(all_states) == 128
+        for interned in all_states:
+            assert intern(interned.state.copy()) is interned
+
+    def test_flags_and_transitions_match_refactored(self):
+        for interned in all_states:
+            state = interned.state
+            assert interned.solved == state.solved()
+            assert interned.anything_eaten == state.anything_eaten()
+            assert interned.boat_empty == state.boat_empty()
+            for good in Good:
+                assert interned.get_location(good) == state.get_location(good)
+                assert interned.pick(good).state == state.pick(good)
+                assert interned.drop(good).state == state.drop(good)
+                assert interned.set_location(good, Location.EATEN).state == (
+                    state.set_location(good, Location.EATEN)
+                )
+            for action in Action:
+                assert one_step(interned, action).state == refactored.one_step(
+                    state, action
+                )
+
+    def test_many_steps_matches_refactored(self):
+        rng = random.Random(3)
+        for _ in range(1000):
+            actions = rng.choices(list(Action), k=rng.randrange(20))
+            assert many_steps(init_state, actions).state == refactored.many_steps(
+                refactored.init_state, actions
+            )
+
+    def test_transitions_do_not_allocate(self):
+        actions = random.Random(5).choices(list(Action), k=10_000)
+        trace = [None] * len(actions)
+        state = init_state
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        for i, action in enumerate(actions):
+            state = one_step(state, action)
+            trace[i] = state
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert after - before < 1024
+
+
+if __name__ == "__main__":
+    test = TestInterned()
+    test.test_every_state_is_a_singleton()
+    test.test_flags_and_transitions_match_refactored()
+    test.test_many_steps_matches_refactored()
+    test.test_transitions_do_not_allocate()
+    print("All tests passed!")
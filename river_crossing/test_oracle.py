@@ -0,0 +1,44 @@
+import tempfile
+from pathlib import Path
+
+from main import init_state, many_steps, one_step
+from oracle import SPACE, Oracle, all_states, load_oracle
+from witness import find_plan
+
+
+class TestOracle:
+    def setUp(self):
+        self.oracle = Oracle.build(SPACE)
+
+    def test_matches_forward_search(self):
+        self.setUp()
+        for state in all_states():
+            plan = self.oracle.plan(state)
+            shortest = find_plan(state)
+            if shortest is None:
+                assert plan is None and self.oracle.distance(state) is None
+            else:
+                assert len(plan) == len(shortest) == self.oracle.distance(state)
+                assert many_steps(state, plan).solved()
+
+    def test_initial_state(self):
+        self.setUp()
+        assert self.oracle.distance(init_state) == 17
+        action = self.oracle.best_action(init_state)
+        assert self.oracle.distance(one_step(init_state, action)) == 16
+
+    def test_cache_round_trip(self):
+        self.setUp()
+        with tempfile.TemporaryDirectory() as directory:
+            first = load_oracle(Path(directory))
+            second = load_oracle(Path(directory))
+        assert first.distances == second.distances == self.oracle.distances
+        assert second.actions == self.oracle.actions
+
+
+if __name__ == "__main__":
+    test = TestOracle()
+    test.test_matches_forward_search()
+    test.test_initial_state()
+    test.test_cache_round_trip()
+    print("All tests passed!")
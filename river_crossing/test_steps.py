@@ -0,0 +1,53 @@
+import itertools
+import tracemalloc
+
+from main import Action, Boat, init_state, many_steps
+from steps import iter_steps
+
+
+class TestSteps:
+    def setUp(self):
+        self.actions = [
+            Action.PICK_GOAT,
+            Action.CROSS_RIVER,
+            Action.DROP_GOAT,
+            Action.CROSS_RIVER,
+            Action.PICK_WOLF,
+            Action.CROSS_RIVER,
+        ]
+
+    def test_trace_matches_prefixes(self):
+        self.setUp()
+        trace = list(iter_steps(init_state, self.actions))
+        assert [action for action, _ in trace] == self.actions
+        for i, (_, state) in enumerate(trace):
+            assert state == many_steps(init_state, self.actions[: i + 1])
+
+    def test_stops_when_eaten_or_on_predicate(self):
+        self.setUp()
+        eaten = list(iter_steps(init_state, [Action.CROSS_RIVER] * 5))
+        assert len(eaten) == 1 and eaten[0][1].anything_eaten()
+        stopped = list(
+            iter_steps(init_state, self.actions, stop=lambda s: s.boat == Boat.RIGHT)
+        )
+        assert [action for action, _ in stopped] == self.actions[:2]
+
+    def test_constant_memory(self):
+        self.setUp()
+        shuttle = itertools.cycle(
+            [Action.PICK_GOAT, Action.CROSS_RIVER, Action.DROP_GOAT]
+        )
+        tracemalloc.start()
+        for _ in iter_steps(init_state, itertools.islice(shuttle, 30_000)):
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert peak < 4096
+
+
+if __name__ == "__main__":
+    test = TestSteps()
+    test.test_trace_matches_prefixes()
+    test.test_stops_when_eaten_or_on_predicate()
+    test.test_constant_memory()
+    print("All tests passed!")
@@ -0,0 +1,41 @@
+import random
+
+from main import Action, init_state, many_steps
+from trie_eval import build_trie, evaluate_sequences, iter_terminals
+
+
+class TestTrieEval:
+    def setUp(self):
+        rng = random.Random(42)
+        actions = list(Action)
+        self.sequences = [rng.choices(actions, k=rng.randrange(12)) for _ in range(500)]
+        # Duplicates and an empty plan must be handled too
+        self.sequences += [self.sequences[0], []]
+
+    def test_trie_shares_prefixes(self):
+        self.setUp()
+        root = build_trie([[Action.PICK_GOAT, Action.CROSS_RIVER], [Action.PICK_GOAT]])
+        assert list(root.children) == [Action.PICK_GOAT]
+        assert sorted(iter_terminals(root)) == [0, 1]
+
+    def test_matches_many_steps(self):
+        self.setUp()
+        results = evaluate_sequences(self.sequences, max_workers=1)
+        for actions, result in zip(self.sequences, results, strict=True):
+            expected = many_steps(init_state, actions)
+            assert result.final_state == expected
+            assert result.solved == expected.solved()
+
+    def test_process_pool_matches_serial(self):
+        self.setUp()
+        serial = evaluate_sequences(self.sequences, max_workers=1)
+        pooled = evaluate_sequences(self.sequences, max_workers=2, parallel_threshold=0)
+        assert pooled == serial
+
+
+if __name__ == "__main__":
+    test = TestTrieEval()
+    test.test_trie_shares_prefixes()
+    test.test_matches_many_steps()
+    test.test_process_pool_matches_serial()
+    print("All tests passed!")
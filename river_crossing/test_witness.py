@@ -0,0 +1,34 @@
+from main import Action, Location, State, init_state, many_steps
+from witness import find_plan
+
+
+class TestWitness:
+    def setUp(self):
+        self.plan = find_plan()
+
+    def test_plan_solves_puzzle(self):
+        self.setUp()
+        assert self.plan is not None
+        assert many_steps(init_state, self.plan).solved()
+
+    def test_plan_is_shortest(self):
+        self.setUp()
+        assert len(self.plan) == 17
+        assert find_plan(max_depth=16) is None
+        assert find_plan(max_depth=17) == self.plan
+
+    def test_solved_and_dead_states(self):
+        self.setUp()
+        solved = State(Location.RIGHT_COAST, Location.RIGHT_COAST, Location.RIGHT_COAST)
+        assert find_plan(solved) == []
+        eaten = many_steps(init_state, [Action.CROSS_RIVER])
+        assert eaten.anything_eaten()
+        assert find_plan(eaten) is None
+
+
+if __name__ == "__main__":
+    test = TestWitness()
+    test.test_plan_solves_puzzle()
+    test.test_plan_is_shortest()
+    test.test_solved_and_dead_states()
+    print("All tests passed!")
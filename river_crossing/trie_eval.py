@@ -0,0 +1,191 @@
+"""Bulk validation of action sequences with shared-prefix evaluation.
+
+`many_steps` replays every candidate plan from `init_state`, so a batch of plans
+that share prefixes evaluates those prefixes over and over. Here all sequences
+are inserted into a trie and each trie edge is evaluated exactly once. A branch
+stops as soon as something has been eaten, since `one_step` leaves an eaten
+state unchanged. Large batches are split into subtries that are evaluated in a
+process pool.
+"""
+
+import os
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from main import Action, State, init_state, one_step
+
+
+@dataclass
+class TrieNode:
+    children: dict[Action, "TrieNode"] = field(default_factory=dict)
+    # Indices (into the input batch) of the sequences that end at this node
+    terminals: list[int] = field(default_factory=list)
+
+
+@dataclass
+class SequenceResult:
+    final_state: State
+    solved: bool
+
+
+def build_trie(sequences: Sequence[Sequence[Action]]) -> TrieNode:
+    """Insert every sequence into a trie, sharing common prefixes"""
+    root = TrieNode()
+    for index, actions in enumerate(sequences):
+        node = root
+        for action in actions:
+            child = node.children.get(action)
+            if child is None:
+                child = node.children[action] = TrieNode()
+            node = child
+        node.terminals.append(index)
+    return root
+
+
+def iter_terminals(node: TrieNode) -> Iterator[int]:
+    """Yield the indices of all sequences ending in the subtrie rooted at node"""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield from node.terminals
+        stack.extend(node.children.values())
+
+
+def evaluate_subtrie(node: TrieNode, state: State) -> list[tuple[int, State]]:
+    """Evaluate every sequence in the subtrie, starting from the given state
+
+    Returns:
+        (sequence index, final state) pairs, in no particular order
+    """
+    results: list[tuple[int, State]] = []
+    stack = [(node, state)]
+    while stack:
+        subtrie, subtrie_state = stack.pop()
+        if subtrie_state.anything_eaten():
+            # The game is over: every sequence below ends in this state
+            results.extend((index, subtrie_state) for index in iter_terminals(subtrie))
+            continue
+        results.extend((index, subtrie_state) for index in subtrie.terminals)
+        for action, child in subtrie.children.items():
+            stack.append((child, one_step(subtrie_state, action)))
+    return results
+
+
+def _evaluate_task(task: tuple[TrieNode, State]) -> list[tuple[int, State]]:
+    node, state = task
+    return evaluate_subtrie(node, state)
+
+
+def split_trie(
+    root: TrieNode, state: State, min_tasks: int
+) -> tuple[list[tuple[int, State]], list[tuple[TrieNode, State]]]:
+    """Expand the trie breadth-first until there are at least min_tasks subtries
+
+    Prefixes above the split are evaluated here, once. Sequences that end above
+    the split (or in an eaten branch) are resolved immediately.
+
+    Returns:
+        The resolved (sequence index, final state) pairs and the (subtrie, state)
+        tasks that remain to be evaluated
+    """
+    resolved: list[tuple[int, State]] = []
+    frontier = [(root, state)]
+    while 0 < len(frontier) < min_tasks:
+        next_frontier = []
+        for subtrie, subtrie_state in frontier:
+            if subtrie_state.anything_eaten():
+                resolved.extend(
+                    (index, subtrie_state) for index in iter_terminals(subtrie)
+                )
+                continue
+            resolved.extend((index, subtrie_state) for index in subtrie.terminals)
+            for action, child in subtrie.children.items():
+                next_frontier.append((child, one_step(subtrie_state, action)))
+        frontier = next_frontier
+    return resolved, frontier
+
+
+def evaluate_sequences(
+    sequences: Sequence[Sequence[Action]],
+    state: State = init_state,
+    max_workers: int | None = None,
+    parallel_threshold: int = 10_000,
+) -> list[SequenceResult]:
+    """Evaluate a batch of action sequences, as `many_steps` would one by one
+
+    Args:
+        sequences: The candidate plans
+        state: The state every plan starts from
+        max_workers: Size of the process pool; 1 evaluates in this process
+        parallel_threshold: Batches with fewer sequences are evaluated in this
+            process, where the pool start-up cost would dominate
+
+    Returns:
+        One result per input sequence, in input order
+    """
+    root = build_trie(sequences)
+    workers = max_workers or os.cpu_count() or 1
+
+    if workers == 1 or len(sequences) < parallel_threshold:
+        pairs = evaluate_subtrie(root, state)
+    else:
+        pairs, tasks = split_trie(root, state, min_tasks=4 * workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk in pool.map(_evaluate_task, tasks):
+                pairs.extend(chunk)
+
+    final_states: list[State | None] = [None] * len(sequences)
+    for index, final_state in pairs:
+        final_states[index] = final_state
+    return [SequenceResult(s, s.solved()) for s in final_states]
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    from main import many_steps
+
+    # Candidate plans that all start like a known solution and then diverge
+    solution = [
+        Action.PICK_GOAT,
+        Action.CROSS_RIVER,
+        Action.DROP_GOAT,
+        Action.CROSS_RIVER,
+        Action.PICK_WOLF,
+        Action.CROSS_RIVER,
+        Action.DROP_WOLF,
+        Action.PICK_GOAT,
+        Action.CROSS_RIVER,
+        Action.DROP_GOAT,
+        Action.PICK_CABBAGE,
+        Action.CROSS_RIVER,
+        Action.DROP_CABBAGE,
+        Action.CROSS_RIVER,
+        Action.PICK_GOAT,
+        Action.CROSS_RIVER,
+        Action.DROP_GOAT,
+    ]
+    rng = random.Random(0)
+    actions = list(Action)
+    plans = [
+        solution[: rng.randrange(len(solution) + 1)]
+        + rng.choices(actions, k=rng.randrange(8))
+        for _ in range(200_000)
+    ]
+
+    start = time.perf_counter()
+    expected = [many_steps(init_state, plan) for plan in plans]
+    naive = time.perf_counter() - start
+
+    for workers in (1, None):
+        start = time.perf_counter()
+        results = evaluate_sequences(plans, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        assert [r.final_state for r in results] == expected
+        print(
+            f"workers={workers or os.cpu_count()}: {elapsed:.3f}s "
+            f"(many_steps: {naive:.3f}s, {naive / elapsed:.1f}x), "
+            f"solved: {sum(r.solved for r in results)}"
+        )
@@ -0,0 +1,108 @@
+"""Native witness search for the `instance` query in gen_w_query.iml.
+
+The query asks for actions such that `many_steps init_state actions` is
+solved. Imandra times out on it (see README.md), and enumerating action
+sequences blindly is hopeless too: the shortest plan has 17 actions and there
+are 7 actions to choose from at every step. The model has only 128 distinct
+states though, so a breadth-first search over `main.one_step` that never
+revisits a state finds the shortest plan after expanding a few dozen states.
+
+States from which the puzzle cannot be solved are pruned: those where
+something has been eaten (`one_step` leaves them unchanged forever) and every
+state reached by a search that exhausted without finding a plan. Both are
+remembered across calls, as are the plans found, so repeated queries (for
+example as a fallback each time the formal instance times out) are lookups.
+"""
+
+from collections.abc import Hashable
+
+from main import Action, State, init_state, many_steps, one_step
+
+# Plans found so far, keyed by the state they start from
+_plans: dict[Hashable, list[Action]] = {}
+# States from which no plan exists
+_dead: set[Hashable] = set()
+
+
+def _key(state: State) -> Hashable:
+    """`State` is a mutable dataclass, so it is not hashable itself"""
+    return (state.cabbage, state.goat, state.wolf, state.boat)
+
+
+def _plan(parents: dict, key: Hashable) -> list[Action]:
+    actions = []
+    while parents[key] is not None:
+        key, action = parents[key]
+        actions.append(action)
+    return actions[::-1]
+
+
+def find_plan(
+    state: State = init_state, max_depth: int | None = None
+) -> list[Action] | None:
+    """Find a shortest list of actions that solves the puzzle from state
+
+    Args:
+        state: The state to start from
+        max_depth: Only look for plans of at most this many actions
+
+    Returns:
+        The actions, or None if there is no plan (of at most max_depth actions)
+    """
+    start = _key(state)
+    if start in _plans:
+        plan = _plans[start]
+        return plan if max_depth is None or len(plan) <= max_depth else None
+    if start in _dead:
+        return None
+
+    parents: dict[Hashable, tuple[Hashable, Action] | None] = {start: None}
+    layer = [state]
+    depth = 0
+    while layer:
+        for current in layer:
+            if current.solved():
+                plan = _plan(parents, _key(current))
+                _plans[start] = plan
+                return plan
+        if max_depth is not None and depth == max_depth:
+            return None
+        next_layer = []
+        for current in layer:
+            current_key = _key(current)
+            for action in Action:
+                successor = one_step(current, action)
+                key = _key(successor)
+                if key in parents or key in _dead or successor.anything_eaten():
+                    continue
+                parents[key] = (current_key, action)
+                next_layer.append(successor)
+        layer = next_layer
+        depth += 1
+    # Every state reachable from the start has been reached without solving it
+    _dead.update(parents)
+    return None
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    plan = find_plan()
+    elapsed = time.perf_counter() - start
+    assert many_steps(init_state, plan).solved()
+    print(f"Shortest plan, {len(plan)} actions, found in {elapsed * 1000:.2f}ms:")
+    for action in plan:
+        print(f"  {action.name}")
+
+    start = time.perf_counter()
+    for _ in range(10_000):
+        find_plan()
+    elapsed = time.perf_counter() - start
+    print(f"Repeated query: {elapsed / 10_000 * 1e6:.2f}us")
+
+    _plans.clear()
+    start = time.perf_counter()
+    assert find_plan(max_depth=len(plan) - 1) is None
+    elapsed = time.perf_counter() - start
+    print(f"No plan of {len(plan) - 1} actions, proved in {elapsed * 1000:.2f}ms")
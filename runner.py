@@ -0,0 +1,360 @@
+"""Run the examples' checks in parallel, rerunning only those whose code changed.
+
+A check is a script run as `__main__`: every `test_*.py` of an example (its
+`__main__` block runs all its tests), the scripts listed in SCRIPTS and, with
+--benchmarks, `benchmarks.py` on the example. With no example named, the
+top-level tools' `test_*.py` files also run as checks. Each check runs in its
+own worker process, started in the script's directory with only that directory
+at the front of the import path, exactly like `python test_x.py` run by hand. A
+bare `from main import ...` therefore always finds the example's own `main`,
+whatever directory the runner is started from.
+
+While a check runs, `sys.monitoring` records the first execution of every
+function, class body and module body of the repository. This includes
+processes the check forks, such as the workers of a ProcessPoolExecutor. The
+result is cached together with a hash of the AST of each of those units. The
+AST ignores comments, formatting and line numbers. A later run reuses the
+cached result while every unit the check executed still hashes the same. Only
+the checks that executed a changed function run again. Code nested in a
+function belongs to that function's unit. The rest of a class or module
+(statements, decorators, the names of its methods) is its own unit.
+
+Tests also depend on data: `gen.iml` models, decompositions in markdown, or a
+`main.py` whose bytes key a cache. An audit hook records every file of the
+repository the check opens for reading, other than by importing it and other
+than under `__pycache__`, and the cached result also keeps a hash of each: of
+its bytes, or of its AST for a Python file. A later run reuses the result only
+while those hashes are unchanged.
+
+    python runner.py [example ...] [--benchmarks] [--force] [-j N]
+"""
+
+import argparse
+import ast
+import contextlib
+import copy
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from code_logician_examples import ROOT, discover
+
+CACHE = ROOT / "__pycache__" / "runner.json"
+# Checks that are plain scripts rather than test_*.py files
+SCRIPTS = {"river_crossing": ["solution.py"]}
+_READ = "<read>"  # Qualified name of the trace lines recording a file read
+_DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+@dataclass(frozen=True)
+class Check:
+    script: Path
+    args: tuple[str, ...] = ()
+
+    @property
+    def id(self) -> str:
+        return " ".join([self.script.relative_to(ROOT).as_posix(), *self.args])
+
+
+@dataclass
+class Result:
+    check: Check
+    passed: bool
+    seconds: float
+    output: str  # Tail of the combined stdout and stderr
+    cached: bool = False
+
+
+def checks(
+    examples: list[str], benchmarks: bool = False, tools: bool = False
+) -> list[Check]:
+    found = [Check(path) for path in sorted(ROOT.glob("test_*.py"))] if tools else []
+    for example in examples:
+        directory = ROOT / example
+        for path in sorted(directory.glob("test_*.py")):
+            found.append(Check(path))
+        for name in SCRIPTS.get(example, []):
+            found.append(Check(directory / name))
+        if benchmarks:
+            found.append(Check(ROOT / "benchmarks.py", (example, "-n", "2000")))
+    return found
+
+
+# Units and their hashes
+
+
+def _digest(node: ast.AST) -> str:
+    return hashlib.sha256(ast.dump(node).encode()).hexdigest()[:16]
+
+
+def _shell(node: ast.Module | ast.ClassDef) -> ast.AST:
+    """The node with the definitions in its body reduced to their names"""
+    shell = copy.copy(node)
+    shell.body = [
+        ast.Expr(ast.Constant(f"{type(n).__name__} {n.name}"))
+        if isinstance(n, _DEFINITIONS)
+        else n
+        for n in node.body
+    ]
+    return shell
+
+
+def unit_hashes(source: str) -> dict[str, str]:
+    """Hash of each unit of a module, by qualified name
+
+    The units are "<module>", the classes and the functions, methods included,
+    that are not nested in a function.
+    """
+    tree = ast.parse(source)
+    units = {"<module>": _digest(_shell(tree))}
+
+    def visit(body: list[ast.stmt], prefix: str) -> None:
+        for node in body:
+            if isinstance(node, ast.ClassDef):
+                units[prefix + node.name] = _digest(_shell(node))
+                visit(node.body, f"{prefix}{node.name}.")
+            elif isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef):
+                units[prefix + node.name] = _digest(node)
+
+    visit(tree.body, "")
+    return units
+
+
+def resolve(qualname: str, units: dict[str, str]) -> str:
+    """The unit containing the code object with this `co_qualname`
+
+    Code nested in a function (`f.<locals>.g`, lambdas, generator expressions)
+    belongs to the function. Anything else not found, such as a function
+    defined in the `__main__` block, belongs to the module.
+    """
+    name = qualname.split(".<locals>.")[0]
+    while name not in units and "." in name:
+        name = name.rsplit(".", 1)[0]
+    return name if name in units else "<module>"
+
+
+class _Hashes:
+    """Unit hashes of the repository's files, each parsed at most once"""
+
+    def __init__(self):
+        self.files: dict[str, dict[str, str] | None] = {}
+        self.contents: dict[str, str | None] = {}
+
+    def __call__(self, relative: str) -> dict[str, str] | None:
+        if relative not in self.files:
+            try:
+                self.files[relative] = unit_hashes((ROOT / relative).read_text())
+            except (OSError, SyntaxError):
+                self.files[relative] = None
+        return self.files[relative]
+
+    def data(self, relative: str) -> str | None:
+        """Hash of the content of a file read, None if it cannot be read
+
+        Python files read as data, by the loader looking for sibling imports
+        for instance, are hashed by their AST like the code.
+        """
+        if relative not in self.contents:
+            try:
+                data = (ROOT / relative).read_bytes()
+                if relative.endswith(".py"):
+                    self.contents[relative] = _digest(ast.parse(data))
+                else:
+                    self.contents[relative] = hashlib.sha256(data).hexdigest()[:16]
+            except (OSError, SyntaxError):
+                self.contents[relative] = None
+        return self.contents[relative]
+
+
+def _units_from_trace(
+    trace: Path, hashes: _Hashes
+) -> tuple[dict[str, dict[str, str]], dict[str, str]]:
+    """Hash of every unit executed, by file relative to ROOT, and of every file read"""
+    executed: dict[str, dict[str, str]] = {}
+    read: dict[str, str] = {}
+    for line in trace.read_text().splitlines():
+        filename, _, qualname = line.partition("\t")
+        relative = Path(filename).relative_to(ROOT).as_posix()
+        if qualname == _READ:
+            if (digest := hashes.data(relative)) is not None:
+                read[relative] = digest
+            continue
+        units = hashes(relative)
+        if units is not None:
+            unit = resolve(qualname, units)
+            executed.setdefault(relative, {})[unit] = units[unit]
+    return executed, read
+
+
+def _fresh(record: dict, hashes: _Hashes) -> bool:
+    if not record["units"] or "read" not in record:
+        return False  # Died before running any of our code, or an older record
+    for relative, executed in record["units"].items():
+        units = hashes(relative)
+        if units is None:
+            return False
+        if any(units.get(unit) != digest for unit, digest in executed.items()):
+            return False
+    return all(hashes.data(r) == digest for r, digest in record["read"].items())
+
+
+# Running
+
+
+def _run(check: Check, hashes: _Hashes, timeout: float) -> tuple[Result, dict]:
+    with tempfile.TemporaryDirectory() as directory:
+        trace = Path(directory) / "trace"
+        trace.touch()
+        command = [sys.executable, __file__, "--trace", str(trace)]
+        command += [str(check.script), *check.args]
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            completed = subprocess.run(
+                command,
+                check=False,
+                cwd=check.script.parent,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                timeout=timeout,
+            )
+            passed, output = completed.returncode == 0, completed.stdout
+        except subprocess.TimeoutExpired as error:
+            passed, output = False, f"{error.output or ''}\nTimed out after {timeout}s"
+            timed_out = True
+        seconds = time.perf_counter() - start
+        # A timeout may not happen again, so it is not worth remembering
+        units, read = ({}, {}) if timed_out else _units_from_trace(trace, hashes)
+    result = Result(check, passed, seconds, output[-4000:])
+    record = {"passed": passed, "seconds": seconds, "output": result.output}
+    return result, {**record, "units": units, "read": read}
+
+
+def run(
+    to_run: list[Check],
+    cache: Path | None = CACHE,
+    force: bool = False,
+    jobs: int | None = None,
+    timeout: float = 600.0,
+) -> list[Result]:
+    """Run the checks, reusing the cached results of unchanged ones"""
+    records = {}
+    if cache is not None:
+        with contextlib.suppress(OSError, ValueError):
+            records = json.loads(cache.read_text())
+    hashes = _Hashes()
+
+    results: dict[Check, Result] = {}
+    stale = []
+    for check in to_run:
+        record = records.get(check.id)
+        if record is not None and not force and _fresh(record, hashes):
+            results[check] = Result(
+                check, record["passed"], record["seconds"], record["output"], True
+            )
+        else:
+            stale.append(check)
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        for result, record in pool.map(lambda c: _run(c, hashes, timeout), stale):
+            results[result.check] = result
+            records[result.check.id] = record
+
+    if cache is not None and stale:
+        cache.parent.mkdir(exist_ok=True)
+        tmp = cache.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(records, indent=1))
+        os.replace(tmp, cache)
+    return [results[check] for check in to_run]
+
+
+def _trace(trace_path: str, script: str, args: list[str]) -> None:
+    """Run a script as __main__, appending the code it executes to a file
+
+    Each line is the file and qualified name of a code object of the
+    repository, written the first time it starts, or a file of the repository
+    and _READ when it is opened for reading. Lines are flushed as they are
+    written, so forked processes append their own through the inherited file,
+    and duplicates are harmless.
+    """
+    import runpy
+
+    root, runner = f"{ROOT}{os.sep}", str(Path(__file__).resolve())
+    monitoring = sys.monitoring
+    tool = monitoring.PROFILER_ID
+    script = str(Path(script).resolve())
+    sys.argv = [script, *args]
+    sys.path[0] = os.path.dirname(script)
+    with open(trace_path, "a", buffering=1) as trace:
+
+        def started(code, offset):
+            filename = code.co_filename
+            if filename.startswith(root) and filename != runner:
+                trace.write(f"{filename}\t{code.co_qualname}\n")
+            return monitoring.DISABLE
+
+        def opened(event, args):
+            if event != "open" or isinstance(args[0], int):
+                return
+            path, _, flags = args
+            if flags & (os.O_WRONLY | os.O_RDWR):
+                return
+            path = os.path.abspath(os.fsdecode(path))
+            if (
+                path.startswith(root)
+                and f"{os.sep}__pycache__{os.sep}" not in path
+                and os.path.isfile(path)
+                # Imported modules are followed through the code they run
+                and not sys._getframe(1).f_code.co_filename.startswith("<frozen")
+            ):
+                trace.write(f"{path}\t{_READ}\n")
+
+        sys.addaudithook(opened)
+        monitoring.use_tool_id(tool, "runner")
+        monitoring.register_callback(tool, monitoring.events.PY_START, started)
+        monitoring.set_events(tool, monitoring.events.PY_START)
+        runpy.run_path(script, run_name="__main__")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--trace"]:
+        _trace(sys.argv[2], sys.argv[3], sys.argv[4:])
+        sys.exit()
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "examples", nargs="*", help="Default: every example and the tools' tests"
+    )
+    parser.add_argument("--benchmarks", action="store_true")
+    parser.add_argument("--force", action="store_true", help="Ignore the cache")
+    parser.add_argument("-j", "--jobs", type=int, help="Default: one per CPU")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run(
+        checks(args.examples or discover(), args.benchmarks, not args.examples),
+        force=args.force,
+        jobs=args.jobs,
+    )
+    for result in results:
+        status = "PASS" if result.passed else "FAIL"
+        cached = " (cached)" if result.cached else ""
+        print(f"{status}  {result.check.id:<45} {result.seconds:7.2f}s{cached}")
+    for result in results:
+        if not result.passed:
+            print(f"\n--- {result.check.id}\n{result.output}")
+    failed = sum(not r.passed for r in results)
+    ran = sum(not r.cached for r in results)
+    print(
+        f"\n{len(results) - failed} passed, {failed} failed, {ran} run, "
+        f"{len(results) - ran} cached in {time.perf_counter() - start:.2f}s"
+    )
+    sys.exit(1 if failed else 0)
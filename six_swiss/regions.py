@@ -0,0 +1,376 @@
+"""Structured, indexed store of the region decomposition in region_decomp.md.
+
+region_decomp.md holds two markdown tables produced by Imandra. The first
+lists the 44 regions of `match_price`, each with its invariant (the result in
+that region) and the constraints defining it. The second gives a sample
+`ob`/`ref_price` per region as OCaml literals. In the markdown the conjuncts
+of a region's constraints run together without separators, so they are split
+back apart by tracking parentheses.
+
+`load_store` parses the file into `Region`s with real `Order`/`OrderBook`
+samples and indexes them by invariant, by constraint and by the order types
+the region requires. The parsed store is pickled under `__pycache__`, keyed by
+a hash of the markdown and of the module names the pickle refers to, so
+later loads skip the parsing unless the file changed.
+"""
+
+import hashlib
+import os
+import pickle
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from main import Order, OrderBook, OrderType
+
+REGION_DECOMP = Path(__file__).parent / "region_decomp.md"
+CACHE_DIR = Path(__file__).parent / "__pycache__"
+# Bump when the parsed representation changes, to invalidate cached stores
+FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Region:
+    id: int
+    invariant: str  # e.g. "Some (List.hd ob.buys).order_price"
+    constraints: tuple[str, ...]
+    ob: OrderBook | None = None  # Sample input in the region
+    ref_price: float | None = None
+
+    def expected(self, ob: OrderBook, ref_price: float) -> float | None:
+        """The invariant evaluated on an input"""
+        return evaluate(self.invariant, ob, ref_price)
+
+
+@dataclass
+class RegionStore:
+    regions: dict[int, Region]
+    # Region ids, built from the regions
+    by_invariant: dict[str, list[int]] = field(init=False, repr=False)
+    by_constraint: dict[str, list[int]] = field(init=False, repr=False)
+    by_order_type: dict[OrderType, list[int]] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        by_invariant, by_constraint = defaultdict(list), defaultdict(list)
+        by_order_type = defaultdict(list)
+        for region in self.regions.values():
+            by_invariant[region.invariant].append(region.id)
+            for constraint in region.constraints:
+                by_constraint[constraint].append(region.id)
+            for order_type in required_order_types(region.constraints):
+                by_order_type[order_type].append(region.id)
+        self.by_invariant = dict(by_invariant)
+        self.by_constraint = dict(by_constraint)
+        self.by_order_type = dict(by_order_type)
+
+    def with_invariant(self, invariant: str) -> list[Region]:
+        """Regions whose result is the invariant, e.g. "Some ref_price" """
+        return [self.regions[i] for i in self.by_invariant.get(invariant, [])]
+
+    def with_constraint(self, constraint: str) -> list[Region]:
+        return [self.regions[i] for i in self.by_constraint.get(constraint, [])]
+
+    def involving(self, order_type: OrderType) -> list[Region]:
+        """Regions where a best or next-best order must be of this type"""
+        return [self.regions[i] for i in self.by_order_type.get(order_type, [])]
+
+
+# Constraints
+
+
+_ORDER_TYPE_CONSTRAINT = re.compile(r"^\(.*\)\.order_type = (Market|Limit|Quote)$")
+_CONSTRAINT_START = ("not (", "ob.", "(", "ref_price")
+
+
+def split_constraints(text: str) -> tuple[str, ...]:
+    """Split conjuncts that were concatenated without separators
+
+    A new conjunct starts, outside parentheses, where a conjunct start follows
+    directly on a closing bracket or a word, as in "... = Limit(List.hd ...".
+    """
+    constraints = []
+    start = depth = 0
+    for i, char in enumerate(text):
+        if (
+            depth == 0
+            and i > start
+            and (text[i - 1] in ")]" or text[i - 1].isalnum() or text[i - 1] == "_")
+            and text.startswith(_CONSTRAINT_START, i)
+        ):
+            constraints.append(text[start:i])
+            start = i
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+    constraints.append(text[start:])
+    return tuple(c.strip() for c in constraints if c.strip())
+
+
+def required_order_types(constraints: tuple[str, ...]) -> set[OrderType]:
+    """Order types asserted (not negated) for some order by the constraints"""
+    return {
+        OrderType[match.group(1).upper()]
+        for constraint in constraints
+        if (match := _ORDER_TYPE_CONSTRAINT.match(constraint))
+    }
+
+
+# Invariants
+
+
+def _evaluate_orders(term: str, ob: OrderBook) -> list[Order] | Order:
+    """Evaluate "ob.buys", "(List.tl ...)" or "(List.hd ...)" on a book"""
+    term = term.strip()
+    if term == "ob.buys":
+        return ob.buys
+    if term == "ob.sells":
+        return ob.sells
+    if term.startswith("(") and term.endswith(")"):
+        function, _, argument = term[1:-1].partition(" ")
+        orders = _evaluate_orders(argument, ob)
+        if function == "List.hd":
+            return orders[0]
+        if function == "List.tl":
+            return orders[1:]
+    raise ValueError(f"Unsupported term: {term!r}")
+
+
+def evaluate(invariant: str, ob: OrderBook, ref_price: float) -> float | None:
+    """Evaluate an invariant of region_decomp.md on an input"""
+    if invariant == "None":
+        return None
+    if invariant == "Some ref_price":
+        return ref_price
+    if invariant.startswith("Some ") and invariant.endswith(".order_price"):
+        return _evaluate_orders(invariant[5 : -len(".order_price")], ob).order_price
+    raise ValueError(f"Unsupported invariant: {invariant!r}")
+
+
+# OCaml literals of the sample inputs
+
+
+_TOKEN = re.compile(
+    r"\s*(-?\d+\.\d*|-?\d+|[A-Za-z_]\w*|/\.|\*\.|\+\.|-\.|[{}\[\];=()])"
+)
+
+
+def _tokenize(text: str) -> list[str]:
+    tokens, position = [], 0
+    text = text.strip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise ValueError(f"Unexpected input at {text[position:]!r}")
+        tokens.append(match.group(1))
+        position = match.end()
+    return tokens
+
+
+class _LiteralParser:
+    """Records, lists, constructors and real arithmetic such as (-1.0 /. 2.0)"""
+
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.position = 0
+
+    def peek(self) -> str | None:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self, expected: str | None = None) -> str:
+        token = self.peek()
+        if token is None or (expected is not None and token != expected):
+            raise ValueError(f"Expected {expected!r}, got {token!r}")
+        self.position += 1
+        return token
+
+    def parse(self):
+        value = self.value()
+        if self.peek() is not None:
+            raise ValueError(f"Trailing input at {self.peek()!r}")
+        return value
+
+    def value(self):
+        token = self.peek()
+        if token == "{":
+            return self.record()
+        if token == "[":
+            return self.list()
+        if token[0].isalpha():
+            return self.take()  # Constructor
+        return self.sum()
+
+    def record(self) -> dict:
+        self.take("{")
+        fields = {}
+        while self.peek() != "}":
+            name = self.take()
+            self.take("=")
+            fields[name] = self.value()
+            if self.peek() == ";":
+                self.take()
+        self.take("}")
+        return fields
+
+    def list(self) -> list:
+        self.take("[")
+        items = []
+        while self.peek() != "]":
+            items.append(self.value())
+            if self.peek() == ";":
+                self.take()
+        self.take("]")
+        return items
+
+    def sum(self) -> float:
+        value = self.product()
+        while self.peek() in ("+.", "-."):
+            if self.take() == "+.":
+                value += self.product()
+            else:
+                value -= self.product()
+        return value
+
+    def product(self) -> float:
+        value = self.atom()
+        while self.peek() in ("*.", "/."):
+            if self.take() == "*.":
+                value *= self.atom()
+            else:
+                value /= self.atom()
+        return value
+
+    def atom(self) -> float:
+        if self.peek() == "(":
+            self.take("(")
+            value = self.sum()
+            self.take(")")
+            return value
+        return float(self.take())
+
+
+def parse_literal(text: str):
+    """Python value of an OCaml literal: dicts, lists, str constructors, floats"""
+    return _LiteralParser(text).parse()
+
+
+def _order(fields: dict) -> Order:
+    return Order(
+        order_id=int(fields["order_id"]),
+        order_type=OrderType[fields["order_type"].upper()],
+        order_qty=int(fields["order_qty"]),
+        order_price=float(fields["order_price"]),
+        order_time=int(fields["order_time"]),
+    )
+
+
+def parse_order_book(text: str) -> OrderBook:
+    fields = parse_literal(text)
+    return OrderBook(
+        buys=[_order(o) for o in fields["buys"]],
+        sells=[_order(o) for o in fields["sells"]],
+    )
+
+
+# Markdown
+
+
+def _rows(lines: list[str]) -> list[list[str]]:
+    """Cells of the body rows of a markdown table, without backticks"""
+    rows = []
+    for line in lines:
+        if not line.startswith("|") or set(line) <= set("|- "):
+            continue
+        rows.append([cell.strip().strip("`") for cell in line.strip("|").split("|")])
+    return rows[1:]  # Skip the header
+
+
+def parse(text: str) -> RegionStore:
+    """Parse the contents of region_decomp.md"""
+    sections: dict[str, list[str]] = defaultdict(list)
+    section = None
+    for line in text.splitlines():
+        if line.startswith("### "):
+            section = line[4:].strip()
+        elif section is not None:
+            sections[section].append(line)
+
+    samples: dict[int, dict[str, str]] = defaultdict(dict)
+    for case, variable, _, value in _rows(sections["Test Cases"]):
+        samples[int(case)][variable] = value
+
+    regions = {}
+    for region_id, invariant, constraints in _rows(sections["Region Decomposition"]):
+        sample = samples.get(int(region_id), {})
+        regions[int(region_id)] = Region(
+            id=int(region_id),
+            invariant=invariant,
+            constraints=split_constraints(constraints),
+            ob=parse_order_book(sample["ob"]) if "ob" in sample else None,
+            ref_price=(
+                parse_literal(sample["ref_price"]) if "ref_price" in sample else None
+            ),
+        )
+    return RegionStore(regions)
+
+
+def load_store(
+    path: Path = REGION_DECOMP, cache_dir: Path | None = CACHE_DIR
+) -> RegionStore:
+    """Parse region_decomp.md, or reload the store cached for its contents"""
+    data = path.read_bytes()
+    if cache_dir is None:
+        return parse(data.decode())
+    # The pickle refers to this module and main by name, which differ between
+    # a bare import and one through the examples loader
+    key = f"{FORMAT_VERSION}:{__name__}:{Order.__module__}".encode()
+    digest = hashlib.sha256(data + key).hexdigest()[:16]
+    cache = cache_dir / f"{path.stem}.{digest}.pickle"
+    try:
+        with open(cache, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        pass
+
+    store = parse(data.decode())
+    cache_dir.mkdir(exist_ok=True)
+    tmp = cache.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(store, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, cache)
+    return store
+
+
+if __name__ == "__main__":
+    import time
+
+    from main import match_price
+
+    start = time.perf_counter()
+    store = load_store(cache_dir=None)
+    parse_time = time.perf_counter() - start
+    load_store()  # Make sure the cache exists
+    start = time.perf_counter()
+    store = load_store()
+    cached_time = time.perf_counter() - start
+    print(f"Parsed {len(store.regions)} regions in {parse_time * 1000:.2f}ms")
+    print(f"Reloaded from the cache in {cached_time * 1000:.2f}ms")
+
+    agree = sum(
+        match_price(r.ob, r.ref_price) == r.expected(r.ob, r.ref_price)
+        for r in store.regions.values()
+    )
+    print(f"match_price agrees with the invariant on {agree} of the samples")
+
+    start = time.perf_counter()
+    for _ in range(100_000):
+        store.with_invariant("Some ref_price")
+    elapsed = time.perf_counter() - start
+    print(f"Indexed invariant query: {elapsed / 100_000 * 1e6:.2f}us")
+
+    ids = [r.id for r in store.with_invariant("Some ref_price")]
+    print(f"Regions whose result is ref_price: {ids}")
+    print(
+        f"Regions involving QUOTE: {[r.id for r in store.involving(OrderType.QUOTE)]}"
+    )
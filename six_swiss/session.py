@@ -0,0 +1,156 @@
+"""Continuous trading session built on `match_price`.
+
+`match_price` only prices a single match between the best buy and the best
+sell, and the caller supplies the reference price. A `Session` keeps matching
+the top of the book: each fill trades the smaller of the two quantities at the
+price `match_price` decides, reduces both orders by that quantity, removes any
+order that is completely filled and makes the fill price the reference price
+for the next match. It stops once the book is uncrossed (a side is empty, or
+the best buy is a limit below the best sell's limit) or when `match_price`
+finds no price for a crossed book.
+
+The books are assumed to be in priority order, best first, as `match_price`
+expects. The session copies the orders it is given and keeps each side in a
+deque, so removing a filled order from the top is O(1) however deep the book.
+"""
+
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass, replace
+from enum import Enum, auto
+
+from main import Order, OrderBook, OrderType, match_price
+
+
+class StopReason(Enum):
+    EMPTY = auto()  # One side of the book has no orders left
+    UNCROSSED = auto()  # The best buy and sell limits do not overlap
+    NO_PRICE = auto()  # The book is crossed but match_price decides no price
+    MAX_FILLS = auto()
+
+
+@dataclass(frozen=True)
+class Fill:
+    buy_id: int
+    sell_id: int
+    qty: int
+    price: float
+
+
+def crossed(buy: Order, sell: Order) -> bool:
+    """Whether the best buy and sell can trade with each other"""
+    if buy.order_type == OrderType.MARKET or sell.order_type == OrderType.MARKET:
+        return True
+    return buy.order_price >= sell.order_price
+
+
+class Session:
+    def __init__(self, book: OrderBook, ref_price: float):
+        # The deques stand in for the lists of OrderBook: match_price only
+        # indexes the first two orders and takes the length of each side
+        self.book = OrderBook(
+            buys=deque(replace(order) for order in book.buys),
+            sells=deque(replace(order) for order in book.sells),
+        )
+        self.ref_price = ref_price
+        self.fills: list[Fill] = []
+
+    def step(self) -> Fill | StopReason:
+        """Match the top of the book once"""
+        buys, sells = self.book.buys, self.book.sells
+        if not buys or not sells:
+            return StopReason.EMPTY
+        buy, sell = buys[0], sells[0]
+        if not crossed(buy, sell):
+            return StopReason.UNCROSSED
+        price = match_price(self.book, self.ref_price)
+        if price is None:
+            return StopReason.NO_PRICE
+
+        qty = min(buy.order_qty, sell.order_qty)
+        buy.order_qty -= qty
+        sell.order_qty -= qty
+        if buy.order_qty == 0:
+            buys.popleft()
+        if sell.order_qty == 0:
+            sells.popleft()
+        self.ref_price = price
+        fill = Fill(buy.order_id, sell.order_id, qty, price)
+        self.fills.append(fill)
+        return fill
+
+    def run(self, max_fills: int | None = None) -> StopReason:
+        """Match until the book is uncrossed or no price can be found
+
+        Returns:
+            Why the session stopped; the fills are in `fills`
+        """
+        count = 0
+        while max_fills is None or count < max_fills:
+            result = self.step()
+            if isinstance(result, StopReason):
+                return result
+            count += 1
+        return StopReason.MAX_FILLS
+
+
+def run_session(
+    buys: Iterable[Order], sells: Iterable[Order], ref_price: float
+) -> tuple[list[Fill], StopReason]:
+    """Run a session on the given sides, in priority order"""
+    session = Session(OrderBook(list(buys), list(sells)), ref_price)
+    reason = session.run()
+    return session.fills, reason
+
+
+def synthetic_book(depth: int, seed: int = 0) -> OrderBook:
+    """A deep, heavily crossed book of limit orders, with a few market buys
+
+    Buy limits lie between 95 and 110 and sell limits between 90 and 105, each
+    side sorted by price priority and then by time. The market orders are all
+    buys, since two market orders only match at equal quantities.
+    """
+    import random
+
+    rng = random.Random(seed)
+
+    def side(low: int, high: int, first_id: int, markets: int) -> list[Order]:
+        return [
+            Order(
+                order_id=first_id + i,
+                order_type=OrderType.MARKET if i < markets else OrderType.LIMIT,
+                order_qty=rng.randrange(1, 101),
+                order_price=float(rng.randrange(low * 100, high * 100)) / 100,
+                order_time=rng.randrange(1_000_000),
+            )
+            for i in range(depth)
+        ]
+
+    buys = side(95, 110, 0, markets=depth // 100)
+    sells = side(90, 105, depth, markets=0)
+    # Markets first, then best price, then oldest
+    buys.sort(
+        key=lambda o: (o.order_type != OrderType.MARKET, -o.order_price, o.order_time)
+    )
+    sells.sort(
+        key=lambda o: (o.order_type != OrderType.MARKET, o.order_price, o.order_time)
+    )
+    return OrderBook(buys, sells)
+
+
+if __name__ == "__main__":
+    import time
+
+    for depth in (1_000, 10_000, 100_000):
+        book = synthetic_book(depth)
+        session = Session(book, ref_price=100.0)
+        start = time.perf_counter()
+        reason = session.run()
+        elapsed = time.perf_counter() - start
+        fills = len(session.fills)
+        volume = sum(fill.qty for fill in session.fills)
+        print(
+            f"depth {depth:>7,}: {fills:>7,} fills, volume {volume:>9,}, "
+            f"last price {session.ref_price:.2f}, {reason.name}, "
+            f"{fills / elapsed:,.0f} fills/sec"
+        )
@@ -0,0 +1,96 @@
+import importlib.util
+import sys
+import tempfile
+from pathlib import Path
+
+from main import OrderType, match_price
+from regions import (
+    REGION_DECOMP,
+    RegionStore,
+    load_store,
+    parse_literal,
+    parse_order_book,
+    split_constraints,
+)
+
+
+class TestRegions:
+    def setUp(self):
+        self.store = load_store(cache_dir=None)
+
+    def test_splits_concatenated_constraints(self):
+        self.setUp()
+        text = (
+            "ob.buys <> [](List.tl ob.buys) <> []"
+            "not ((List.hd ob.buys).order_type = Limit)"
+        )
+        assert split_constraints(text) == (
+            "ob.buys <> []",
+            "(List.tl ob.buys) <> []",
+            "not ((List.hd ob.buys).order_type = Limit)",
+        )
+
+    def test_parses_ocaml_literals(self):
+        self.setUp()
+        assert parse_literal("((-1.0 /. 2.0))") == -0.5
+        ob = parse_order_book(
+            "{buys =  [{order_id = 2; order_type = Quote; order_qty = 3; "
+            "order_price = 2.0;    order_time = 4}];  sells = []}"
+        )
+        assert ob.sells == []
+        assert ob.buys[0].order_type == OrderType.QUOTE
+        assert ob.buys[0].order_qty == 3
+
+    def test_samples_satisfy_invariants(self):
+        self.setUp()
+        assert len(self.store.regions) == 44
+        for region in self.store.regions.values():
+            expected = region.expected(region.ob, region.ref_price)
+            assert match_price(region.ob, region.ref_price) == expected
+
+    def test_indexes(self):
+        self.setUp()
+        ref_price = self.store.with_invariant("Some ref_price")
+        assert ref_price and all(r.invariant == "Some ref_price" for r in ref_price)
+        for region in self.store.involving(OrderType.QUOTE):
+            assert any(c.endswith("order_type = Quote") for c in region.constraints)
+        empty = self.store.with_constraint("not (ob.buys <> [])")
+        assert [r.id for r in empty] == [1]
+
+    def test_cache_reload(self):
+        self.setUp()
+        with tempfile.TemporaryDirectory() as directory:
+            first = load_store(REGION_DECOMP, Path(directory))
+            assert len(list(Path(directory).glob("*.pickle"))) == 1
+            second = load_store(REGION_DECOMP, Path(directory))
+            assert second.regions == first.regions == self.store.regions
+            assert second.by_invariant == self.store.by_invariant
+
+    def test_cache_separate_from_examples_loader(self):
+        self.setUp()
+        # code_logician_examples.load gives the module a unique name, which the
+        # classes it pickles carry
+        name = "six_swiss_regions"
+        loaded = sys.modules.get(name)
+        if loaded is None:
+            path = Path(__file__).parent / "regions.py"
+            spec = importlib.util.spec_from_file_location(name, path)
+            loaded = sys.modules[name] = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(loaded)
+        with tempfile.TemporaryDirectory() as directory:
+            # Pickles naming the loader's module must not be reloaded here
+            loaded.load_store(REGION_DECOMP, Path(directory))
+            store = load_store(REGION_DECOMP, Path(directory))
+            assert type(store) is RegionStore
+            assert store.by_invariant == self.store.by_invariant
+
+
+if __name__ == "__main__":
+    test = TestRegions()
+    test.test_splits_concatenated_constraints()
+    test.test_parses_ocaml_literals()
+    test.test_samples_satisfy_invariants()
+    test.test_indexes()
+    test.test_cache_reload()
+    test.test_cache_separate_from_examples_loader()
+    print("All tests passed!")
@@ -0,0 +1,68 @@
+from main import Order, OrderBook, OrderType
+from session import Fill, Session, StopReason, run_session, synthetic_book
+
+
+class TestSession:
+    def setUp(self):
+        self.buys = [
+            Order(1, OrderType.LIMIT, 5, 101.0, 1),
+            Order(2, OrderType.LIMIT, 5, 100.0, 2),
+            Order(3, OrderType.LIMIT, 5, 98.0, 3),
+        ]
+        self.sells = [
+            Order(4, OrderType.LIMIT, 3, 99.0, 4),
+            Order(5, OrderType.LIMIT, 4, 100.0, 5),
+            Order(6, OrderType.LIMIT, 9, 102.0, 6),
+        ]
+
+    def test_partial_fills_until_uncrossed(self):
+        self.setUp()
+        session = Session(OrderBook(self.buys, self.sells), ref_price=50.0)
+        assert session.run() == StopReason.UNCROSSED
+        # Limit/limit fills trade at the older order's price
+        assert session.fills == [
+            Fill(1, 4, 3, 101.0),
+            Fill(1, 5, 2, 101.0),
+            Fill(2, 5, 2, 100.0),
+        ]
+        assert session.ref_price == 100.0
+        assert [o.order_qty for o in session.book.buys] == [3, 5]
+        assert [o.order_id for o in session.book.sells] == [6]
+        # The caller's orders are left untouched
+        assert [o.order_qty for o in self.buys] == [5, 5, 5]
+
+    def test_market_order_uses_carried_ref_price(self):
+        self.setUp()
+        buys = [Order(7, OrderType.MARKET, 3, 0.0, 0)]
+        sells = [Order(8, OrderType.MARKET, 3, 0.0, 1)]
+        fills, reason = run_session(buys, sells, ref_price=42.0)
+        assert fills == [Fill(7, 8, 3, 42.0)]
+        assert reason == StopReason.EMPTY
+
+    def test_no_price_and_max_fills(self):
+        self.setUp()
+        buys = [Order(7, OrderType.MARKET, 3, 0.0, 0)]
+        sells = [Order(8, OrderType.MARKET, 2, 0.0, 1)]
+        assert run_session(buys, sells, 1.0) == ([], StopReason.NO_PRICE)
+        session = Session(OrderBook(self.buys, self.sells), ref_price=50.0)
+        assert session.run(max_fills=1) == StopReason.MAX_FILLS
+        assert len(session.fills) == 1
+
+    def test_volume_is_conserved(self):
+        self.setUp()
+        book = synthetic_book(500)
+        session = Session(book, ref_price=100.0)
+        session.run()
+        traded = sum(fill.qty for fill in session.fills)
+        before = sum(o.order_qty for o in book.buys)
+        after = sum(o.order_qty for o in session.book.buys)
+        assert traded > 0 and before - after == traded
+
+
+if __name__ == "__main__":
+    test = TestSession()
+    test.test_partial_fills_until_uncrossed()
+    test.test_market_order_uses_carried_ref_price()
+    test.test_no_price_and_max_fills()
+    test.test_volume_is_conserved()
+    print("All tests passed!")
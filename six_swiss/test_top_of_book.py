@@ -0,0 +1,79 @@
+import multiprocessing
+
+from main import Order, OrderBook, OrderType, match_price
+from session import synthetic_book
+from top_of_book import TopOfBookReader, TopOfBookWriter
+
+
+def book_number(i: int) -> OrderBook:
+    """A book whose top orders all encode i, to spot mixed-up snapshots"""
+
+    def order(order_id: int, order_type: OrderType) -> Order:
+        return Order(order_id, order_type, i % 100 + 1, 100.0 + i % 7, i)
+
+    buys = [order(4 * i, OrderType.LIMIT), order(4 * i + 2, OrderType.QUOTE)]
+    sells = [order(4 * i + 1, OrderType.LIMIT), order(4 * i + 3, OrderType.MARKET)]
+    return OrderBook(buys, sells)
+
+
+def check_snapshots(name: str, count: int, done) -> None:
+    with TopOfBookReader(name) as reader:
+        for _ in range(count):
+            s = reader.snapshot()
+            i = s.best_buy.order_time
+            assert s.best_buy == book_number(i).buys[0]
+            assert (s.best_sell, s.next_buy, s.next_sell) == (
+                book_number(i).sells[0],
+                book_number(i).buys[1],
+                book_number(i).sells[1],
+            )
+            assert s.ref_price == float(i) and s.match_price == 100.0 + i % 7
+    done.set()
+
+
+class TestTopOfBook:
+    def setUp(self):
+        self.book = synthetic_book(50, seed=3)
+
+    def test_snapshot_matches_book(self):
+        self.setUp()
+        with TopOfBookWriter() as writer, TopOfBookReader(writer.name) as reader:
+            first = reader.snapshot()
+            assert first.best_buy is None and first.match_price is None
+            price = writer.publish(self.book, 100.0)
+            assert price == match_price(self.book, 100.0)
+            s = reader.snapshot()
+            assert s.sequence == first.sequence + 2 == reader.sequence()
+            assert (s.best_buy, s.best_sell) == (self.book.buys[0], self.book.sells[0])
+            assert (s.next_buy, s.next_sell) == (self.book.buys[1], self.book.sells[1])
+            assert (s.ref_price, s.match_price) == (100.0, price)
+
+            one_sided = OrderBook(self.book.buys[:1], [])
+            assert writer.publish(one_sided, 101.0) is None
+            s = reader.snapshot()
+            assert s.best_buy == self.book.buys[0] and s.next_buy is None
+            assert s.best_sell is None and s.match_price is None
+
+    def test_consistent_under_concurrent_writes(self):
+        self.setUp()
+        context = multiprocessing.get_context("fork")
+        with TopOfBookWriter() as writer:
+            writer.publish(book_number(0), 0.0)
+            done = context.Event()
+            reader = context.Process(
+                target=check_snapshots, args=(writer.name, 20_000, done)
+            )
+            reader.start()
+            i = 0
+            while not done.is_set() and reader.is_alive():
+                i += 1
+                writer.publish(book_number(i), float(i))
+            reader.join()
+        assert reader.exitcode == 0
+
+
+if __name__ == "__main__":
+    test = TestTopOfBook()
+    test.test_snapshot_matches_book()
+    test.test_consistent_under_concurrent_writes()
+    print("All tests passed!")
@@ -0,0 +1,281 @@
+"""Publish the top of the book to other processes through shared memory.
+
+Strategy processes only need the top of the book: `best_buy`, `best_sell`,
+`next_buy`, `next_sell` and the price `match_price` gives them. Sending them
+the `OrderBook` over a pipe pickles and unpickles dataclasses on every update,
+and every reader costs the writer another send.
+
+Here the owner of the book writes those four orders and the match price into a
+fixed-layout record in `multiprocessing.shared_memory`, and any number of
+readers attach to it by name. The writer never waits for a reader and never
+knows how many there are. The record is guarded by a sequence lock: the writer
+makes the sequence number odd, writes the record and makes it even again. A
+reader reads the number, copies the record and reads the number again. If it
+was odd or has changed, a write overlapped the copy, and the reader tries
+again. Reads take no lock and leave the writer undisturbed.
+
+    sequence  u64, odd while a write is in progress
+    4 orders  best buy, best sell, next buy, next sell, each
+              i8 type (-1 for no order), i64 id, i64 qty, f64 price, i64 time
+    f64 ref_price, u8 whether there is a match price, f64 match price
+
+This relies on the writer's stores reaching memory in program order, with the
+sequence number stored in one 8-byte write, as it is on x86-64. Python has no
+memory fences to enforce the order on CPUs that reorder stores.
+"""
+
+import struct
+import sys
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Self
+
+from main import FillPrice, Order, OrderBook, OrderType, match_price
+
+_SEQUENCE = struct.Struct("<Q")
+_RECORD = struct.Struct("<" + "bqqdq" * 4 + "d?d")
+SIZE = _SEQUENCE.size + _RECORD.size
+_TYPES = list(OrderType)
+_NO_ORDER = (-1, 0, 0, 0.0, 0)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    sequence: int  # Even, and 2 more with every update
+    best_buy: Order | None
+    best_sell: Order | None
+    next_buy: Order | None
+    next_sell: Order | None
+    ref_price: float
+    match_price: FillPrice
+
+
+def _fields(order: Order | None) -> tuple:
+    if order is None:
+        return _NO_ORDER
+    return (
+        _TYPES.index(order.order_type),
+        order.order_id,
+        order.order_qty,
+        order.order_price,
+        order.order_time,
+    )
+
+
+def _order(fields: tuple) -> Order | None:
+    if fields[0] < 0:
+        return None
+    return Order(fields[1], _TYPES[fields[0]], fields[2], fields[3], fields[4])
+
+
+class TopOfBookWriter:
+    """The single writer of a shared top-of-book record"""
+
+    def __init__(self, name: str | None = None):
+        self._memory = shared_memory.SharedMemory(name, create=True, size=SIZE)
+        self._buffer = self._memory.buf
+        self._sequence = 0
+        _SEQUENCE.pack_into(self._buffer, 0, 0)
+        self._write(_RECORD.pack(*_NO_ORDER * 4, 0.0, False, 0.0))
+
+    @property
+    def name(self) -> str:
+        """What readers attach to"""
+        return self._memory.name
+
+    def _write(self, record: bytes) -> None:
+        buffer = self._buffer
+        _SEQUENCE.pack_into(buffer, 0, self._sequence + 1)
+        buffer[_SEQUENCE.size : SIZE] = record
+        self._sequence += 2
+        _SEQUENCE.pack_into(buffer, 0, self._sequence)
+
+    def publish(self, book: OrderBook, ref_price: float) -> FillPrice:
+        """Publish the top of a book and its match price, and return the price"""
+        price = match_price(book, ref_price)
+        self._write(
+            _RECORD.pack(
+                *_fields(book.best_buy()),
+                *_fields(book.best_sell()),
+                *_fields(book.next_buy()),
+                *_fields(book.next_sell()),
+                ref_price,
+                price is not None,
+                0.0 if price is None else price,
+            )
+        )
+        return price
+
+    def close(self) -> None:
+        """Detach and remove the record; attached readers keep their mapping"""
+        self._buffer.release()
+        self._memory.close()
+        self._memory.unlink()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to a segment without handing it to this process's resource
+    tracker, which would remove it when the process exits: only the writer may
+    remove the record"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name)
+    finally:
+        resource_tracker.register = register
+
+
+class TopOfBookReader:
+    """A reader of a shared top-of-book record, attached by name"""
+
+    def __init__(self, name: str):
+        self._memory = _attach(name)
+        self._buffer = self._memory.buf
+        self.retries = 0  # Copies that overlapped a write
+
+    def sequence(self) -> int:
+        """The sequence number, which changes with every update"""
+        return _SEQUENCE.unpack_from(self._buffer, 0)[0]
+
+    def raw(self) -> tuple[int, tuple]:
+        """A consistent copy of the sequence number and the record's fields"""
+        buffer = self._buffer
+        while True:
+            before = _SEQUENCE.unpack_from(buffer, 0)[0]
+            if not before & 1:
+                fields = _RECORD.unpack_from(buffer, _SEQUENCE.size)
+                if _SEQUENCE.unpack_from(buffer, 0)[0] == before:
+                    return before, fields
+            self.retries += 1
+
+    def snapshot(self) -> Snapshot:
+        sequence, f = self.raw()
+        return Snapshot(
+            sequence,
+            _order(f[0:5]),
+            _order(f[5:10]),
+            _order(f[10:15]),
+            _order(f[15:20]),
+            f[20],
+            f[22] if f[21] else None,
+        )
+
+    def close(self) -> None:
+        self._buffer.release()
+        self._memory.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    import time
+    from functools import partial
+    from itertools import islice
+
+    from session import Fill, Session, synthetic_book
+
+    DURATION = 1.0
+    context = multiprocessing.get_context("fork")
+
+    def read_loop(name: str, results, stop) -> None:
+        """Take snapshots until told to stop, then report their mean latency"""
+        with TopOfBookReader(name) as reader:
+            count, elapsed = 0, 0.0
+            while not stop.is_set():
+                start = time.perf_counter()
+                for _ in range(100):
+                    reader.snapshot()
+                elapsed += time.perf_counter() - start
+                count += 100
+            results.put((count, elapsed, reader.retries))
+
+    def pipe_loop(connection, results) -> None:
+        count = 0
+        while connection.recv() is not None:
+            count += 1
+        results.put(count)
+
+    def books():
+        """Books changing one fill at a time, a new one once uncrossed"""
+        seed = 0
+        while True:
+            session = Session(synthetic_book(2000, seed), ref_price=100.0)
+            while isinstance(session.step(), Fill):
+                yield session.book, session.ref_price
+            seed += 1
+
+    def broadcast(connections, book: OrderBook, ref_price: float) -> None:
+        """Pickle the top of the book to every reader"""
+        price = match_price(book, ref_price)
+        top = OrderBook(list(islice(book.buys, 2)), list(islice(book.sells, 2)))
+        for connection in connections:
+            connection.send((top, ref_price, price))
+
+    def publish_rate(publish) -> float:
+        """Updates per second the writer publishes for DURATION"""
+        updates = books()
+        count, start = 0, time.perf_counter()
+        while time.perf_counter() - start < DURATION:
+            book, ref_price = next(updates)
+            publish(book, ref_price)
+            count += 1
+        return count / (time.perf_counter() - start)
+
+    print(f"{multiprocessing.cpu_count()} CPUs, {DURATION}s per measurement")
+    for readers in (0, 1, 4, 8):
+        with TopOfBookWriter() as writer:
+            results, stop = context.Queue(), context.Event()
+            processes = [
+                context.Process(target=read_loop, args=(writer.name, results, stop))
+                for _ in range(readers)
+            ]
+            for process in processes:
+                process.start()
+            rate = publish_rate(writer.publish)
+            stop.set()
+            reports = [results.get() for _ in processes]
+            for process in processes:
+                process.join()
+        line = f"shared memory, {readers} readers: {rate:>9,.0f} updates/sec"
+        if reports:
+            snapshots = sum(r[0] for r in reports)
+            latency = sum(r[1] for r in reports) / snapshots
+            retries = sum(r[2] for r in reports)
+            line += (
+                f", snapshot {latency * 1e6:.2f}us, {retries / snapshots:.2%} retried"
+            )
+        print(line)
+
+    for readers in (1, 4, 8):
+        results = context.Queue()
+        pipes = [context.Pipe(duplex=False) for _ in range(readers)]
+        processes = [
+            context.Process(target=pipe_loop, args=(receiving, results))
+            for receiving, _ in pipes
+        ]
+        for process in processes:
+            process.start()
+
+        rate = publish_rate(partial(broadcast, [s for _, s in pipes]))
+        for _, sending in pipes:
+            sending.send(None)
+        received = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        print(
+            f"pickled pipes, {readers} readers: {rate:>9,.0f} updates/sec, "
+            f"{sum(received):,} books received"
+        )
@@ -0,0 +1,35 @@
+from benchmarks import Measurement, regressions, run
+
+
+class TestBenchmarks:
+    def setUp(self):
+        self.measurements = run(["tla/die_hard"], n=200)
+
+    def test_both_implementations_measured(self):
+        self.setUp()
+        keys = [m.key for m in self.measurements]
+        assert keys == [
+            "tla/die_hard:apply:main",
+            "tla/die_hard:apply:refactored",
+            "tla/die_hard:many_steps:main",
+            "tla/die_hard:many_steps:refactored",
+        ]
+        assert all(m.ops_per_sec > 0 for m in self.measurements)
+        assert all(m.mismatches == 0 for m in self.measurements)
+
+    def test_regressions_against_baseline(self):
+        self.setUp()
+        fast = Measurement("x", "f", "main", 100.0, 0.0)
+        slow = Measurement("x", "f", "refactored", 50.0, 0.0)
+        baseline = {
+            fast.key: {"ops_per_sec": 105.0},
+            slow.key: {"ops_per_sec": 100.0},
+        }
+        assert regressions([fast, slow], baseline, tolerance=0.1) == [slow.key]
+
+
+if __name__ == "__main__":
+    test = TestBenchmarks()
+    test.test_both_implementations_measured()
+    test.test_regressions_against_baseline()
+    print("All tests passed!")
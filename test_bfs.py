@@ -0,0 +1,77 @@
+import tempfile
+from pathlib import Path
+
+from bfs import Search, bank_account, die_hard, river_crossing
+
+
+class TestSearch:
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # Removed with the test
+        self.directory = Path(self.tmp.name)
+        self.model = river_crossing()  # Six items
+
+    def test_shortest_traces(self):
+        self.setUp()
+        search = Search(die_hard())
+        result = search.run()
+        steps = search.trace(result.found)
+        assert len(steps) == 6 and steps[-1][1].solved()
+        assert not any(state.solved() for _, state in steps[:-1])
+
+        search = Search(bank_account(3))
+        steps = search.trace(search.run().found)
+        assert min(steps[-1][1].balances) < 0
+        # safe_transfer only overdraws when another transfer slips in
+        # between its check and its withdrawal
+        search = Search(bank_account(3, safe=True))
+        assert len(search.trace(search.run().found)) > len(steps)
+        result = Search(bank_account(1, safe=True)).run()
+        assert result.complete and result.found is None
+
+    def test_resume_matches_uninterrupted(self):
+        self.setUp()
+        plain = Search(self.model)
+        expected = plain.run()
+        assert expected.complete and expected.states > 500
+
+        first = Search(self.model, self.directory)
+        partial = first.run(max_expanded=expected.states // 3)
+        assert not partial.complete and not first.resumed
+        # A crash while appending leaves entries the checkpoint does not count
+        with open(self.directory / "parents.bin", "ab") as file:
+            file.write(b"\xff" * 20)
+        second = Search(self.model, self.directory)
+        assert second.resumed and len(second.fingerprints) == partial.states
+        second.run(max_expanded=expected.states // 3)
+        third = Search(self.model, self.directory)
+        result = third.run()
+        assert (result.states, result.transitions, result.depth) == (
+            expected.states,
+            expected.transitions,
+            expected.depth,
+        )
+        assert result.complete
+        assert third.fingerprints == plain.fingerprints
+        assert third.parents == plain.parents and third.labels == plain.labels
+
+    def test_fresh_search_replaces_stale_arrays(self):
+        self.setUp()
+        (self.directory / "fingerprints.bin").write_bytes(b"\x01" * 80)
+        search = Search(self.model, self.directory)
+        search.run(max_expanded=10)
+        resumed = Search(self.model, self.directory)
+        assert resumed.fingerprints == search.fingerprints
+        try:
+            Search(river_crossing(4), self.directory)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("Expected a ValueError")
+
+
+if __name__ == "__main__":
+    test = TestSearch()
+    test.test_shortest_traces()
+    test.test_resume_matches_uninterrupted()
+    test.test_fresh_search_replaces_stale_arrays()
+    print("All tests passed!")
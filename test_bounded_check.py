@@ -0,0 +1,46 @@
+from bounded_check import GOALS, Status, action_sequences, check
+
+
+def _goal(example: str, fragment: str):
+    return next(g for g in GOALS if g.example == example and fragment in g.iml)
+
+
+class TestBoundedCheck:
+    def setUp(self):
+        self.transfer = _goal("tla/bank_account", "(transfer state)")
+        self.safe_transfer = _goal("tla/bank_account", "(safe_transfer state)")
+
+    def test_action_sequences_shortest_first(self):
+        self.setUp()
+        sequences = action_sequences("ab", 2)
+        assert sequences[0] == ()
+        assert len(sequences) == 1 + 2 + 4
+
+    def test_transfer_counterexample(self):
+        self.setUp()
+        result = check(self.transfer, max_workers=1)
+        assert result.status == Status.COUNTEREXAMPLE
+        (state,) = result.inputs
+        assert state.money > state.alice_account == 10
+
+    def test_safe_transfer_holds(self):
+        self.setUp()
+        result = check(self.safe_transfer, max_workers=1)
+        assert result.status == Status.HOLDS_WITHIN_BOUNDS
+
+    def test_pool_finds_same_witness(self):
+        self.setUp()
+        goal = _goal("tla/die_hard", "instance")
+        serial = check(goal, max_workers=1, chunk_size=5_000)
+        pooled = check(goal, max_workers=2, chunk_size=5_000)
+        assert serial.status == pooled.status == Status.WITNESS
+        assert serial.inputs == pooled.inputs
+
+
+if __name__ == "__main__":
+    test = TestBoundedCheck()
+    test.test_action_sequences_shortest_first()
+    test.test_transfer_counterexample()
+    test.test_safe_transfer_holds()
+    test.test_pool_finds_same_witness()
+    print("All tests passed!")
@@ -0,0 +1,93 @@
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import code_logician_examples as cle
+from code_logician_examples import load
+
+# Prints the modules that importing the package added, in a fresh interpreter
+FRESH_IMPORT = """
+import sys
+before = set(sys.modules)
+import code_logician_examples
+print(" ".join(sorted(set(sys.modules) - before)))
+"""
+
+
+class TestRegistry:
+    def setUp(self):
+        self.example = cle.Example("tla.die_hard")
+
+    def test_registry(self):
+        self.setUp()
+        assert list(cle.EXAMPLES) == list(cle.NAMES)
+        assert cle.tla.die_hard is cle.EXAMPLES["tla.die_hard"]
+        assert cle.get("tla/bank_account") is cle.tla.bank_account
+        assert cle.six_swiss.directory == "six_swiss"
+        assert {n.replace(".", "/") for n in cle.NAMES} <= set(cle.discover())
+        try:
+            cle.get("tla")
+        except KeyError:
+            pass
+        else:
+            raise AssertionError("Expected a KeyError")
+
+    def test_modules_load_on_first_access(self):
+        self.setUp()
+        assert "main" not in vars(self.example)
+        main = self.example.main
+        assert vars(self.example)["main"] is main
+        # The same module as the loader's, under the same unique name
+        assert main is load("tla/die_hard") and main.__name__ == "tla_die_hard_main"
+        assert set(self.example.implementations()) == {"main", "refactored"}
+        assert set(cle.ubs_dark_pool.implementations()) == {"main"}
+        assert not hasattr(self.example, "missing")
+        assert not hasattr(self.example, "_private")
+
+    def test_import_loads_nothing(self):
+        self.setUp()
+        completed = subprocess.run(
+            [sys.executable, "-c", FRESH_IMPORT],
+            check=True,
+            capture_output=True,
+            cwd=cle.ROOT,
+            text=True,
+        )
+        assert completed.stdout.split() == ["code_logician_examples"]
+
+    def test_installed_without_examples(self):
+        # A regular install copies the package alone, away from the examples
+        script = """
+import code_logician_examples as cle
+from code_logician_examples.instrument import profile
+try:
+    cle.six_swiss.main
+except ModuleNotFoundError as e:
+    print("pip install -e" in str(e))
+"""
+        with tempfile.TemporaryDirectory() as directory:
+            shutil.copytree(
+                cle.ROOT / "code_logician_examples",
+                Path(directory) / "code_logician_examples",
+                ignore=shutil.ignore_patterns("__pycache__"),
+            )
+            completed = subprocess.run(
+                [sys.executable, "-c", script],
+                check=False,
+                capture_output=True,
+                cwd=directory,
+                env={"PYTHONPATH": directory},
+                text=True,
+            )
+        assert completed.stdout.split() == ["True"], completed.stderr
+
+
+if __name__ == "__main__":
+    test = TestRegistry()
+    test.test_registry()
+    test.test_modules_load_on_first_access()
+    test.test_import_loads_nothing()
+    test.test_installed_without_examples()
+    print("All tests passed!")
@@ -0,0 +1,91 @@
+import json
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from eventlog import EventLog, write
+from generators import Batch, six_swiss_orders, ubs_orders
+
+
+class TestEventLog:
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # Removed with the test
+        self.directory = Path(self.tmp.name)
+        self.orders = ubs_orders(3000, seed=4, edge=0.2)
+
+    def test_round_trip(self):
+        self.setUp()
+        path = self.directory / "ubs.log"
+        write(path, self.orders, "ubs_dark_pool", "time", chunk_rows=1000)
+        log = EventLog(path)
+        assert len(log) == 3000
+        assert [len(b) for b in log.chunks()] == [1000, 1000, 1000]
+        assert log.read().objects() == self.orders.objects()
+        # Ids and times in arrival order fit in single-byte deltas
+        chunk = log.footer["chunks"][0]["columns"]
+        assert chunk["id"][1:3] == ["|i1", "delta"]
+        assert chunk["time"][1:3] == ["|i1", "delta"]
+        assert chunk["price"][1:3] == ["|u1", "offset"]
+        assert path.stat().st_size < 15 * len(log)
+
+        prices = self.orders.columns["price"] + 0.1  # No longer on a tick
+        other = Batch(self.orders.factory, {**self.orders.columns, "price": prices})
+        write(path, other, "ubs_dark_pool", "time")
+        assert np.array_equal(EventLog(path).read().columns["price"], prices)
+
+    def test_seek_by_time(self):
+        self.setUp()
+        orders = six_swiss_orders(5000, seed=2)
+        by_time = np.argsort(orders.columns["order_time"], kind="stable")
+        columns = {name: c[by_time] for name, c in orders.columns.items()}
+        orders = Batch(orders.factory, columns, orders.enums)
+        path = self.directory / "six_swiss.log"
+        write(path, orders, "six_swiss", "order_time", chunk_rows=256)
+        log = EventLog(path)
+        times = orders.columns["order_time"]
+        for start, stop in ((None, 10), (250, 260), (500, 501), (990, None), (7, 7)):
+            keep = np.ones(len(times), dtype=bool)
+            if start is not None:
+                keep &= times >= start
+            if stop is not None:
+                keep &= times < stop
+            expected = [o for o, k in zip(orders.objects(), keep) if k]
+            assert log.read(start, stop).objects() == expected
+
+    def test_enums_decoded_by_name(self):
+        self.setUp()
+        path = self.directory / "ubs.log"
+        write(path, self.orders, "ubs_dark_pool", "time")
+        # Pretend the log was written when OrderPeg listed its members backwards
+        data = path.read_bytes()
+        length = int.from_bytes(data[-16:-8], "little")
+        footer = json.loads(data[-16 - length : -16])
+        footer["columns"]["peg"]["members"].reverse()
+        chunk = footer["chunks"][0]["columns"]["peg"]
+        codes = np.frombuffer(data, "<u1", len(self.orders), chunk[0])
+        rewritten = bytearray(data[: -16 - length])
+        rewritten[chunk[0] : chunk[0] + len(codes)] = (3 - codes).tobytes()
+        encoded = json.dumps(footer).encode()
+        rewritten += encoded + len(encoded).to_bytes(8, "little") + data[-8:]
+        path.write_bytes(bytes(rewritten))
+        assert EventLog(path).read().values("peg") == self.orders.values("peg")
+
+    def test_rejects_unordered_times(self):
+        self.setUp()
+        orders = six_swiss_orders(100, seed=1)
+        try:
+            write(self.directory / "bad.log", orders, "six_swiss", "order_time")
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("Expected a ValueError")
+
+
+if __name__ == "__main__":
+    test = TestEventLog()
+    test.test_round_trip()
+    test.test_seek_by_time()
+    test.test_enums_decoded_by_name()
+    test.test_rejects_unordered_times()
+    print("All tests passed!")
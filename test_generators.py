@@ -0,0 +1,75 @@
+from code_logician_examples import load
+from generators import (
+    die_hard_states,
+    river_crossing_states,
+    six_swiss_books,
+    ubs_market_data,
+    ubs_orders,
+)
+
+
+class TestGenerators:
+    def setUp(self):
+        self.ubs = load("ubs_dark_pool")
+        self.six_swiss = load("six_swiss")
+
+    def test_ubs_inputs_are_valid(self):
+        self.setUp()
+        orders = ubs_orders(5000, seed=1, edge=0.2).objects()
+        assert all(isinstance(o, self.ubs.Order) for o in orders)
+        assert all(o.valid_order() for o in orders)
+        assert [o.id for o in orders] == list(range(5000))
+        times = [o.time for o in orders]
+        assert times == sorted(times)
+        # The boundaries are hit
+        assert any(o.leaves_qty == 0 for o in orders)
+        assert any(o.leaves_qty == o.qty for o in orders)
+        assert any(a.time == b.time for a, b in zip(orders, orders[1:]))
+        markets = ubs_market_data(5000, seed=1, edge=0.2).objects()
+        assert all(m.valid_market_data() for m in markets)
+        assert any(m.nbo - m.nbb == 0.5 for m in markets)
+
+    def test_seeded_and_lazy(self):
+        self.setUp()
+        batch = ubs_orders(100, seed=7)
+        assert batch.objects() == ubs_orders(100, seed=7).objects()
+        assert batch.objects() != ubs_orders(100, seed=8).objects()
+        assert batch[42] == batch.objects()[42]
+        assert batch[10:20].objects() == batch.objects()[10:20]
+        assert type(batch[0].price) is float and type(batch[0].qty) is int
+
+    def test_books_in_priority_order(self):
+        self.setUp()
+        market = self.six_swiss.OrderType.MARKET
+        books = six_swiss_books(2000, seed=3, edge=0.2)
+        all_books = books.objects()
+        assert len(all_books) == 2000
+        assert books[5] == all_books[5]
+        assert any(not book.buys for book in all_books)
+        for book in all_books:
+            for side, sign in ((book.buys, -1), (book.sells, 1)):
+                keys = [
+                    (o.order_type != market, sign * o.order_price, o.order_time)
+                    for o in side
+                ]
+                assert keys == sorted(keys)
+            self.six_swiss.match_price(book, 100.0)
+
+    def test_puzzle_states(self):
+        self.setUp()
+        river = load("river_crossing")
+        for state in river_crossing_states(2000, seed=2):
+            goods = (state.cabbage, state.goat, state.wolf)
+            assert goods.count(river.Location.BOAT) <= 1
+            assert state.wolf != river.Location.EATEN
+        for state in die_hard_states(2000, seed=2):
+            assert 0 <= state.big <= 5 and 0 <= state.small <= 3
+
+
+if __name__ == "__main__":
+    test = TestGenerators()
+    test.test_ubs_inputs_are_valid()
+    test.test_seeded_and_lazy()
+    test.test_books_in_priority_order()
+    test.test_puzzle_states()
+    print("All tests passed!")
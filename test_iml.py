@@ -0,0 +1,106 @@
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from code_logician_examples import ROOT, load
+from iml import CHECKS, EXAMPLES, compile_kernels, conform, load_kernels, translate
+
+
+class TestIML:
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # Removed with the test
+        self.directory = Path(self.tmp.name)
+
+    def test_translates_every_model(self):
+        self.setUp()
+        for example in EXAMPLES:
+            kernels = load_kernels(example, None)
+            source = (ROOT / example / "gen.iml").read_text()
+            recursive = (
+                {"many_steps", "many_steps_measure"} if "let rec" in source else set()
+            )
+            assert set(kernels.SKIPPED) == recursive
+            assert len(kernels.FUNCTIONS) >= 5
+        # Scalars broadcast, so a kernel also runs on a single input
+        k = load_kernels("tla/die_hard", None)
+        small_to_big = k.VARIANTS["action"].index("SMALL_TO_BIG")
+        assert k.apply(small_to_big, {"big": 3, "small": 3}) == {"big": 5, "small": 1}
+        assert not k.solved(k.init_state())
+        bank = load_kernels("tla/bank_account", None)
+        state = bank.FUNCTIONS["Actions.withdraw_from_alice"](bank.init_account())
+        assert state == {"alice_account": 5, "bob_account": 10, "money": 5}
+
+    def test_kernels_agree_with_main(self):
+        self.setUp()
+        for check in CHECKS:
+            if check.function != "match_price":
+                result = conform(check, 3000, seed=1, cache_dir=self.directory)
+                assert not len(result.mismatches), (check, result.mismatches[:10])
+
+    def test_finds_quote_divergence(self):
+        self.setUp()
+        (check,) = [c for c in CHECKS if c.function == "match_price"]
+        result = conform(check, 3000, seed=1, cache_dir=self.directory)
+        # main.py takes the buy order's time and quantity for the quote's
+        # when a sell quote meets a buy limit or market order
+        books = check.inputs(load("six_swiss"), 3000, np.random.default_rng(1))[0]
+        assert len(result.mismatches) > 0
+        for i in result.mismatches:
+            book = books[int(i)]
+            assert book.sells[0].order_type.name == "QUOTE"
+            assert book.buys[0].order_type.name in ("LIMIT", "MARKET")
+
+    def test_cache(self):
+        self.setUp()
+        load_kernels("river_crossing", self.directory)
+        (path,) = self.directory.iterdir()
+        path.write_text(path.read_text() + "\nMARK = 1\n")
+        assert load_kernels("river_crossing", self.directory).MARK == 1
+        assert not hasattr(load_kernels("river_crossing", None), "MARK")
+
+    def test_skips_unsupported_functions(self):
+        self.setUp()
+        source = """
+            type t = A | B  (* A comment *)
+            let rec f (x: int) : int = f x
+            let g (x: int) : int = f x
+            let h (x: t) (y: int option) : int =
+              match x, y with
+              | A, Some n when n > 0 -> n
+              | A, _ | B, None -> 0
+              | B, Some n -> n * 2
+            let k (l: int list) : int =
+              match l with
+              | x :: rest -> x
+              | [] -> 0
+        """
+        kernels = compile_kernels(source)
+        assert kernels.SKIPPED == {
+            "f": "recursive",
+            "g": "calls f, which is not translated",
+            "k": "pattern binding the tail of a list",
+        }
+        x = np.array([0, 0, 0, 1, 1])
+        y = (np.array([True, True, False, False, True]), np.array([3, -3, 9, 9, 4]))
+        assert kernels.h(x, y).tolist() == [3, 0, 0, 0, 8]
+
+    def test_reports_syntax_errors(self):
+        self.setUp()
+        try:
+            translate("let f (x: int) : int =\n  (x + 1", "model.iml")
+        except ValueError as e:
+            assert str(e).startswith("model.iml:2:")
+        else:
+            raise AssertionError("Expected a ValueError")
+
+
+if __name__ == "__main__":
+    test = TestIML()
+    test.test_translates_every_model()
+    test.test_kernels_agree_with_main()
+    test.test_finds_quote_divergence()
+    test.test_cache()
+    test.test_skips_unsupported_functions()
+    test.test_reports_syntax_errors()
+    print("All tests passed!")
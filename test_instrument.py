@@ -0,0 +1,73 @@
+import os
+
+from code_logician_examples import load
+from code_logician_examples.instrument import profile, targets_from_env
+
+
+class TestInstrument:
+    def setUp(self):
+        self.die_hard = load("tla/die_hard")
+        self.bank = load("tla/bank_account")
+
+    def test_counts_calls_and_restores(self):
+        self.setUp()
+        m = self.die_hard
+        original = m.apply
+        actions = [m.Action.FILL_BIG, m.Action.BIG_TO_SMALL] * 3
+        with profile(m, "many_steps", "apply") as profiler:
+            final = m.many_steps(m.State.init_state(), actions)
+        assert m.apply is original
+        assert final == m.many_steps(m.State.init_state(), actions)
+
+        stats = profiler.stats
+        many_steps, apply = f"{m.__name__}.many_steps", f"{m.__name__}.apply"
+        assert stats[many_steps].calls == 1
+        assert stats[apply].calls == 6
+        assert stats[many_steps].cumulative_ns >= stats[apply].cumulative_ns
+        assert stats[apply].self_ns == stats[apply].cumulative_ns
+
+        lines = profiler.collapsed().splitlines()
+        assert [line.rsplit(" ", 1)[0] for line in lines] == [
+            many_steps,
+            f"{many_steps};{apply}",
+        ]
+
+    def test_static_methods(self):
+        self.setUp()
+        m = self.bank
+        with profile(m, "Actions.withdraw_from_alice") as profiler:
+            m.transfer(m.BankState())
+        assert isinstance(m.Actions.__dict__["withdraw_from_alice"], staticmethod)
+        assert (
+            profiler.summary()[f"{m.__name__}.Actions.withdraw_from_alice"]["calls"]
+            == 1
+        )
+
+    def test_targets_from_env(self):
+        self.setUp()
+        previous = os.environ.get("PROFILE_EXAMPLES")
+        try:
+            os.environ["PROFILE_EXAMPLES"] = (
+                "six_swiss:match_price;tla/die_hard/refactored:apply,many_steps"
+            )
+            assert targets_from_env("six_swiss", "main") == ["match_price"]
+            assert targets_from_env("six_swiss", "refactored") == []
+            assert targets_from_env("tla/die_hard", "refactored") == [
+                "apply",
+                "many_steps",
+            ]
+            os.environ["PROFILE_EXAMPLES"] = "all"
+            assert "priority_price" in targets_from_env("ubs_dark_pool", "main")
+        finally:
+            if previous is None:
+                del os.environ["PROFILE_EXAMPLES"]
+            else:
+                os.environ["PROFILE_EXAMPLES"] = previous
+
+
+if __name__ == "__main__":
+    test = TestInstrument()
+    test.test_counts_calls_and_restores()
+    test.test_static_methods()
+    test.test_targets_from_env()
+    print("All tests passed!")
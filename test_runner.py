@@ -0,0 +1,96 @@
+import json
+import tempfile
+from pathlib import Path
+
+from runner import checks, resolve, run, unit_hashes
+
+SOURCE = """
+class State:
+    size = 3
+
+    def solved(self):
+        return self.size == 4
+
+
+def step(state):
+    return [s for s in range(state.size)]
+"""
+
+
+class TestRunner:
+    def setUp(self):
+        self.checks = checks(["tla/die_hard"])
+
+    def test_units_ignore_formatting(self):
+        self.setUp()
+        units = unit_hashes(SOURCE)
+        assert set(units) == {"<module>", "State", "State.solved", "step"}
+        reformatted = unit_hashes(
+            SOURCE.replace("return self.size == 4", "return (self.size == 4)  # !")
+        )
+        assert reformatted == units
+        changed = unit_hashes(SOURCE.replace("== 4", "== 5"))
+        assert [u for u in units if units[u] != changed[u]] == ["State.solved"]
+        # Adding a method changes the class, not its other methods
+        added = unit_hashes(SOURCE.replace("    size = 3", "    size = 3\n    f = 1"))
+        assert [u for u in units if units[u] != added[u]] == ["State"]
+
+    def test_resolve(self):
+        self.setUp()
+        units = unit_hashes(SOURCE)
+        assert resolve("State.solved", units) == "State.solved"
+        assert resolve("step.<locals>.<genexpr>", units) == "step"
+        assert resolve("helper", units) == "<module>"
+
+    def test_reruns_only_changed_checks(self):
+        self.setUp()
+        ids = [c.id for c in self.checks]
+        assert ids == ["tla/die_hard/test_oracle.py", "tla/die_hard/test_steps.py"]
+        with tempfile.TemporaryDirectory() as directory:
+            cache = Path(directory) / "runner.json"
+            first = run(self.checks, cache)
+            assert all(r.passed and not r.cached for r in first)
+            assert all(r.cached for r in run(self.checks, cache))
+
+            # Pretend that a function only test_oracle.py executes has changed
+            records = json.loads(cache.read_text())
+            shared = "code_logician_examples/oracle.py"
+            executed = records[ids[0]]["units"][shared]
+            assert "Oracle.build" in executed
+            executed["Oracle.build"] = "0" * 16
+            assert shared not in records[ids[1]]["units"]
+            cache.write_text(json.dumps(records))
+            third = run(self.checks, cache)
+            assert [r.cached for r in third] == [False, True]
+            assert all(r.passed for r in third)
+
+    def test_reruns_checks_reading_changed_files(self):
+        self.setUp()
+        ids = [c.id for c in self.checks]
+        with tempfile.TemporaryDirectory() as directory:
+            cache = Path(directory) / "runner.json"
+            run(self.checks, cache)
+            # The oracle keys its saved table by the bytes of main.py
+            records = json.loads(cache.read_text())
+            read = records[ids[0]]["read"]
+            assert "tla/die_hard/main.py" in read
+            assert "tla/die_hard/main.py" not in records[ids[1]]["read"]
+            read["tla/die_hard/main.py"] = "0" * 16
+            cache.write_text(json.dumps(records))
+            assert [r.cached for r in run(self.checks, cache)] == [False, True]
+
+    def test_tools_checks(self):
+        self.setUp()
+        ids = [c.id for c in checks([], tools=True)]
+        assert "test_runner.py" in ids and "test_iml.py" in ids
+        assert all("/" not in i for i in ids)
+
+
+if __name__ == "__main__":
+    test = TestRunner()
+    test.test_units_ignore_formatting()
+    test.test_resolve()
+    test.test_reruns_only_changed_checks()
+    test.test_reruns_checks_reading_changed_files()
+    test.test_tools_checks()
+    print("All tests passed!")
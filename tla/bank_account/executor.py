@@ -0,0 +1,140 @@
+"""Concurrent transfers with ordered, striped per-account locks.
+
+`safe_transfer` checks Alice's balance, then withdraws, then deposits. Run by
+several threads against shared balances, another transfer can interleave
+between the check and the withdrawal, which is the race the TLA+ version of
+this example is about: two transfers both pass the check and together
+overdraw the account.
+
+`LockedLedger` closes that window by holding the locks of both accounts for the
+whole check-withdraw-deposit sequence. Accounts are mapped onto a fixed number
+of lock stripes, and the two stripes of a transfer are always acquired in
+ascending order, so no two transfers can wait on each other in a cycle.
+"""
+
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+
+
+class LockedLedger:
+    def __init__(self, balances: Sequence[int], n_stripes: int = 64):
+        self.balances = list(balances)
+        self.stripes = [threading.Lock() for _ in range(n_stripes)]
+
+    def _locks(self, src: int, dst: int) -> list[threading.Lock]:
+        """The stripes guarding both accounts, in acquisition order"""
+        a, b = src % len(self.stripes), dst % len(self.stripes)
+        if a == b:
+            return [self.stripes[a]]
+        return [self.stripes[min(a, b)], self.stripes[max(a, b)]]
+
+    def transfer(self, src: int, dst: int, amount: int) -> bool:
+        """`safe_transfer` from src to dst, atomically
+
+        Returns:
+            Whether the transfer was applied
+        """
+        locks = self._locks(src, dst)
+        for lock in locks:
+            lock.acquire()
+        try:
+            if self.balances[src] < amount:
+                return False
+            self.balances[src] -= amount
+            self.balances[dst] += amount
+            return True
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def snapshot(self) -> list[int]:
+        """A consistent copy of all balances, taken with every stripe held"""
+        for lock in self.stripes:
+            lock.acquire()
+        try:
+            return list(self.balances)
+        finally:
+            for lock in reversed(self.stripes):
+                lock.release()
+
+
+def unlocked_transfer(balances: list[int], src: int, dst: int, amount: int) -> bool:
+    """`safe_transfer` on shared balances without any locking, for comparison
+
+    The thread yields between the check and the withdrawal, the point where the
+    TLA+ model lets other transfers interleave.
+    """
+    if balances[src] < amount:
+        return False
+    time.sleep(0)
+    balances[src] -= amount
+    balances[dst] += amount
+    return True
+
+
+def run_concurrently(
+    transfer: Callable[[int, int, int], bool],
+    transfers: Sequence[tuple[int, int, int]],
+    max_workers: int,
+) -> list[bool]:
+    """Apply (src, dst, amount) transfers with transfer, from max_workers threads
+
+    The transfers are dealt round-robin to the workers, so their interleaving,
+    and therefore which transfers get skipped, is up to the scheduler.
+
+    Returns:
+        Whether each transfer was applied, in input order
+    """
+    applied = [False] * len(transfers)
+
+    def work(offset: int) -> None:
+        for i in range(offset, len(transfers), max_workers):
+            applied[i] = transfer(*transfers[i])
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for future in [pool.submit(work, offset) for offset in range(max_workers)]:
+            future.result()
+    return applied
+
+
+if __name__ == "__main__":
+    import random
+    from functools import partial
+
+    rng = random.Random(0)
+    n_transfers = 200_000
+
+    for n_accounts in (4, 1_000):
+        transfers = [
+            (rng.randrange(n_accounts), rng.randrange(n_accounts), rng.randrange(1, 50))
+            for _ in range(n_transfers)
+        ]
+        for workers in (1, 2, 4, 8):
+            ledger = LockedLedger([100] * n_accounts)
+            total = sum(ledger.balances)
+            start = time.perf_counter()
+            applied = run_concurrently(ledger.transfer, transfers, workers)
+            elapsed = time.perf_counter() - start
+            balances = ledger.snapshot()
+            assert sum(balances) == total, "money was created or destroyed"
+            assert min(balances) >= 0, "an account was overdrawn"
+            print(
+                f"accounts={n_accounts:>5} workers={workers}: "
+                f"{n_transfers / elapsed:>10,.0f} transfers/s "
+                f"({sum(applied) / n_transfers:.1%} applied)"
+            )
+
+    # Alice (account 0) can afford one of these transfers to Bob (account 1).
+    # Without locks, several of them pass the check before any withdrawal.
+    alice_to_bob = [(0, 1, 6)] * 8
+    for name, make in (
+        ("locked", lambda: LockedLedger([10, 10]).transfer),
+        ("unlocked", lambda: partial(unlocked_transfer, [10, 10])),
+    ):
+        overdrawn = 0
+        for _ in range(1_000):
+            transfer = make()
+            overdrawn += sum(run_concurrently(transfer, alice_to_bob, 8)) > 1
+        print(f"{name:>8}: Alice overdrawn in {overdrawn} of 1000 runs")
@@ -0,0 +1,162 @@
+"""Vectorized many-account ledger generalizing `safe_transfer`.
+
+`main` models two accounts and a single transfer from Alice to Bob. Here
+balances of any number of accounts live in a NumPy array and transfers are
+applied in batches of (src, dst, amount) arrays, with the semantics of applying
+`safe_transfer` to each transfer of the batch in order: a transfer is skipped
+when the source balance is below the amount.
+
+Transfers inside a batch can conflict, since an earlier transfer may drain or
+fund the source of a later one. Because amounts are non-negative, every
+transfer out of an account whose balance at the start of the batch covers all
+it sends in the batch succeeds, whatever the order. Those transfers are decided
+in one vectorized pass. Only transfers into or out of the remaining, contended
+accounts are replayed in order, so the outcome is identical to the sequential
+one.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+from main import BankState
+
+ALICE, BOB = 0, 1
+
+
+class Ledger:
+    def __init__(self, balances: Sequence[int] | np.ndarray):
+        self.balances = np.array(balances, dtype=np.int64)
+
+    @staticmethod
+    def from_bank_state(state: BankState) -> "Ledger":
+        """A two-account ledger with Alice's account at ALICE and Bob's at BOB"""
+        return Ledger([state.alice_account, state.bob_account])
+
+    def total(self) -> int:
+        return int(self.balances.sum())
+
+    def apply_batch(
+        self, src: np.ndarray, dst: np.ndarray, amount: np.ndarray
+    ) -> np.ndarray:
+        """Apply a batch of transfers as consecutive `safe_transfer` calls
+
+        Returns:
+            A boolean mask of the transfers that were applied
+        """
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        amount = np.asarray(amount, dtype=np.int64)
+        if not (src.shape == dst.shape == amount.shape and src.ndim == 1):
+            raise ValueError("src, dst and amount must be 1-D arrays of equal length")
+        if len(amount) == 0:
+            return np.zeros(0, dtype=bool)
+        if amount.min() < 0:
+            raise ValueError("Transfer amounts must be non-negative")
+        # NumPy would wrap negative indices to accounts at the end, and reject
+        # out-of-range ones only after the sources were debited
+        n_accounts = len(self.balances)
+        if min(src.min(), dst.min()) < 0 or max(src.max(), dst.max()) >= n_accounts:
+            raise IndexError(f"Account indices must be in range({n_accounts})")
+
+        applied = self._guaranteed(src, amount)
+        if not applied.all():
+            contended = np.zeros(len(self.balances), dtype=bool)
+            contended[src[~applied]] = True
+            self._replay(src, dst, amount, applied, contended)
+
+        np.subtract.at(self.balances, src[applied], amount[applied])
+        np.add.at(self.balances, dst[applied], amount[applied])
+        return applied
+
+    def _guaranteed(self, src: np.ndarray, amount: np.ndarray) -> np.ndarray:
+        """Transfers whose source covers everything it sends in the batch"""
+        sent = np.zeros(len(self.balances), dtype=np.int64)
+        np.add.at(sent, src, amount)
+        covered = self.balances >= sent
+        return covered[src]
+
+    def _replay(
+        self,
+        src: np.ndarray,
+        dst: np.ndarray,
+        amount: np.ndarray,
+        applied: np.ndarray,
+        contended: np.ndarray,
+    ) -> None:
+        """Decide the remaining transfers in batch order, updating applied
+
+        Every transfer into or out of a contended account is replayed, so the
+        tracked balances of contended accounts are exact when they are read.
+        """
+        touching = np.flatnonzero(contended[src] | contended[dst])
+        src, dst = src[touching], dst[touching]
+        if 4 * len(touching) > len(self.balances):
+            balance = self.balances.tolist()
+        else:
+            accounts = np.concatenate([src, dst])
+            balance = dict(zip(accounts.tolist(), self.balances[accounts].tolist()))
+        decisions = [True] * len(touching)
+        for i, s, d, a, decided in zip(
+            range(len(touching)),
+            src.tolist(),
+            dst.tolist(),
+            amount[touching].tolist(),
+            applied[touching].tolist(),
+        ):
+            if decided or balance[s] >= a:
+                balance[s] -= a
+                balance[d] += a
+            else:
+                decisions[i] = False
+        applied[touching] = decisions
+
+
+def safe_transfer_reference(
+    balances: list[int], src: Sequence[int], dst: Sequence[int], amount: Sequence[int]
+) -> list[bool]:
+    """Apply transfers one at a time, exactly like `safe_transfer`"""
+    applied = []
+    for s, d, a in zip(src, dst, amount):
+        if balances[s] < a:
+            applied.append(False)
+        else:
+            balances[s] -= a
+            balances[d] += a
+            applied.append(True)
+    return applied
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    n_accounts, batch_size, n_batches = 1_000_000, 1_000_000, 5
+
+    for label, initial in (("ample", 1_000), ("moderate", 150), ("heavy", 60)):
+        ledger = Ledger(np.full(n_accounts, initial))
+        total = ledger.total()
+        applied = 0
+        start = time.perf_counter()
+        for _ in range(n_batches):
+            src = rng.integers(0, n_accounts, batch_size)
+            dst = rng.integers(0, n_accounts, batch_size)
+            amount = rng.integers(1, 100, batch_size)
+            applied += int(ledger.apply_batch(src, dst, amount).sum())
+        elapsed = time.perf_counter() - start
+        assert ledger.total() == total and ledger.balances.min() >= 0
+        print(
+            f"{label:>12}: {n_batches * batch_size / elapsed:>12,.0f} transfers/s "
+            f"({applied / (n_batches * batch_size):.1%} applied)"
+        )
+
+    balances = [60] * n_accounts
+    src = rng.integers(0, n_accounts, batch_size).tolist()
+    dst = rng.integers(0, n_accounts, batch_size).tolist()
+    amount = rng.integers(1, 100, batch_size).tolist()
+    start = time.perf_counter()
+    safe_transfer_reference(balances, src, dst, amount)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{'sequential':>12}: {batch_size / elapsed:>12,.0f} transfers/s "
+        "(heavy, pure Python)"
+    )
@@ -42,6 +42,7 @@ def safe_transfer(state):
     else:
         state = Actions.withdraw_from_alice(state)
         state = Actions.deposit_to_bob(state)
+        return state
 
 
 init_account = {
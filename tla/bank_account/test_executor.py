@@ -0,0 +1,43 @@
+import random
+
+from executor import LockedLedger, run_concurrently
+from main import BankState
+from refactored import safe_transfer
+
+
+class TestExecutor:
+    def test_single_transfer_matches_safe_transfer(self):
+        for alice in range(0, 12):
+            state = BankState(alice_account=alice, bob_account=10, money=5)
+            expected = safe_transfer(state)
+            ledger = LockedLedger([alice, 10])
+            ledger.transfer(0, 1, state.money)
+            assert ledger.snapshot() == [expected.alice_account, expected.bob_account]
+
+    def test_concurrent_alice_to_bob_cannot_overdraw(self):
+        for _ in range(50):
+            ledger = LockedLedger([10, 10])
+            applied = run_concurrently(ledger.transfer, [(0, 1, 6)] * 8, 8)
+            assert sum(applied) == 1
+            assert ledger.snapshot() == [4, 16]
+
+    def test_stress_conserves_money(self):
+        rng = random.Random(11)
+        transfers = [
+            (rng.randrange(16), rng.randrange(16), rng.randrange(1, 40))
+            for _ in range(20_000)
+        ]
+        # Few stripes, so that unrelated accounts share locks too
+        ledger = LockedLedger([50] * 16, n_stripes=3)
+        run_concurrently(ledger.transfer, transfers, 8)
+        balances = ledger.snapshot()
+        assert sum(balances) == 50 * 16
+        assert min(balances) >= 0
+
+
+if __name__ == "__main__":
+    test = TestExecutor()
+    test.test_single_transfer_matches_safe_transfer()
+    test.test_concurrent_alice_to_bob_cannot_overdraw()
+    test.test_stress_conserves_money()
+    print("All tests passed!")
@@ -0,0 +1,60 @@
+from interleavings import (
+    ALICE,
+    BOB,
+    Explorer,
+    StepKind,
+    Transfer,
+    alice_to_bob,
+    disjoint,
+)
+from main import BankState, transfer
+from refactored import safe_transfer
+
+
+class TestInterleavings:
+    def test_single_transfer_matches_main(self):
+        for alice in range(0, 12):
+            state = BankState(alice_account=alice, bob_account=10, money=5)
+            for safe, expected in (
+                (False, transfer(state)),
+                (True, safe_transfer(state)),
+            ):
+                explorer = Explorer([alice, 10], [Transfer(ALICE, BOB, 5, safe)])
+                final = explorer.initial
+                while explorer.enabled(final):
+                    final = explorer.step(final, 0)
+                assert final.balances == (expected.alice_account, expected.bob_account)
+
+    def test_reduction_keeps_every_state(self):
+        for make in (alice_to_bob, disjoint):
+            for safe in (False, True):
+                explorer = make(4, safe)
+                naive = explorer.explore(reduction=False)
+                reduced = explorer.explore()
+                assert reduced.states == naive.states
+                assert reduced.violations.keys() == naive.violations.keys()
+                assert reduced.transitions <= naive.transitions
+
+    def test_disjoint_transfers_explore_one_transition_per_state(self):
+        result = disjoint(5).explore()
+        assert len(result.states) == 3**5
+        assert result.transitions == len(result.states) - 1
+        assert not result.violations
+
+    def test_concurrent_safe_transfers_overdraw_alice(self):
+        assert not alice_to_bob(2, safe=True).explore().violations
+        violation = alice_to_bob(3, safe=True).explore().violations["non_negative"]
+        assert violation.state.balances[ALICE] < 0
+        # Two checks pass before the withdrawals they guard
+        kinds = [kind for _, kind in violation.trace]
+        assert kinds.count(StepKind.WITHDRAW) == 3
+        assert "conservation" not in alice_to_bob(3, safe=True).explore().violations
+
+
+if __name__ == "__main__":
+    test = TestInterleavings()
+    test.test_single_transfer_matches_main()
+    test.test_reduction_keeps_every_state()
+    test.test_disjoint_transfers_explore_one_transition_per_state()
+    test.test_concurrent_safe_transfers_overdraw_alice()
+    print("All tests passed!")
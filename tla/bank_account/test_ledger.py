@@ -0,0 +1,64 @@
+import numpy as np
+from ledger import ALICE, BOB, Ledger, safe_transfer_reference
+from main import BankState
+from refactored import safe_transfer
+
+
+class TestLedger:
+    def test_two_accounts_match_safe_transfer(self):
+        for alice in range(-2, 12):
+            for money in range(12):
+                state = BankState(alice_account=alice, bob_account=10, money=money)
+                expected = safe_transfer(state)
+                ledger = Ledger.from_bank_state(state)
+                ledger.apply_batch([ALICE], [BOB], [money])
+                assert ledger.balances.tolist() == [
+                    expected.alice_account,
+                    expected.bob_account,
+                ]
+
+    def test_conflicting_batches_match_sequential(self):
+        rng = np.random.default_rng(1)
+        for _ in range(200):
+            n_accounts = int(rng.integers(1, 8))
+            balances = rng.integers(0, 20, n_accounts)
+            size = int(rng.integers(0, 40))
+            src = rng.integers(0, n_accounts, size)
+            dst = rng.integers(0, n_accounts, size)
+            amount = rng.integers(0, 15, size)
+
+            expected_balances = balances.tolist()
+            expected = safe_transfer_reference(expected_balances, src, dst, amount)
+            ledger = Ledger(balances)
+            applied = ledger.apply_batch(src, dst, amount)
+            assert applied.tolist() == expected
+            assert ledger.balances.tolist() == expected_balances
+            assert ledger.total() == int(balances.sum())
+
+    def test_rejects_negative_amounts(self):
+        ledger = Ledger([10, 10])
+        try:
+            ledger.apply_batch([0], [1], [-5])
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("negative amount accepted")
+
+    def test_rejects_accounts_out_of_range(self):
+        for src, dst in (([0], [2]), ([-1], [0]), ([0], [-2])):
+            ledger = Ledger([10, 10])
+            try:
+                ledger.apply_batch(src, dst, [5])
+            except IndexError:
+                assert ledger.balances.tolist() == [10, 10]
+            else:
+                raise AssertionError(f"account out of range accepted: {src, dst}")
+
+
+if __name__ == "__main__":
+    test = TestLedger()
+    test.test_two_accounts_match_safe_transfer()
+    test.test_conflicting_batches_match_sequential()
+    test.test_rejects_negative_amounts()
+    test.test_rejects_accounts_out_of_range()
+    print("All tests passed!")
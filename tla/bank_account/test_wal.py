@@ -0,0 +1,71 @@
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from wal import DurableLedger
+
+
+def random_batches(rng, n_batches, n_accounts=20):
+    for _ in range(n_batches):
+        size = int(rng.integers(1, 10))
+        yield (
+            rng.integers(0, n_accounts, size),
+            rng.integers(0, n_accounts, size),
+            rng.integers(0, 30, size),
+        )
+
+
+class TestWal:
+    def test_recover_replays_the_log(self):
+        rng = np.random.default_rng(2)
+        with tempfile.TemporaryDirectory() as directory:
+            with DurableLedger.create(
+                directory, np.full(20, 50), group_size=16
+            ) as ledger:
+                for batch in random_batches(rng, 200):
+                    ledger.apply_batch(*batch)
+            assert ledger.durable_seq == ledger.seq
+            with DurableLedger.recover(directory) as recovered:
+                assert recovered.seq == ledger.seq
+                assert (recovered.balances == ledger.balances).all()
+
+    def test_snapshot_compacts_the_log(self):
+        rng = np.random.default_rng(3)
+        with tempfile.TemporaryDirectory() as directory:
+            with DurableLedger.create(
+                directory, np.full(20, 50), group_size=4, snapshot_every=100
+            ) as ledger:
+                for batch in random_batches(rng, 300):
+                    ledger.apply_batch(*batch)
+            files = sorted(p.name for p in Path(directory).iterdir())
+            assert len([f for f in files if f.startswith("snapshot-")]) == 1
+            assert len([f for f in files if f.startswith("wal-")]) == 1
+            with DurableLedger.recover(directory) as recovered:
+                assert (recovered.balances == ledger.balances).all()
+
+    def test_torn_tail_is_discarded(self):
+        rng = np.random.default_rng(4)
+        with tempfile.TemporaryDirectory() as directory:
+            batches = list(random_batches(rng, 20))
+            with DurableLedger.create(directory, np.full(20, 50)) as ledger:
+                for batch in batches[:-1]:
+                    ledger.apply_batch(*batch)
+                ledger.commit()
+                committed_seq, committed = ledger.seq, ledger.balances.copy()
+                ledger.apply_batch(*batches[-1])
+
+            (segment,) = Path(directory).glob("wal-*.log")
+            with open(segment, "r+b") as f:
+                f.truncate(segment.stat().st_size - 5)
+
+            with DurableLedger.recover(directory) as recovered:
+                assert recovered.seq == committed_seq
+                assert (recovered.balances == committed).all()
+
+
+if __name__ == "__main__":
+    test = TestWal()
+    test.test_recover_replays_the_log()
+    test.test_snapshot_compacts_the_log()
+    test.test_torn_tail_is_discarded()
+    print("All tests passed!")
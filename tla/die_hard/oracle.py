@@ -0,0 +1,68 @@
+"""Distance to 4 gallons, and the best next pour, for every jug state.
+
+The table is that of `code_logician_examples.oracle`; this module numbers the
+states. The big jug holds 0 to 5 gallons and the small one 0 to 3, so there are
+only 24 states, numbered `big * 4 + small`. The goal is big == 4.
+"""
+
+import sys
+from pathlib import Path
+
+import main
+from main import Action, State, apply
+
+try:
+    import code_logician_examples.oracle
+except ModuleNotFoundError:
+    # Run from this directory without `pip install -e .`: the package is at
+    # the root of the repository
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+    import code_logician_examples.oracle
+from code_logician_examples.oracle import Oracle, StateSpace
+
+CACHE_DIR = Path(__file__).parent / "__pycache__"
+BIG, SMALL = 5, 3  # Jug capacities
+N_STATES = (BIG + 1) * (SMALL + 1)
+
+ACTIONS = list(Action)
+
+
+def index(state: State) -> int:
+    return state.big * (SMALL + 1) + state.small
+
+
+def all_states() -> list[State]:
+    """Every state, in index order"""
+    return [State(big, small) for big in range(BIG + 1) for small in range(SMALL + 1)]
+
+
+def step(state: State, action: Action) -> State:
+    return apply(action, state)
+
+
+SPACE = StateSpace(main, all_states, index, ACTIONS, step, State.solved)
+
+
+def load_oracle(cache_dir: Path | None = CACHE_DIR) -> Oracle:
+    """Reload the arrays saved for the current `main.py`, or build and save them"""
+    return code_logician_examples.oracle.load_oracle(SPACE, cache_dir)
+
+
+if __name__ == "__main__":
+    import time
+
+    oracle = load_oracle()
+    print("Distance to the goal (rows: big, columns: small)")
+    for big in range(BIG + 1):
+        row = [oracle.distance(State(big, small)) for small in range(SMALL + 1)]
+        print("  " + " ".join(f"{'-' if d is None else d:>2}" for d in row))
+    plan = oracle.plan(State.init_state())
+    print(f"Plan from the initial state: {[a.name for a in plan]}")
+
+    n = 1_000_000
+    states = all_states()
+    start = time.perf_counter()
+    for i in range(n):
+        oracle.best_action(states[i % N_STATES])
+    elapsed = time.perf_counter() - start
+    print(f"best_action: {elapsed / n * 1e9:.0f}ns per lookup")
@@ -0,0 +1,68 @@
+"""Streaming traces of the jug states visited by `many_steps`.
+
+`iter_steps` applies the actions one at a time and yields every intermediate
+state instead of folding them into the last one. It pulls actions from any
+iterable and holds on to nothing, so a trace can be as long as the action
+stream, and it can stop at the first state meeting a condition.
+"""
+
+from collections.abc import Callable, Iterable, Iterator
+
+from main import Action, State, apply
+
+
+def iter_steps(
+    state: State,
+    actions: Iterable[Action],
+    stop: Callable[[State], bool] | None = None,
+) -> Iterator[tuple[Action, State]]:
+    """Yield (action, state after the action) for each action in turn
+
+    Args:
+        state: The initial state
+        actions: The actions to apply in sequence
+        stop: A predicate on states ending the trace early, for example
+            `State.solved` or the negation of an invariant
+    """
+    for action in actions:
+        state = apply(action, state)
+        yield action, state
+        if stop is not None and stop(state):
+            return
+
+
+if __name__ == "__main__":
+    import itertools
+    import time
+    import tracemalloc
+
+    from main import many_steps
+
+    plan = [
+        Action.FILL_BIG,
+        Action.BIG_TO_SMALL,
+        Action.EMPTY_SMALL,
+        Action.BIG_TO_SMALL,
+        Action.FILL_BIG,
+        Action.BIG_TO_SMALL,
+    ]
+    for action, state in iter_steps(State.init_state(), plan, stop=State.solved):
+        print(f"{action.name:<13} big={state.big} small={state.small}")
+
+    n = 1_000_000
+    actions = itertools.islice(itertools.cycle(Action), n)
+    start = time.perf_counter()
+    steps = sum(1 for _ in iter_steps(State.init_state(), actions))
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    for _ in iter_steps(
+        State.init_state(), itertools.islice(itertools.cycle(Action), n)
+    ):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{steps:,} steps streamed in {elapsed:.2f}s, peak {peak:,} bytes traced")
+
+    start = time.perf_counter()
+    many_steps(State.init_state(), list(itertools.islice(itertools.cycle(Action), n)))
+    print(f"many_steps on the same list: {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,60 @@
+import tempfile
+from pathlib import Path
+
+from main import Action, State, apply, many_steps
+from oracle import SPACE, Oracle, all_states, load_oracle
+
+# After oracle, which puts the package on the path when it is not installed
+import code_logician_examples.oracle
+
+
+class TestOracle:
+    def setUp(self):
+        self.oracle = Oracle.build(SPACE)
+
+    def test_plans_are_optimal(self):
+        self.setUp()
+        for state in all_states():
+            plan = self.oracle.plan(state)
+            assert plan is not None
+            assert len(plan) == self.oracle.distance(state)
+            assert many_steps(state, plan).solved()
+        assert self.oracle.distance(State.init_state()) == 6
+
+    def test_best_action_decreases_distance(self):
+        self.setUp()
+        for state in all_states():
+            distance = self.oracle.distance(state)
+            if distance:
+                next_state = apply(self.oracle.best_action(state), state)
+                assert self.oracle.distance(next_state) == distance - 1
+                # No action does better
+                assert all(
+                    self.oracle.distance(apply(a, state)) >= distance - 1
+                    for a in Action
+                )
+
+    def test_cache_round_trip(self):
+        self.setUp()
+        with tempfile.TemporaryDirectory() as directory:
+            first = load_oracle(Path(directory))
+            second = load_oracle(Path(directory))
+            assert len(list(Path(directory).iterdir())) == 1
+            # A new table layout is saved under a new name
+            version = code_logician_examples.oracle.FORMAT_VERSION
+            code_logician_examples.oracle.FORMAT_VERSION = version + 1
+            try:
+                load_oracle(Path(directory))
+            finally:
+                code_logician_examples.oracle.FORMAT_VERSION = version
+            assert len(list(Path(directory).iterdir())) == 2
+        assert first.distances == second.distances == self.oracle.distances
+        assert second.actions == self.oracle.actions
+
+
+if __name__ == "__main__":
+    test = TestOracle()
+    test.test_plans_are_optimal()
+    test.test_best_action_decreases_distance()
+    test.test_cache_round_trip()
+    print("All tests passed!")
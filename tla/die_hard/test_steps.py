@@ -0,0 +1,45 @@
+import itertools
+
+from main import Action, State, many_steps
+from steps import iter_steps
+
+
+class TestSteps:
+    def setUp(self):
+        self.plan = [
+            Action.FILL_BIG,
+            Action.BIG_TO_SMALL,
+            Action.EMPTY_SMALL,
+            Action.BIG_TO_SMALL,
+            Action.FILL_BIG,
+            Action.BIG_TO_SMALL,
+        ]
+
+    def test_trace_matches_prefixes(self):
+        self.setUp()
+        trace = list(iter_steps(State.init_state(), self.plan))
+        assert [action for action, _ in trace] == self.plan
+        for i, (_, state) in enumerate(trace):
+            assert state == many_steps(State.init_state(), self.plan[: i + 1])
+
+    def test_stops_on_predicate(self):
+        self.setUp()
+        trace = list(iter_steps(State.init_state(), self.plan * 2, stop=State.solved))
+        assert len(trace) == len(self.plan)
+        assert trace[-1][1].solved()
+
+    def test_consumes_actions_lazily(self):
+        self.setUp()
+        actions = itertools.cycle(self.plan)
+        steps = iter_steps(State.init_state(), actions, stop=State.solved)
+        assert sum(1 for _ in steps) == len(self.plan)
+        # Only the actions up to the stop have been pulled
+        assert next(actions) == self.plan[0]
+
+
+if __name__ == "__main__":
+    test = TestSteps()
+    test.test_trace_matches_prefixes()
+    test.test_stops_on_predicate()
+    test.test_consumes_actions_lazily()
+    print("All tests passed!")
@@ -0,0 +1,200 @@
+"""Conflate bursts of market data so that each book is re-ranked once per window.
+
+`priority_price`, and so the rank of every order, depends on the NBBO and the
+LULD bands in `MarketData`. A new tick therefore means re-ranking the whole
+book. During a burst, ticks arrive faster than the book can be re-ranked. A
+consumer that handles every tick in turn falls further and further behind,
+re-ranking against prices that are already out of date.
+
+`Conflator` keeps at most one pending tick per symbol. A tick that arrives
+while an earlier one for the same symbol is still pending replaces it, and
+counts as merged. A tick that fails `valid_market_data` is dropped, so the
+book keeps its last valid market. `run` wakes up when ticks are pending and
+re-ranks each of those symbols with its latest tick. It then waits for the rest
+of the window, so a symbol is re-ranked at most once per window however fast
+the ticks come. Memory is bounded by the number of symbols, and a re-rank is
+never more than one window plus one re-rank behind the latest tick.
+
+The re-rank callback runs in a worker thread, so the event loop keeps
+receiving (and conflating) ticks meanwhile. Its staleness is the time from the
+arrival of the oldest tick it covers to the end of the re-rank.
+"""
+
+import asyncio
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from main import MarketData
+
+
+@dataclass
+class Metrics:
+    received: int = 0
+    merged: int = 0  # Replaced by a later tick before being re-ranked
+    dropped: int = 0  # Failed valid_market_data
+    reranks: int = 0
+    staleness_total: float = 0.0  # Seconds
+    staleness_max: float = 0.0
+    round_started: float = 0.0  # Clock at the start of the latest round
+
+    @property
+    def staleness_mean(self) -> float:
+        return self.staleness_total / self.reranks if self.reranks else 0.0
+
+
+class Conflator:
+    def __init__(
+        self,
+        rerank: Callable[[str, MarketData], object],
+        window: float = 0.01,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        """
+        Args:
+            rerank: Called with a symbol and its latest valid market data
+            window: Minimum seconds between the starts of two rounds of re-ranks
+        """
+        self.rerank = rerank
+        self.window = window
+        self.clock = clock
+        self.metrics = Metrics()
+        # Latest tick of each symbol, and the arrival of the oldest it replaced
+        self._pending: dict[str, tuple[MarketData, float]] = {}
+        self._ready = asyncio.Event()
+        self._closed = False
+
+    def publish(self, symbol: str, market: MarketData) -> bool:
+        """Queue a tick, returning whether it was valid"""
+        arrived = self.clock()
+        self.metrics.received += 1
+        if not market.valid_market_data():
+            self.metrics.dropped += 1
+            return False
+        previous = self._pending.get(symbol)
+        if previous is not None:
+            self.metrics.merged += 1
+            arrived = previous[1]
+        self._pending[symbol] = (market, arrived)
+        self._ready.set()
+        return True
+
+    def close(self) -> None:
+        """Let `run` return once the pending ticks are re-ranked"""
+        self._closed = True
+        self._ready.set()
+
+    async def run(self) -> Metrics:
+        while not (self._closed and not self._pending):
+            await self._ready.wait()
+            self._ready.clear()
+            if not self._pending:
+                continue
+            started = self.metrics.round_started = self.clock()
+            pending, self._pending = self._pending, {}
+            for symbol, (market, arrived) in pending.items():
+                await asyncio.to_thread(self.rerank, symbol, market)
+                staleness = self.clock() - arrived
+                self.metrics.reranks += 1
+                self.metrics.staleness_total += staleness
+                self.metrics.staleness_max = max(self.metrics.staleness_max, staleness)
+            remaining = self.window - (self.clock() - started)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+        return self.metrics
+
+
+if __name__ == "__main__":
+    import random
+
+    from main import Order, OrderPeg, OrderSide, OrderType
+    from ranked_book import RankedBook
+
+    rng = random.Random(0)
+    symbols = ["AAA", "BBB", "CCC"]
+    orders = [
+        Order(
+            id=i,
+            peg=rng.choice(list(OrderPeg)),
+            client_id=rng.randrange(100),
+            order_type=rng.choice(list(OrderType)),
+            qty=100,
+            min_qty=0,
+            leaves_qty=rng.randrange(1, 101),
+            price=rng.randrange(9000, 11000) / 100,
+            time=i,
+        )
+        for i in range(5_000)
+    ]
+    books: dict[str, RankedBook] = {}
+
+    def rerank(symbol: str, market: MarketData) -> None:
+        books[symbol] = RankedBook(OrderSide.BUY, market, orders)
+
+    def ticks(n: int) -> list[tuple[str, MarketData]]:
+        """A random walk of the NBBO, with the odd crossed (invalid) quote"""
+        mid, feed = 100.0, []
+        for _ in range(n):
+            mid += rng.choice((-0.01, 0.01))
+            spread = rng.choice((0.02, 0.04, -0.02 if rng.random() < 0.02 else 0.02))
+            nbb, nbo = round(mid - spread / 2, 2), round(mid + spread / 2, 2)
+            market = MarketData(nbb=nbb, nbo=nbo, l_up=mid * 1.1, l_down=mid * 0.9)
+            feed.append((rng.choice(symbols), market))
+        return feed
+
+    async def burst(sink: Callable[[str, MarketData], object], feed, gap: float):
+        for symbol, market in feed:
+            sink(symbol, market)
+            await asyncio.sleep(gap)
+
+    async def per_tick(feed, gap: float) -> Metrics:
+        """Baseline: re-rank on every valid tick, in arrival order"""
+        metrics, queue = Metrics(), asyncio.Queue()
+
+        def put(symbol: str, market: MarketData) -> None:
+            metrics.received += 1
+            if market.valid_market_data():
+                queue.put_nowait((symbol, market, time.perf_counter()))
+            else:
+                metrics.dropped += 1
+
+        async def consume() -> None:
+            while True:
+                symbol, market, arrived = await queue.get()
+                await asyncio.to_thread(rerank, symbol, market)
+                staleness = time.perf_counter() - arrived
+                metrics.reranks += 1
+                metrics.staleness_total += staleness
+                metrics.staleness_max = max(metrics.staleness_max, staleness)
+                queue.task_done()
+
+        consumer = asyncio.create_task(consume())
+        await burst(put, feed, gap)
+        await queue.join()
+        consumer.cancel()
+        return metrics
+
+    async def conflated(feed, gap: float, window: float) -> Metrics:
+        conflator = Conflator(rerank, window)
+        consumer = asyncio.create_task(conflator.run())
+        await burst(conflator.publish, feed, gap)
+        conflator.close()
+        return await consumer
+
+    start = time.perf_counter()
+    rerank("AAA", MarketData(nbb=99.0, nbo=101.0, l_up=110.0, l_down=90.0))
+    print(f"One re-rank of {len(orders):,} orders: {time.perf_counter() - start:.4f}s")
+    feed, gap = ticks(300), 0.0005  # 2000 ticks per second
+    for name, run in (
+        ("per tick", per_tick(feed, gap)),
+        ("conflated 10ms", conflated(feed, gap, 0.01)),
+        ("conflated 50ms", conflated(feed, gap, 0.05)),
+    ):
+        start = time.perf_counter()
+        m = asyncio.run(run)
+        print(
+            f"{name:<15} {time.perf_counter() - start:6.2f}s  "
+            f"received {m.received}, merged {m.merged}, dropped {m.dropped}, "
+            f"reranks {m.reranks}, staleness mean {m.staleness_mean * 1e3:.0f}ms "
+            f"max {m.staleness_max * 1e3:.0f}ms"
+        )
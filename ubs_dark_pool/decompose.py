@@ -0,0 +1,763 @@
+"""Local region decomposition of the ranking functions in `main`.
+
+A region decomposition (like six_swiss/region_decomp.md) splits the inputs of
+a function into regions, each defined by the constraints of one feasible path
+through the code and each with a single result. Here it is computed locally,
+by running the unmodified `less_aggressive`, `priority_price` and
+`order_higher_ranked` on symbolic inputs:
+
+    - prices, times and quantities are `Linear` expressions over named
+      variables, so arithmetic builds expressions and comparisons build
+      `Comparison` conditions;
+    - sides, order types and pegs are `SymbolicEnum`s, whose equality tests,
+      `in` tests and boolean properties (`is_ci`, ...) build `Membership`
+      conditions.
+
+Whenever the code needs the truth value of a condition, the current `_Path`
+decides it: both outcomes are checked for feasibility against the constraints
+collected so far, the first feasible one is taken and the other, if feasible
+too, is queued to be explored by a later run that replays the same decisions
+up to that point. Feasibility of the linear constraints over the reals is
+decided by Fourier-Motzkin elimination, which also produces a sample input for
+each region; the sample is run through the real function to check that it
+lands in its region. Times and quantities are integers: when the sample over
+the reals gives one of them a fraction, `solve_integer` rounds it into the
+region by branch and bound. A region where that finds no integer point within
+its depth keeps the real sample and is marked `integer_witness=False`.
+
+Results are cached under `__pycache__`, keyed by a hash of the source of the
+analysed functions and of this module, so an unchanged decomposition reloads
+instantly.
+
+    python decompose.py [function] [--markdown FILE]
+"""
+
+import ast
+import hashlib
+import inspect
+import json
+import operator
+import os
+from collections import deque
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from fractions import Fraction
+from functools import lru_cache
+from math import ceil, floor
+from pathlib import Path
+
+import main
+from main import MarketData, Order, OrderPeg, OrderSide, OrderType
+
+CACHE_DIR = Path(__file__).parent / "__pycache__"
+
+
+class Linear:
+    """A linear expression: sum of coefficient * variable, plus a constant"""
+
+    __slots__ = ("coeffs", "const")
+
+    def __init__(self, coeffs: dict[str, Fraction] | None = None, const=0):
+        self.coeffs = {v: c for v, c in (coeffs or {}).items() if c != 0}
+        self.const = Fraction(const)
+
+    @staticmethod
+    def var(name: str) -> "Linear":
+        return Linear({name: Fraction(1)})
+
+    @staticmethod
+    def lift(value) -> "Linear":
+        return value if isinstance(value, Linear) else Linear(const=value)
+
+    def __add__(self, other) -> "Linear":
+        other = Linear.lift(other)
+        coeffs = dict(self.coeffs)
+        for v, c in other.coeffs.items():
+            coeffs[v] = coeffs.get(v, 0) + c
+        return Linear(coeffs, self.const + other.const)
+
+    __radd__ = __add__
+
+    def __neg__(self) -> "Linear":
+        return self * -1
+
+    def __sub__(self, other) -> "Linear":
+        return self + -Linear.lift(other)
+
+    def __rsub__(self, other) -> "Linear":
+        return Linear.lift(other) - self
+
+    def __mul__(self, factor) -> "Linear":
+        if isinstance(factor, Linear):
+            raise TypeError("Only linear expressions are supported")
+        factor = Fraction(factor)
+        return Linear(
+            {v: c * factor for v, c in self.coeffs.items()}, self.const * factor
+        )
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, divisor) -> "Linear":
+        return self * (1 / Fraction(divisor))
+
+    # Comparisons are normalised to "expression op 0"
+    def __gt__(self, other) -> "Comparison":
+        return Comparison(self - other, ">")
+
+    def __ge__(self, other) -> "Comparison":
+        return Comparison(self - other, ">=")
+
+    def __lt__(self, other) -> "Comparison":
+        return Comparison(Linear.lift(other) - self, ">")
+
+    def __le__(self, other) -> "Comparison":
+        return Comparison(Linear.lift(other) - self, ">=")
+
+    def __eq__(self, other) -> "Comparison":
+        return Comparison(self - other, "==")
+
+    def __ne__(self, other) -> "Comparison":
+        return Comparison(self - other, "!=")
+
+    __hash__ = None
+
+    def value(self, assignment: dict[str, Fraction]) -> Fraction:
+        """Value for an assignment, in which missing (free) variables are 1"""
+        return self.const + sum(
+            c * assignment.get(v, 1) for v, c in self.coeffs.items()
+        )
+
+    def __str__(self) -> str:
+        return _format_terms(self.coeffs, self.const)
+
+
+def _format_terms(coeffs: dict[str, Fraction], const: Fraction) -> str:
+    terms = []
+    for v, c in sorted(coeffs.items()):
+        magnitude = "" if abs(c) == 1 else f"{_format_number(abs(c))} * "
+        terms.append(("- " if c < 0 else "+ ") + magnitude + v)
+    if const or not terms:
+        terms.append(("- " if const < 0 else "+ ") + _format_number(abs(const)))
+    text = " ".join(terms)
+    return text[2:] if text.startswith("+ ") else "-" + text[2:]
+
+
+def _format_number(x: Fraction) -> str:
+    return str(x.numerator) if x.denominator == 1 else f"{float(x):g}"
+
+
+_NEGATED = {">": ">=", ">=": ">", "==": "!=", "!=": "=="}
+_FLIPPED = {">": "<", ">=": "<=", "==": "==", "!=": "!="}
+
+
+class Condition:
+    def __bool__(self) -> bool:
+        if _path is None:
+            raise TypeError("Symbolic condition evaluated outside of an exploration")
+        return _path.decide(self)
+
+
+class Comparison(Condition):
+    """expression op 0, with op one of >, >=, == and !="""
+
+    def __init__(self, expression: Linear, op: str):
+        self.expression = expression
+        self.op = op
+
+    def holds(self, assignment: dict[str, Fraction]) -> bool:
+        value = self.expression.value(assignment)
+        if self.op == ">":
+            return value > 0
+        if self.op == ">=":
+            return value >= 0
+        return (value == 0) == (self.op == "==")
+
+    def negate(self) -> "Comparison":
+        if self.op in (">", ">="):
+            return Comparison(-self.expression, _NEGATED[self.op])
+        return Comparison(self.expression, _NEGATED[self.op])
+
+    def __str__(self) -> str:
+        coeffs, const = self.expression.coeffs, self.expression.const
+        left = {v: c for v, c in coeffs.items() if c > 0}
+        right = {v: -c for v, c in coeffs.items() if c < 0}
+        left_const, right_const = max(const, 0), max(-const, 0)
+        op = self.op
+        if not left and right:
+            left, right, left_const, right_const = right, left, right_const, left_const
+            op = _FLIPPED[op]
+        return (
+            f"{_format_terms(left, left_const)} {op} "
+            f"{_format_terms(right, right_const)}"
+        )
+
+
+class Membership(Condition):
+    """The value of an enum variable is one of members"""
+
+    def __init__(self, variable: str, members: frozenset):
+        self.variable = variable
+        self.members = members
+
+
+class SymbolicEnum:
+    """A variable ranging over the members of an enum"""
+
+    def __init__(self, name: str, enum: type[Enum]):
+        self.name = name
+        self.enum = enum
+
+    def __eq__(self, other) -> Membership:
+        if not isinstance(other, self.enum):
+            raise TypeError(f"Cannot compare {self.name} with {other!r}")
+        return Membership(self.name, frozenset([other]))
+
+    def __ne__(self, other) -> Membership:
+        return Membership(self.name, frozenset(self.enum) - {other})
+
+    __hash__ = None
+
+    def __getattr__(self, attribute: str) -> Membership:
+        """Boolean properties of the members, such as `OrderType.is_ci`"""
+        values = {member: getattr(member, attribute) for member in self.enum}
+        if not all(isinstance(v, bool) for v in values.values()):
+            raise AttributeError(attribute)
+        return Membership(self.name, frozenset(m for m, v in values.items() if v))
+
+
+# Fourier-Motzkin elimination over linear constraints "expression > 0" or
+# "expression >= 0" (equalities are a pair of >=)
+
+
+@dataclass(frozen=True)
+class _Constraint:
+    coeffs: tuple[tuple[str, Fraction], ...]
+    const: Fraction
+    strict: bool
+
+    @staticmethod
+    def make(coeffs: dict[str, Fraction], const: Fraction, strict: bool):
+        return _Constraint(tuple(sorted(coeffs.items())), const, strict)
+
+
+def _constraints(comparison: Comparison) -> list[_Constraint]:
+    e = comparison.expression
+    if comparison.op == "==":
+        return [
+            _Constraint.make(e.coeffs, e.const, False),
+            _Constraint.make((-e).coeffs, -e.const, False),
+        ]
+    return [_Constraint.make(e.coeffs, e.const, comparison.op == ">")]
+
+
+@lru_cache(maxsize=4096)
+def _eliminate(
+    constraints: frozenset[_Constraint],
+) -> tuple[list[tuple[str, list[_Constraint]]], bool]:
+    """Eliminate every variable in turn
+
+    Returns:
+        The constraints involving each variable when it was eliminated, in
+        elimination order, and whether the constraints are satisfiable
+    """
+    stages = []
+    current = {c: dict(c.coeffs) for c in constraints}
+    while True:
+        # Eliminating the variable with the fewest pairs keeps the growth down
+        lower_count: dict[str, int] = {}
+        upper_count: dict[str, int] = {}
+        for terms in current.values():
+            for v, c in terms.items():
+                counts = lower_count if c > 0 else upper_count
+                counts[v] = counts.get(v, 0) + 1
+        variables = sorted(lower_count.keys() | upper_count.keys())
+        if not variables:
+            break
+        x = min(variables, key=lambda v: lower_count.get(v, 0) * upper_count.get(v, 0))
+        involved = [c for c, terms in current.items() if x in terms]
+        stages.append((x, involved))
+        lower = [(c, current[c]) for c in involved if current[c][x] > 0]
+        upper = [(c, current[c]) for c in involved if current[c][x] < 0]
+        for c in involved:
+            del current[c]
+        for lo, lo_terms in lower:
+            for hi, hi_terms in upper:
+                a, b = lo_terms[x], -hi_terms[x]
+                coeffs: dict[str, Fraction] = {}
+                for v, c in lo.coeffs:
+                    coeffs[v] = coeffs.get(v, 0) + c / a
+                for v, c in hi.coeffs:
+                    coeffs[v] = coeffs.get(v, 0) + c / b
+                coeffs = {v: c for v, c in coeffs.items() if c != 0}
+                combined = _Constraint.make(
+                    coeffs, lo.const / a + hi.const / b, lo.strict or hi.strict
+                )
+                if not coeffs:
+                    if combined.const < 0 or (combined.strict and combined.const == 0):
+                        return stages, False
+                else:
+                    current[combined] = coeffs
+    for c in current:
+        if c.const < 0 or (c.strict and c.const == 0):
+            return stages, False
+    return stages, True
+
+
+def _sample(
+    stages: list[tuple[str, list[_Constraint]]],
+    variables: set[str],
+    integers: set[str],
+) -> dict[str, Fraction]:
+    """A solution, by back-substitution through the elimination stages
+
+    Variables left without constraints once others were eliminated are free,
+    and set to 1 like the variables that appear in no constraint at all.
+    """
+    eliminated = {x for x, _ in stages}
+    assignment = {v: Fraction(1) for v in variables - eliminated}
+    for x, involved in reversed(stages):
+        lo = hi = None
+        lo_strict = hi_strict = False
+        for c in involved:
+            coeffs = dict(c.coeffs)
+            a = coeffs.pop(x)
+            rest = c.const + sum(k * assignment[v] for v, k in coeffs.items())
+            bound = -rest / a
+            if a > 0 and (lo is None or bound > lo or (bound == lo and c.strict)):
+                lo, lo_strict = bound, c.strict
+            elif a < 0 and (hi is None or bound < hi or (bound == hi and c.strict)):
+                hi, hi_strict = bound, c.strict
+        assignment[x] = _choose(lo, lo_strict, hi, hi_strict, x in integers)
+    return assignment
+
+
+def _choose(lo, lo_strict, hi, hi_strict, integer: bool) -> Fraction:
+    """A simple value between the bounds, an integer if possible"""
+    if lo is None and hi is None:
+        return Fraction(1)
+    if hi is None:
+        return Fraction(floor(lo) + 1 if lo_strict or not integer else ceil(lo))
+    if lo is None:
+        return Fraction(ceil(hi) - 1 if hi_strict or not integer else floor(hi))
+    if lo == hi:
+        return lo
+    candidate = Fraction(floor(lo) + 1 if lo_strict else ceil(lo))
+    if candidate < hi or (candidate == hi and not hi_strict):
+        return candidate
+    return (lo + hi) / 2
+
+
+def solve(
+    comparisons: list[Comparison], integers: set[str] = frozenset()
+) -> dict[str, Fraction] | None:
+    """A solution of the comparisons over the reals, None if there is none
+
+    A disequality excludes a hyperplane. Given a satisfiable conjunction of the
+    other constraints, whose solutions form a convex set, it can always be
+    satisfied unless that whole set lies in the hyperplane, so each
+    disequality in turn is replaced by whichever of its two sides is
+    satisfiable.
+    """
+    constraints = {
+        c
+        for comparison in comparisons
+        if comparison.op != "!="
+        for c in _constraints(comparison)
+    }
+    stages, feasible = _eliminate(frozenset(constraints))
+    if not feasible:
+        return None
+    for comparison in comparisons:
+        if comparison.op != "!=":
+            continue
+        for side in (
+            Comparison(comparison.expression, ">"),
+            Comparison(-comparison.expression, ">"),
+        ):
+            extended = constraints | set(_constraints(side))
+            stages, feasible = _eliminate(frozenset(extended))
+            if feasible:
+                constraints = extended
+                break
+        else:
+            return None
+    variables = {v for comparison in comparisons for v in comparison.expression.coeffs}
+    return _sample(stages, variables, integers)
+
+
+def solve_integer(
+    comparisons: list[Comparison], integers: set[str], depth: int = 8
+) -> dict[str, Fraction] | None:
+    """A solution giving every integer variable an integer value, None if none found
+
+    Branch and bound: a fractional value v of an integer variable x splits the
+    region into x <= floor(v) and x >= ceil(v), each solved again. The search
+    gives up after `depth` splits along a branch, so None does not prove that
+    the region has no integer point.
+    """
+    assignment = solve(comparisons, integers)
+    if assignment is None:
+        return None
+    fractional = [v for v in sorted(integers) if assignment.get(v, 1).denominator != 1]
+    if not fractional or depth == 0:
+        return None if fractional else assignment
+    x, value = Linear.var(fractional[0]), assignment[fractional[0]]
+    for bound in (x <= floor(value), x >= ceil(value)):
+        found = solve_integer(comparisons + [bound], integers, depth - 1)
+        if found is not None:
+            return found
+    return None
+
+
+# Path exploration
+
+
+_path: "_Path | None" = None
+
+
+class _Path:
+    def __init__(
+        self,
+        prefix: list[bool],
+        domains: dict[str, frozenset],
+        integers: set[str],
+    ):
+        self.prefix = prefix
+        self.decisions: list[bool] = []
+        self.comparisons: list[Comparison] = []
+        self.domains = dict(domains)
+        self.integers = integers
+        self.alternatives: list[list[bool]] = []
+        # A solution of the comparisons so far, None when not known
+        self.witness: dict[str, Fraction] | None = None
+
+    def _outcomes(self, condition: Condition) -> tuple[bool, bool]:
+        """Whether the condition can be true, and whether it can be false"""
+        if isinstance(condition, Membership):
+            domain = self.domains[condition.variable]
+            return bool(domain & condition.members), bool(domain - condition.members)
+        if self.witness is None:
+            self.witness = solve(self.comparisons, self.integers)
+        # The witness settles one outcome, only the other needs solving
+        holds = condition.holds(self.witness)
+        other = condition.negate() if holds else condition
+        other_feasible = solve(self.comparisons + [other], self.integers) is not None
+        return (True, other_feasible) if holds else (other_feasible, True)
+
+    def decide(self, condition: Condition) -> bool:
+        if isinstance(condition, Comparison) and not condition.expression.coeffs:
+            # Constant, such as the difference of two equal prices
+            return condition.holds({})
+        i = len(self.decisions)
+        if i < len(self.prefix):
+            outcome = self.prefix[i]
+        else:
+            if_true, if_false = self._outcomes(condition)
+            outcome = if_true
+            if if_true and if_false:
+                self.alternatives.append(self.decisions + [False])
+        self.decisions.append(outcome)
+        if isinstance(condition, Membership):
+            domain = self.domains[condition.variable]
+            members = condition.members
+            self.domains[condition.variable] = (
+                domain & members if outcome else domain - members
+            )
+        else:
+            comparison = condition if outcome else condition.negate()
+            self.comparisons.append(comparison)
+            if self.witness is not None and not comparison.holds(self.witness):
+                self.witness = None
+        return outcome
+
+
+@dataclass(frozen=True)
+class EntryPoint:
+    name: str
+    # Variable name to its type: an enum, float or int
+    variables: dict[str, type]
+    # Builds the arguments of the function from a value per variable name
+    build: Callable[[Callable[[str], object]], tuple]
+    # Functions of main whose source the decomposition depends on
+    depends_on: tuple[str, ...]
+
+    @property
+    def function(self) -> Callable:
+        return getattr(main, self.name)
+
+    def symbolic_arguments(self) -> tuple:
+        def value(name: str):
+            kind = self.variables[name]
+            return (
+                SymbolicEnum(name, kind) if issubclass(kind, Enum) else Linear.var(name)
+            )
+
+        return self.build(value)
+
+    def concrete_arguments(self, sample: dict[str, object]) -> tuple:
+        def value(name: str):
+            kind = self.variables[name]
+            return kind[sample[name]] if issubclass(kind, Enum) else kind(sample[name])
+
+        return self.build(value)
+
+    def source_hash(self) -> str:
+        sources = [inspect.getsource(getattr(main, name)) for name in self.depends_on]
+        digest = hashlib.sha256("".join(sources).encode())
+        digest.update(Path(__file__).read_bytes())  # The analysis itself
+        return digest.hexdigest()[:16]
+
+
+@dataclass
+class Region:
+    id: int
+    result: str  # repr of the result in the region, or its expression
+    constraints: list[str]
+    sample: dict[str, object] = field(default_factory=dict)  # Enum members by name
+    # False when no integer time or quantity was found: the sample is then real
+    integer_witness: bool = True
+
+
+def _order(prefix: str, value: Callable[[str], object]) -> Order:
+    return Order(
+        id=0,
+        peg=value(f"{prefix}.peg"),
+        client_id=0,
+        order_type=value(f"{prefix}.order_type"),
+        qty=0,
+        min_qty=0,
+        leaves_qty=value(f"{prefix}.leaves_qty"),
+        price=value(f"{prefix}.price"),
+        time=value(f"{prefix}.time"),
+    )
+
+
+def _order_variables(prefix: str) -> dict[str, type]:
+    return {
+        f"{prefix}.order_type": OrderType,
+        f"{prefix}.peg": OrderPeg,
+        f"{prefix}.price": float,
+        f"{prefix}.time": int,
+        f"{prefix}.leaves_qty": int,
+    }
+
+
+def _market(value: Callable[[str], object]) -> MarketData:
+    return MarketData(
+        nbb=value("mkt.nbb"),
+        nbo=value("mkt.nbo"),
+        l_up=value("mkt.l_up"),
+        l_down=value("mkt.l_down"),
+    )
+
+
+_MARKET_VARIABLES = {f"mkt.{f}": float for f in ("nbb", "nbo", "l_up", "l_down")}
+_RANKING = ("less_aggressive", "priority_price", "order_higher_ranked", "OrderType")
+
+ENTRY_POINTS = {
+    "less_aggressive": EntryPoint(
+        "less_aggressive",
+        {"side": OrderSide, "lim_price": float, "far_price": float},
+        lambda v: (v("side"), v("lim_price"), v("far_price")),
+        _RANKING[:1],
+    ),
+    "priority_price": EntryPoint(
+        "priority_price",
+        {"side": OrderSide, **_order_variables("o"), **_MARKET_VARIABLES},
+        lambda v: (v("side"), _order("o", v), _market(v)),
+        (*_RANKING[:2], "MarketData", "OrderType"),
+    ),
+    "order_higher_ranked": EntryPoint(
+        "order_higher_ranked",
+        {
+            "side": OrderSide,
+            **_order_variables("o1"),
+            **_order_variables("o2"),
+            **_MARKET_VARIABLES,
+        },
+        lambda v: (v("side"), _order("o1", v), _order("o2", v), _market(v)),
+        (*_RANKING, "MarketData"),
+    ),
+}
+
+
+def _format_domain(variable: str, domain: frozenset, enum: type[Enum]) -> str:
+    members = [m.name for m in enum if m in domain]
+    if len(members) == 1:
+        return f"{variable} == {members[0]}"
+    excluded = [m.name for m in enum if m not in domain]
+    if len(excluded) == 1:
+        return f"{variable} != {excluded[0]}"
+    if len(excluded) < len(members):
+        return f"{variable} not in {{{', '.join(excluded)}}}"
+    return f"{variable} in {{{', '.join(members)}}}"
+
+
+def explore(entry: EntryPoint) -> list[Region]:
+    """Enumerate the feasible paths through a function"""
+    global _path
+    enums = {n: k for n, k in entry.variables.items() if issubclass(k, Enum)}
+    integers = {n for n, k in entry.variables.items() if k is int}
+    domains = {n: frozenset(k) for n, k in enums.items()}
+    regions = []
+    pending: deque[list[bool]] = deque([[]])
+    while pending:
+        prefix = pending.popleft()
+        path = _Path(prefix, domains, integers)
+        _path = path
+        try:
+            result = entry.function(*entry.symbolic_arguments())
+            if isinstance(result, Condition):
+                result = bool(result)
+        finally:
+            _path = None
+        pending.extend(path.alternatives)
+
+        assignment = path.witness or solve(path.comparisons, integers)
+        integer = all(assignment.get(v, 1).denominator == 1 for v in integers)
+        if not integer:
+            found = solve_integer(path.comparisons, integers)
+            assignment, integer = found or assignment, found is not None
+        sample: dict[str, object] = {}
+        for name, kind in entry.variables.items():
+            if name in enums:
+                sample[name] = next(m for m in kind if m in path.domains[name]).name
+            else:
+                x = assignment.get(name, Fraction(1))
+                whole = kind is int and x.denominator == 1
+                sample[name] = int(x) if whole else float(x)
+        constraints = [str(c) for c in path.comparisons] + [
+            _format_domain(n, path.domains[n], enums[n])
+            for n in entry.variables
+            if n in enums and path.domains[n] != domains[n]
+        ]
+        shown = str(result) if isinstance(result, Linear) else repr(result)
+        regions.append(Region(len(regions) + 1, shown, constraints, sample, integer))
+    return regions
+
+
+def check_samples(entry: EntryPoint, regions: list[Region]) -> list[int]:
+    """Ids of the regions whose sample does not give the region's result
+
+    Regions without an integer witness are skipped: their sample cannot be
+    passed to the function.
+    """
+    wrong = []
+    for region in regions:
+        if not region.integer_witness:
+            continue
+        result = entry.function(*entry.concrete_arguments(region.sample))
+        if region.result in ("True", "False"):
+            matches = repr(result) == region.result
+        else:
+            expression = _evaluate_expression(region.result, region.sample)
+            matches = abs(result - expression) < 1e-9
+        if not matches:
+            wrong.append(region.id)
+    return wrong
+
+
+_OPERATORS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul}
+
+
+def _evaluate_expression(text: str, sample: dict[str, object]) -> float:
+    """Value of a printed Linear expression for a sample
+
+    Only what `_format_terms` prints is accepted: numbers, variables (dotted
+    names parse as attributes), negation, +, - and *.
+    """
+
+    def value(node: ast.expr) -> float:
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            return node.value
+        if isinstance(node, ast.Name | ast.Attribute):
+            number = sample.get(ast.unparse(node))
+            if type(number) in (int, float):
+                return number
+        elif isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            return -value(node.operand)
+        elif isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+            return _OPERATORS[type(node.op)](value(node.left), value(node.right))
+        raise ValueError(f"Not a linear expression of the sample: {text!r}")
+
+    try:
+        return value(ast.parse(text, mode="eval").body)
+    except SyntaxError:
+        raise ValueError(f"Not a linear expression of the sample: {text!r}") from None
+
+
+def decompose(name: str, cache_dir: Path | None = CACHE_DIR) -> list[Region]:
+    """Regions of a function of `main`, reloaded from the cache if unchanged"""
+    entry = ENTRY_POINTS[name]
+    if cache_dir is None:
+        return explore(entry)
+    path = cache_dir / f"regions.{name}.{entry.source_hash()}.json"
+    try:
+        with open(path) as f:
+            return [Region(**region) for region in json.load(f)]
+    except (OSError, ValueError):
+        pass
+
+    regions = explore(entry)
+    cache_dir.mkdir(exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump([asdict(region) for region in regions], f)
+    os.replace(tmp, path)
+    return regions
+
+
+def to_markdown(entry: EntryPoint, regions: list[Region]) -> str:
+    """Region and test-case tables in the layout of six_swiss/region_decomp.md"""
+    lines = [
+        "### Region Decomposition",
+        "",
+        "| Region | Invariant | Constraints |",
+        "| ------ | --------- | ----------- |",
+    ]
+    for region in regions:
+        constraints = "<br>".join(f"`{c}`" for c in region.constraints)
+        lines.append(f"| {region.id} | `{region.result}` | {constraints} |")
+    lines += [
+        "",
+        "### Test Cases",
+        "",
+        "| Test Case | Variable | Type | Value |",
+        "| --------- | -------- | ---- | ----- |",
+    ]
+    for region in regions:
+        if not region.integer_witness:
+            lines.append(f"| {region.id} | | | no integer witness yet |")
+            continue
+        for name, value in region.sample.items():
+            kind = entry.variables[name].__name__
+            lines.append(f"| {region.id} | `{name}` | `{kind}` | `{value}` |")
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("function", nargs="?", default="order_higher_ranked")
+    parser.add_argument("--markdown", help="Write the region tables to this file")
+    args = parser.parse_args()
+
+    entry = ENTRY_POINTS[args.function]
+    start = time.perf_counter()
+    regions = decompose(args.function, cache_dir=None)
+    elapsed = time.perf_counter() - start
+    wrong = check_samples(entry, regions)
+    print(f"{args.function}: {len(regions)} regions in {elapsed:.2f}s")
+    print(f"Samples outside their region: {wrong or 'none'}")
+    missing = [r.id for r in regions if not r.integer_witness]
+    print(f"Regions without an integer witness: {missing or 'none'}")
+    decompose(args.function)
+    start = time.perf_counter()
+    decompose(args.function)
+    print(f"Reloaded from the cache in {(time.perf_counter() - start) * 1000:.2f}ms")
+    if args.markdown:
+        with open(args.markdown, "w") as f:
+            f.write(to_markdown(entry, regions))
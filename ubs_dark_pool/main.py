@@ -116,7 +116,7 @@ def priority_price(side: OrderSide, o: Order, mkt: MarketData) -> float:
                 side, o.price, mkt.nbo if side == OrderSide.BUY else mkt.nbb
             )
         elif o.peg == OrderPeg.MID:
-            return less_aggressive(side, o.price, mkt.mid_point())
+            return less_aggressive(side, o.price, mkt.mid_point)
         elif o.peg == OrderPeg.NEAR:
             return less_aggressive(
                 side, o.price, mkt.nbb if side == OrderSide.BUY else mkt.nbo
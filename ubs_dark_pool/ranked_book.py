@@ -0,0 +1,261 @@
+"""One side of the dark pool's book, kept in rank order as orders come and go.
+
+`order_higher_ranked` compares two orders. Re-sorting the book on every new
+order, cancel or rank query costs O(n log n) per event. `RankedBook` instead
+gives every order a sort key once, under the book's fixed `MarketData`, and
+keeps the orders in an indexable skip list. Each link also stores how many
+orders it skips, so inserting, cancelling and finding the rank of an order
+all take O(log n) expected time, and the top k take O(log n + k).
+
+The key follows `order_higher_ranked`: the better priority price first, then
+the earlier time, then non-CI before CI orders, then the larger leaves_qty,
+and finally the order id so that keys are unique. `order_higher_ranked` is not
+transitive, so no ordering can agree with it on every pair. This one differs
+only for two CI orders at the same priority price and different times:
+`order_higher_ranked` ranks the larger leaves_qty first, the key the older
+order. Time priority is kept, so the book stays a consistent total order.
+
+O(log n) is not flat, and the cost of an event grows faster than log n once
+the book is large. Each walk down the skip list visits about 2 log2(n) nodes.
+Each order also holds a node, two link lists and the order itself, some
+hundreds of bytes scattered over the heap. While they fit in the CPU caches,
+the cost per log2(n) that `python ranked_book.py` prints stays flat. Beyond
+that, most steps of a walk are cache misses and that cost climbs too.
+"""
+
+import random
+from collections.abc import Iterable, Iterator
+
+from main import MarketData, Order, OrderSide, priority_price
+
+MAX_LEVEL = 32
+
+Key = tuple[float, int, bool, int, int]
+
+
+def priority_key(side: OrderSide, order: Order, market: MarketData) -> Key:
+    """Sort key of an order, smaller keys ranking higher"""
+    price = priority_price(side, order, market)
+    return (
+        -price if side == OrderSide.BUY else price,
+        order.time,
+        order.order_type.is_ci,
+        -order.leaves_qty,
+        order.id,
+    )
+
+
+class _Node:
+    __slots__ = ("key", "next", "order", "width")
+
+    def __init__(self, key: Key | None, order: Order | None, level: int):
+        self.key = key
+        self.order = order
+        self.next: list[_Node | None] = [None] * level
+        # Number of orders from this node to next[level], counting next[level]
+        self.width = [1] * level
+
+
+class RankedBook:
+    def __init__(
+        self,
+        side: OrderSide,
+        market: MarketData,
+        orders: Iterable[Order] = (),
+        seed: int = 0,
+    ):
+        self.side = side
+        self.market = market
+        self._rng = random.Random(seed)
+        self._head = _Node(None, None, MAX_LEVEL)
+        self._tail = _Node(None, None, 0)
+        self._level = 0  # Levels in use
+        self._keys: dict[int, Key] = {}  # By order id
+        self._load(orders)
+
+    def _random_level(self) -> int:
+        """1 with probability 1/2, 2 with probability 1/4, ..."""
+        bits = self._rng.getrandbits(MAX_LEVEL - 1) | (1 << (MAX_LEVEL - 1))
+        return (bits & -bits).bit_length()
+
+    def _load(self, orders: Iterable[Order]) -> None:
+        """Link sorted orders level by level, in O(n log n) for the sort only"""
+        nodes = sorted(
+            (_Node(priority_key(self.side, o, self.market), o, 0) for o in orders),
+            key=lambda node: node.key,
+        )
+        for node in nodes:
+            if node.key[-1] in self._keys:
+                raise ValueError(f"Duplicate order id {node.key[-1]}")
+            self._keys[node.key[-1]] = node.key
+        last = [self._head] * MAX_LEVEL
+        last_position = [0] * MAX_LEVEL
+        for position, node in enumerate(nodes, start=1):
+            level = self._random_level()
+            node.next, node.width = [None] * level, [1] * level
+            for i in range(level):
+                last[i].next[i] = node
+                last[i].width[i] = position - last_position[i]
+                last[i], last_position[i] = node, position
+            self._level = max(self._level, level)
+        end = len(nodes) + 1
+        for i in range(MAX_LEVEL):
+            last[i].next[i] = self._tail
+            last[i].width[i] = end - last_position[i]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, order_id: int) -> bool:
+        return order_id in self._keys
+
+    def _predecessors(self, key: Key) -> tuple[list[_Node], list[int]]:
+        """Last node before key at each level in use, and its position"""
+        chain = [self._head] * self._level
+        positions = [0] * self._level
+        node, position, tail = self._head, 0, self._tail
+        for i in range(self._level - 1, -1, -1):
+            following = node.next[i]
+            while following is not tail and following.key < key:
+                position += node.width[i]
+                node = following
+                following = node.next[i]
+            chain[i], positions[i] = node, position
+        return chain, positions
+
+    def insert(self, order: Order) -> int:
+        """Add an order and return its rank, 0 being the best"""
+        if order.id in self._keys:
+            raise ValueError(f"Duplicate order id {order.id}")
+        key = priority_key(self.side, order, self.market)
+        level = self._random_level()
+        if level > self._level:
+            for i in range(self._level, level):
+                self._head.width[i] = len(self._keys) + 1
+            self._level = level
+        chain, positions = self._predecessors(key)
+        rank = positions[0]
+
+        node = _Node(key, order, level)
+        for i in range(level):
+            previous = chain[i]
+            node.next[i] = previous.next[i]
+            previous.next[i] = node
+            node.width[i] = previous.width[i] - (rank - positions[i])
+            previous.width[i] = rank - positions[i] + 1
+        for i in range(level, self._level):
+            chain[i].width[i] += 1
+        self._keys[order.id] = key
+        return rank
+
+    def cancel(self, order_id: int) -> Order:
+        """Remove an order, raising KeyError if it is not in the book"""
+        key = self._keys.pop(order_id)
+        chain, _ = self._predecessors(key)
+        node = chain[0].next[0]
+        for i in range(self._level):
+            if i < len(node.next):
+                chain[i].next[i] = node.next[i]
+                chain[i].width[i] += node.width[i] - 1
+            else:
+                chain[i].width[i] -= 1
+        return node.order
+
+    def rank(self, order_id: int) -> int:
+        """Number of orders ranked above an order"""
+        key = self._keys[order_id]
+        node, position, tail = self._head, 0, self._tail
+        for i in range(self._level - 1, -1, -1):
+            following = node.next[i]
+            while following is not tail and following.key < key:
+                position += node.width[i]
+                node = following
+                following = node.next[i]
+        return position
+
+    def __getitem__(self, rank: int) -> Order:
+        """The order at a rank"""
+        if not 0 <= rank < len(self._keys):
+            raise IndexError(rank)
+        node, position = self._head, 0
+        for i in range(self._level - 1, -1, -1):
+            while position + node.width[i] <= rank + 1:
+                position += node.width[i]
+                node = node.next[i]
+        return node.order
+
+    def top(self, k: int) -> list[Order]:
+        """The k best orders, best first"""
+        orders = []
+        node = self._head.next[0]
+        while node is not self._tail and len(orders) < k:
+            orders.append(node.order)
+            node = node.next[0]
+        return orders
+
+    def __iter__(self) -> Iterator[Order]:
+        node = self._head.next[0]
+        while node is not self._tail:
+            yield node.order
+            node = node.next[0]
+
+
+if __name__ == "__main__":
+    import gc
+    import math
+    import time
+
+    from main import OrderPeg, OrderType
+
+    rng = random.Random(0)
+    market = MarketData(nbb=99.0, nbo=101.0, l_up=110.0, l_down=90.0)
+    types, pegs = list(OrderType), list(OrderPeg)
+    next_id = 0
+
+    def new_order() -> Order:
+        global next_id
+        next_id += 1
+        qty = rng.randrange(1, 1000)
+        return Order(
+            id=next_id,
+            peg=rng.choice(pegs),
+            client_id=rng.randrange(100),
+            order_type=rng.choice(types),
+            qty=qty,
+            min_qty=0,
+            leaves_qty=rng.randrange(1, qty + 1),
+            price=rng.randrange(9000, 11000) / 100,
+            time=next_id,
+        )
+
+    events = 20_000
+    for size in (1_000, 10_000, 100_000, 1_000_000):
+        orders = [new_order() for _ in range(size)]
+        start = time.perf_counter()
+        book = RankedBook(OrderSide.BUY, market, orders)
+        loaded = time.perf_counter() - start
+        # A long-lived book should not be rescanned by every garbage collection
+        gc.freeze()
+        ids = list(book._keys)
+        # Every event inserts an order, cancels a random one and looks up the
+        # rank of another, so the book keeps its size
+        start = time.perf_counter()
+        for _ in range(events):
+            order = new_order()
+            book.insert(order)
+            ids.append(order.id)
+            i = rng.randrange(len(ids))
+            ids[i], ids[-1] = ids[-1], ids[i]
+            book.cancel(ids.pop())
+            book.rank(ids[rng.randrange(len(ids))])
+            book.top(10)
+        elapsed = time.perf_counter() - start
+        del orders, book
+        gc.unfreeze()
+        gc.collect()
+        per_event = elapsed / events * 1e6
+        print(
+            f"{size:>9,} orders: loaded in {loaded:.2f}s, "
+            f"{per_event:.1f}us per event (insert + cancel + rank + top 10), "
+            f"{per_event / math.log2(size):.2f}us per log2(n)"
+        )
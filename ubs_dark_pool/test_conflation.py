@@ -0,0 +1,71 @@
+import asyncio
+from itertools import pairwise
+
+from conflation import Conflator
+from main import MarketData
+
+
+class TestConflation:
+    def setUp(self):
+        self.reranked: list[tuple[str, MarketData, float]] = []
+
+    def rerank(self, symbol: str, market: MarketData) -> None:
+        # Rounds do not overlap, so this is the start of this re-rank's round:
+        # the callback itself may start late, after the thread hop
+        started = self.conflator.metrics.round_started
+        self.reranked.append((symbol, market, started))
+
+    def market(self, nbb: float) -> MarketData:
+        return MarketData(nbb=nbb, nbo=nbb + 1.0, l_up=nbb + 10.0, l_down=nbb - 10.0)
+
+    def test_queued_ticks_collapse_to_the_latest(self):
+        self.setUp()
+
+        async def scenario():
+            conflator = self.conflator = Conflator(self.rerank, window=0.0)
+            for nbb in (20.0, 21.0, 22.0):
+                assert conflator.publish("AAA", self.market(nbb))
+            conflator.publish("BBB", self.market(30.0))
+            crossed = MarketData(nbb=25.0, nbo=24.0, l_up=30.0, l_down=10.0)
+            assert not conflator.publish("AAA", crossed)
+            conflator.close()
+            return await conflator.run()
+
+        metrics = asyncio.run(scenario())
+        assert [(s, m.nbb) for s, m, _ in self.reranked] == [
+            ("AAA", 22.0),
+            ("BBB", 30.0),
+        ]
+        assert (metrics.received, metrics.merged, metrics.dropped) == (5, 2, 1)
+        assert metrics.reranks == 2
+        assert 0 < metrics.staleness_mean <= metrics.staleness_max
+
+    def test_at_most_one_rerank_per_window(self):
+        self.setUp()
+        window = 0.02
+        published = []
+
+        async def scenario():
+            conflator = self.conflator = Conflator(self.rerank, window=window)
+            consumer = asyncio.create_task(conflator.run())
+            for i in range(100):
+                market = self.market(20.0 + i)
+                conflator.publish("AAA", market)
+                published.append(market)
+                await asyncio.sleep(0.001)
+            conflator.close()
+            return await consumer
+
+        metrics = asyncio.run(scenario())
+        assert self.reranked[-1][1] is published[-1]
+        starts = [t for _, _, t in self.reranked]
+        assert all(b - a >= window * 0.9 for a, b in pairwise(starts))
+        assert metrics.reranks == len(self.reranked) < 100
+        assert metrics.merged == 100 - metrics.reranks
+
+
+if __name__ == "__main__":
+    test = TestConflation()
+    test.test_queued_ticks_collapse_to_the_latest()
+    test.test_at_most_one_rerank_per_window()
+    print("All tests passed!")
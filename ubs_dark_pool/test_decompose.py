@@ -0,0 +1,95 @@
+import tempfile
+from fractions import Fraction
+from pathlib import Path
+
+from decompose import (
+    ENTRY_POINTS,
+    Linear,
+    _evaluate_expression,
+    check_samples,
+    decompose,
+    solve,
+    solve_integer,
+)
+
+
+class TestDecompose:
+    def setUp(self):
+        self.x = Linear.var("x")
+        self.y = Linear.var("y")
+
+    def test_solver(self):
+        self.setUp()
+        x, y = self.x, self.y
+        assignment = solve([x > y, y >= 2, x < 4])
+        assert assignment["y"] >= 2 and assignment["y"] < assignment["x"] < 4
+        assert solve([x > y, y > x]) is None
+        assert solve([x >= y, y >= x, x != y]) is None
+        assert solve([x == (x + y) / 2, y != 3]) is not None
+        assert solve([x > 0, x < 1], integers={"x"}) == {"x": Fraction(1, 2)}
+
+    def test_integer_solver(self):
+        self.setUp()
+        x, y = self.x, self.y
+        # Over the reals x = 1/2 comes first, rounding finds x = 1, y = 2
+        comparisons = [x * 2 == y, y > 0, y < 5]
+        assert solve(comparisons, integers={"x", "y"})["x"] == Fraction(1, 2)
+        assignment = solve_integer(comparisons, integers={"x", "y"})
+        assert assignment["y"] == 2 * assignment["x"]
+        assert all(v.denominator == 1 for v in assignment.values())
+        assert solve_integer([x > 0, x < 1], integers={"x"}) is None
+
+    def test_less_aggressive_regions(self):
+        self.setUp()
+        regions = decompose("less_aggressive", cache_dir=None)
+        assert len(regions) == 5
+        assert regions[0].result == "far_price"
+        assert regions[0].constraints == ["lim_price < 0"]
+        assert {r.result for r in regions[1:]} == {"far_price", "lim_price"}
+
+    def test_samples_in_their_regions(self):
+        self.setUp()
+        for name in ("less_aggressive", "priority_price"):
+            regions = decompose(name, cache_dir=None)
+            assert check_samples(ENTRY_POINTS[name], regions) == []
+            assert all(r.integer_witness for r in regions)
+        results = {r.result for r in decompose("priority_price", cache_dir=None)}
+        assert "0.5 * mkt.nbb + 0.5 * mkt.nbo" in results
+
+    def test_order_higher_ranked_regions(self):
+        self.setUp()
+        regions = decompose("order_higher_ranked", cache_dir=None)
+        assert len(regions) >= 6000
+        assert all(r.integer_witness for r in regions)
+        assert check_samples(ENTRY_POINTS["order_higher_ranked"], regions) == []
+
+    def test_evaluates_only_linear_expressions(self):
+        self.setUp()
+        sample = {"mkt.nbb": 99.0, "o.time": 3, "side": "BUY"}
+        assert _evaluate_expression("-0.5 * mkt.nbb + 2 * o.time - 1", sample) == -44.5
+        for text in ("side", "o.time ** 2", "__import__('os')", "mkt.", "o.qty"):
+            try:
+                _evaluate_expression(text, sample)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"Expected a ValueError for {text!r}")
+
+    def test_cache_reload(self):
+        self.setUp()
+        with tempfile.TemporaryDirectory() as directory:
+            first = decompose("priority_price", Path(directory))
+            assert len(list(Path(directory).glob("regions.priority_price.*"))) == 1
+            assert decompose("priority_price", Path(directory)) == first
+
+
+if __name__ == "__main__":
+    test = TestDecompose()
+    test.test_solver()
+    test.test_integer_solver()
+    test.test_less_aggressive_regions()
+    test.test_samples_in_their_regions()
+    test.test_order_higher_ranked_regions()
+    test.test_evaluates_only_linear_expressions()
+    test.test_cache_reload()
+    print("All tests passed!")
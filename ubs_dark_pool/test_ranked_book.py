@@ -0,0 +1,104 @@
+import random
+
+from main import (
+    MarketData,
+    Order,
+    OrderPeg,
+    OrderSide,
+    OrderType,
+    order_higher_ranked,
+    priority_price,
+)
+from ranked_book import RankedBook, priority_key
+
+
+class TestRankedBook:
+    def setUp(self):
+        self.rng = random.Random(5)
+        self.market = MarketData(nbb=2.0, nbo=3.0, l_up=4.0, l_down=1.0)
+        self.next_id = 0
+
+    def order(self) -> Order:
+        self.next_id += 1
+        qty = self.rng.randrange(1, 5)
+        return Order(
+            id=self.next_id,
+            peg=self.rng.choice(list(OrderPeg)),
+            client_id=0,
+            order_type=self.rng.choice(list(OrderType)),
+            qty=qty,
+            min_qty=0,
+            leaves_qty=self.rng.randrange(1, qty + 1),
+            price=self.rng.choice((2.5, 3.0, 3.5)),
+            time=self.rng.randrange(5),
+        )
+
+    def test_key_agrees_with_order_higher_ranked(self):
+        self.setUp()
+        for _ in range(5000):
+            side = self.rng.choice(list(OrderSide))
+            o1, o2 = self.order(), self.order()
+            both_ci = o1.order_type.is_ci and o2.order_type.is_ci
+            same_price = priority_price(side, o1, self.market) == priority_price(
+                side, o2, self.market
+            )
+            if both_ci and same_price and o1.time != o2.time:
+                continue  # Where order_higher_ranked puts quantity before time
+            k1 = priority_key(side, o1, self.market)
+            k2 = priority_key(side, o2, self.market)
+            if order_higher_ranked(side, o1, o2, self.market):
+                assert k1 < k2
+            if k1[:-1] < k2[:-1]:
+                assert order_higher_ranked(side, o1, o2, self.market)
+
+    def test_matches_sorted_list(self):
+        self.setUp()
+        for side in (OrderSide.BUY, OrderSide.SELL):
+            initial = [self.order() for _ in range(50)]
+            book = RankedBook(side, self.market, initial, seed=1)
+            expected = {o.id: o for o in initial}
+            for _ in range(500):
+                if expected and self.rng.random() < 0.4:
+                    order_id = self.rng.choice(list(expected))
+                    assert book.cancel(order_id) is expected.pop(order_id)
+                else:
+                    order = self.order()
+                    rank = book.insert(order)
+                    expected[order.id] = order
+                    ranked = sorted(
+                        expected.values(),
+                        key=lambda o: priority_key(side, o, self.market),
+                    )
+                    assert ranked[rank] is order
+            ranked = sorted(
+                expected.values(), key=lambda o: priority_key(side, o, self.market)
+            )
+            assert list(book) == ranked
+            assert len(book) == len(ranked)
+            assert book.top(5) == ranked[:5]
+            for i, order in enumerate(ranked):
+                assert book.rank(order.id) == i
+                assert book[i] is order
+
+    def test_cancel_unknown_order(self):
+        self.setUp()
+        book = RankedBook(OrderSide.BUY, self.market)
+        order = self.order()
+        book.insert(order)
+        assert order.id in book
+        try:
+            book.cancel(order.id + 1)
+        except KeyError:
+            pass
+        else:
+            raise AssertionError("Expected a KeyError")
+        assert book.cancel(order.id) is order
+        assert len(book) == 0 and book.top(3) == []
+
+
+if __name__ == "__main__":
+    test = TestRankedBook()
+    test.test_key_agrees_with_order_higher_ranked()
+    test.test_matches_sorted_list()
+    test.test_cancel_unknown_order()
+    print("All tests passed!")